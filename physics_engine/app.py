@@ -13,7 +13,9 @@ from pygame import QUIT # ENUMS
 
 from math import pi
 
-from engine.engine_model import createModel,render,createRigidBody,createRigidBodyFromVertices,updatePhysics
+from engine.engine_model import createModel,createRigidBody,createRigidBodyFromVertices,updatePhysics
+from engine.renderer import DirtyRenderer
+from engine.stepper import Stepper
 from engine.collision_handler import checkCollisions
 from classes.interface import Interface
 from classes.uibase import UIBase
@@ -103,18 +105,20 @@ def run():
 	image.ZIndex = 5
 
 	print(engine.Tree)
-	render(engine, surface)
+	renderer = DirtyRenderer(engine, surface) # The first frame draws everything, after that only what moved is repainted
 
 	frames = 1000
+	stepper = Stepper(engine.Workspace) # Physics runs at physicsRate whatever the frame rate is
+	frameTime = 1/framerate
 
 	while frames > 0:
 		frames -= 1
 		for eventInstance in event.get():
 			if eventInstance.type == QUIT:
 				return
-		updatePhysics(engine.Workspace, 1/framerate)
-		render(engine, surface)
-		display.update(engine.Workspace.Rectangle) # Use update RECT to specify WORKSPACE to render WORKSPACE for EFFICIENCY
-		clock.tick_busy_loop(framerate)
+		stepper.Advance(frameTime)
+		display.update(renderer.Render(stepper)) # Only the rectangles that were repainted, the first frame is the whole screen
+		frameTime = clock.tick_busy_loop(framerate)/1000 # Real time the frame took, so slow frames are caught up on
 
-run()
+if __name__ == '__main__': # Importing app no longer starts it, __main__.py does
+	run()
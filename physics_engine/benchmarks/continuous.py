@@ -0,0 +1,97 @@
+# >> CREDITS <<
+# Continuous.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Fires fast bodies around a box with 200 thick walls, like app.run's, at several physics rates,
+# with continuous collision detection off and then on. It counts how many bodies tunnelled out of the box
+# and how long a simulated second took, then prints the lowest rate at which nothing escaped in each mode.
+# Then it times steps of the Field scene with thousands of slow bodies and a few fast ones, with it off and on,
+# to show what sweeping costs when the fast bodies are a small part of a big world.
+# Run from the physics_engine folder with: python -m benchmarks.continuous
+# Faster bodies need higher rates without it: python -m benchmarks.continuous --speed 8000
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, createRigidBody, updatePhysics, releaseWorld
+from engine.scenes import addWalls, buildScene
+from engine.world_config import WorldConfig, setWorldConfig
+
+import argparse
+import random
+from time import perf_counter
+
+# >> GLOBALS <<
+
+physicsRates = [15, 30, 60, 120, 240, 480, 960]
+bodyCount = 20
+speed = 3000 # px/s, roughly what a hard impulse and a long fall give
+duration = 3 # Simulated seconds per run
+width, height = 800, 450
+crowdCounts = [1000, 5000] # Bodies in the Field scene
+crowdFast = 10 # How many of them are fired off fast
+crowdSteps = 30
+
+# >> FUNCTIONS <<
+
+def runOnce(rate, continuous, seed, speed): # (bodies that escaped, ms per simulated second)
+	generator = random.Random(seed)
+	game = createModel()
+	workspace = game.Workspace
+	addWalls(workspace, width, height)
+	setWorldConfig(workspace, WorldConfig(continuousCollision=continuous))
+	bodies = []
+	for i in range(bodyCount):
+		body = createRigidBody(generator.randint(3, 8), generator.uniform(20, 50))
+		body.Position = Vector2(generator.uniform(100, width-100), generator.uniform(100, height-100))
+		body.Velocity = Vector2(speed, 0).rotatedRadians(generator.uniform(0, 6.283))
+		body.Parent = workspace
+		bodies.append(body)
+	start = perf_counter()
+	for step in range(int(rate*duration)):
+		updatePhysics(workspace, 1/rate)
+	elapsed = perf_counter()-start
+	escaped = sum(1 for body in bodies if not (0 <= body.Position.x <= width and 0 <= body.Position.y <= height))
+	releaseWorld(workspace)
+	return escaped, elapsed/duration*1000
+
+def timeCrowd(count, continuous, seed, speed): # ms per step
+	generator = random.Random(seed)
+	game = buildScene("Field", count, seed)
+	workspace = game.Workspace
+	setWorldConfig(workspace, WorldConfig(continuousCollision=continuous))
+	bodies = [body for body in workspace.GetDescendants() if not body.Anchored]
+	for body in generator.sample(bodies, min(crowdFast, len(bodies))):
+		body.Velocity = Vector2(speed, 0).rotatedRadians(generator.uniform(0, 6.283))
+	updatePhysics(workspace, 1/60) # First step sorts the broadphase
+	start = perf_counter()
+	for step in range(crowdSteps):
+		updatePhysics(workspace, 1/60)
+	elapsed = perf_counter()-start
+	releaseWorld(workspace)
+	return elapsed/crowdSteps*1000
+
+def run(seed=0, speed=speed):
+	needed = {}
+	for continuous in (False, True):
+		mode = "on" if continuous else "off"
+		print(f"continuous collision {mode}:")
+		for rate in physicsRates:
+			escaped, cost = runOnce(rate, continuous, seed, speed)
+			print(f"\t{rate}Hz: {escaped}/{bodyCount} escaped, {cost:.0f}ms per simulated second")
+			if escaped == 0 and not mode in needed:
+				needed[mode] = (rate, cost)
+	for mode, (rate, cost) in needed.items():
+		print(f"lowest rate with nothing escaping, continuous collision {mode}: {rate}Hz at {cost:.0f}ms per simulated second")
+	for mode in ("off", "on"):
+		if not mode in needed:
+			print(f"bodies still escaped at {physicsRates[-1]}Hz with continuous collision {mode}")
+	for count in crowdCounts:
+		off, on = timeCrowd(count, False, seed, speed), timeCrowd(count, True, seed, speed)
+		print(f"Field, {count} bodies, {crowdFast} fast: {off:.1f}ms per step off, {on:.1f}ms on ({on/off:.2f}x)")
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Finds the physics rate needed to stop fast bodies tunnelling, with and without continuous collision")
+	parser.add_argument("--speed", type=float, default=speed)
+	parser.add_argument("--seed", type=int, default=0)
+	arguments = parser.parse_args()
+	run(arguments.seed, arguments.speed)
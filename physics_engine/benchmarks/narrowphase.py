@@ -0,0 +1,74 @@
+# >> CREDITS <<
+# Narrowphase.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Checks that the batched NumPy narrowphase gives the same collisions as the scalar one,
+# then times both of them on the same candidate pairs.
+# Run from the physics_engine folder with: python -m benchmarks.narrowphase
+
+# >> MODULES <<
+import random
+from time import perf_counter
+
+from engine.engine_model import createModel, createRigidBody
+from engine.collision_handler import areShapesColliding
+from engine.batch_collision_handler import checkCollisionsBatched
+from engine.broadphase import SweepAndPrune
+from classes.vector2d import Vector2
+
+# >> FUNCTIONS <<
+
+def createScene(amount, seed=0): # Lots of overlapping polygons with random velocities
+	random.seed(seed)
+	engine = createModel()
+	for i in range(amount):
+		body = createRigidBody(random.randint(3, 8), random.uniform(20, 60))
+		body.Position = Vector2(random.uniform(0, 800), random.uniform(0, 450))
+		body.Rotation = random.uniform(0, 6.3)
+		body.Velocity = Vector2(random.uniform(-100, 100), random.uniform(-100, 100))
+		body.Parent = engine.Workspace
+	return engine
+
+def checkCollisionsScalar(pairs): # The loop from checkCollisions
+	collisions = []
+	for pair in pairs:
+		collision, mtv, collisionPoint, impulse = areShapesColliding(pair[0], pair[1])
+		if collision:
+			collisions.append((pair[0], pair[1], mtv, collisionPoint, impulse))
+	return collisions
+
+def recordKey(record): # Something comparable for a (a, b, mtv, point, impulse) record
+	a, b, mtv, point, impulse = record
+	return (a.ID, b.ID, mtv.x, mtv.y, point.x, point.y, impulse)
+
+def recordsMatch(scalar, batched, tolerance=1e-9): # Python's x**2 and NumPy's square can differ in the last bit
+	if scalar[:2] != batched[:2]:
+		return False
+	return all(abs(one-two) <= tolerance*max(1, abs(one)) for one, two in zip(scalar[2:], batched[2:]))
+
+def checkEquivalence(pairs):
+	scalar = [recordKey(record) for record in checkCollisionsScalar(pairs)]
+	batched = [recordKey(record) for record in checkCollisionsBatched(pairs)]
+	if len(scalar) != len(batched) or not all(recordsMatch(one, two) for one, two in zip(scalar, batched)):
+		raise AssertionError(f"Batched narrowphase disagrees with the scalar one ({len(batched)} vs {len(scalar)} collisions)")
+	return len(scalar)
+
+def timeIt(function, argument, repeats=3):
+	best = float("inf")
+	for i in range(repeats):
+		start = perf_counter()
+		function(argument)
+		best = min(best, perf_counter()-start)
+	return best
+
+def run():
+	for amount in (50, 200, 1000):
+		shapes = createScene(amount).Workspace.GetDescendants()
+		pairs = SweepAndPrune().GetPairs(shapes)
+		collisions = checkEquivalence(pairs)
+		scalar = timeIt(checkCollisionsScalar, pairs)
+		batched = timeIt(checkCollisionsBatched, pairs)
+		print(f"{amount} bodies, {len(pairs)} pairs, {collisions} collisions: scalar {scalar*1000:.2f}ms, batched {batched*1000:.2f}ms ({scalar/batched:.1f}x)")
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,59 @@
+# >> CREDITS <<
+# Parallel.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times updatePhysics with the parallel solver on 1, 2, 4... workers up to the number of cores, against the normal solver,
+# for a few numbers of bodies. The scene is columns of boxes, so there are plenty of islands to share out.
+# Sleeping is switched off so every frame does the same work. Also checks every worker count ends in the same state.
+# Run from the physics_engine folder with: python -m benchmarks.parallel
+
+# >> MODULES <<
+from engine import engine_model, parallel_solver
+from engine.scenes import buildScene
+from engine.world_config import WorldConfig, setWorldConfig
+
+from os import cpu_count
+from time import perf_counter
+
+# >> GLOBALS <<
+
+bodyCounts = [200, 1000, 3000]
+warmUp = 10 # Frames before timing starts, so the columns have landed and the shared arrays exist
+frames = 30
+
+# >> FUNCTIONS <<
+
+def timeWorkers(count, workers): # ms per frame and the final state, with workers=0 meaning the normal solver
+	parallel_solver.parallelWorkers = workers
+	game = buildScene("Columns", count)
+	setWorldConfig(game.Workspace, WorldConfig(allowSleeping=False))
+	for frame in range(warmUp):
+		engine_model.updatePhysics(game.Workspace, 1/120)
+	start = perf_counter()
+	for frame in range(frames):
+		engine_model.updatePhysics(game.Workspace, 1/120)
+	elapsed = (perf_counter()-start)/frames*1000
+	state = [(body.Position.x, body.Position.y, body.Rotation) for body in game.Workspace.GetDescendants()]
+	engine_model.releaseWorld(game.Workspace) # Closes its parallel solver too
+	return elapsed, state
+
+def run():
+	cores = cpu_count() or 1
+	workerCounts = [1]
+	while workerCounts[-1]*2 <= cores:
+		workerCounts.append(workerCounts[-1]*2)
+	if workerCounts[-1] != cores:
+		workerCounts.append(cores)
+	print(f"{cores} cores, {frames} frames each")
+	for count in bodyCounts:
+		serial, serialState = timeWorkers(count, 0)
+		print(f"{count} bodies: normal solver {serial:.1f}ms per frame")
+		baseline, expected = None, None
+		for workers in workerCounts:
+			elapsed, state = timeWorkers(count, workers)
+			baseline = baseline or elapsed
+			expected = expected or state
+			print(f"\t{workers} workers: {elapsed:.1f}ms per frame, {baseline/elapsed:.2f}x vs 1 worker, {serial/elapsed:.2f}x vs normal, same results: {state == expected}")
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,51 @@
+# >> CREDITS <<
+# Recorder.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times the same run of updatePhysics with and without a trajectory Recorder listening,
+# to check recording costs only a few percent of a step, then checks the replay matches what was simulated.
+# Run from the physics_engine folder with: python -m benchmarks.recorder
+
+# >> MODULES <<
+from engine.engine_model import updatePhysics
+from engine.scenes import buildScene
+from engine.trajectories import Recorder, Replayer
+
+from os import path, remove
+from tempfile import gettempdir
+from time import perf_counter
+
+# >> GLOBALS <<
+
+bodyCounts = [50, 200, 1000]
+steps = 240
+trajectory = path.join(gettempdir(), "benchmark.traj")
+
+# >> FUNCTIONS <<
+
+def timeRun(count, record): # Seconds for steps of updatePhysics, and the recorded bodies' final states
+	game = buildScene("Pile", count)
+	recorder = Recorder(game.Workspace, trajectory)
+	if record:
+		recorder.Start(keyframe=False)
+	start = perf_counter()
+	for step in range(steps):
+		updatePhysics(game.Workspace, 1/120)
+	if record:
+		recorder.Stop()
+	elapsed = perf_counter()-start
+	return elapsed, [(body.Position.x, body.Position.y, body.Rotation) for body in game.Workspace.GetDescendants()]
+
+def run():
+	timeRun(10, True) # Loads NumPy so it isn't timed
+	for count in bodyCounts:
+		plain, final = timeRun(count, False)
+		recorded, recordedFinal = timeRun(count, True)
+		replayer = Replayer(trajectory)
+		time, states = replayer.Read(replayer.StepCount-1)
+		matches = [tuple(state[:3]) for state in states.tolist()] == final == recordedFinal
+		print(f"{count} bodies: {plain/steps*1000:.2f}ms per step, {recorded/steps*1000:.2f}ms recording ({(recorded/plain-1)*100:+.1f}%), {path.getsize(trajectory)/1024:.0f}KB, replay matches: {matches}")
+	remove(trajectory)
+
+if __name__ == "__main__":
+	run()
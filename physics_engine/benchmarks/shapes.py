@@ -0,0 +1,45 @@
+# >> CREDITS <<
+# Shapes.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Measures what a body costs now that its vertices, axes and inertia live in a shared Shape:
+# memory per body and time per body for createRigidBody and for Clone, and how many distinct Shapes they use.
+# Run from the physics_engine folder with: python -m benchmarks.shapes
+
+# >> MODULES <<
+from engine.engine_model import createRigidBody
+from classes import shape
+
+import tracemalloc
+from time import perf_counter
+
+# >> GLOBALS <<
+
+bodyCounts = [100, 1000, 10000]
+sides = 5
+size = 40
+
+# >> FUNCTIONS <<
+
+def measure(make, count): # (bytes per body, microseconds per body) for making count bodies with make()
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	bodies = [make() for i in range(count)]
+	used = tracemalloc.get_traced_memory()[0] - before
+	tracemalloc.stop()
+	start = perf_counter()
+	others = [make() for i in range(count)]
+	elapsed = perf_counter() - start
+	return used/count, elapsed/count*1e6, bodies + others
+
+def run():
+	createRigidBody(sides, size) # Makes the Shape first, so it's shared by everything timed
+	for count in bodyCounts:
+		original = createRigidBody(sides, size)
+		createBytes, createTime, created = measure(lambda: createRigidBody(sides, size), count)
+		cloneBytes, cloneTime, clones = measure(original.Clone, count)
+		distinct = len({id(body.Shape) for body in created + clones})
+		print(f"{count} bodies: create {createBytes:.0f}B {createTime:.1f}us, clone {cloneBytes:.0f}B {cloneTime:.1f}us per body, {distinct} Shape(s) shared, {len(shape.shapes)} interned")
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,55 @@
+# >> CREDITS <<
+# Snapshots.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times saving a keyframe, opening it, building one body from it and restoring it over the same Workspace,
+# for a few numbers of bodies. Also checks the restored bodies match the ones that were saved.
+# Run from the physics_engine folder with: python -m benchmarks.snapshots
+
+# >> MODULES <<
+from engine.engine_model import updatePhysics
+from engine.scenes import buildScene
+from engine.snapshots import saveSnapshot, loadSnapshot
+
+from os import path, remove
+from statistics import median
+from tempfile import gettempdir
+from time import perf_counter
+
+# >> GLOBALS <<
+
+bodyCounts = [100, 1000, 10000]
+keyframe = path.join(gettempdir(), "benchmark.snap")
+
+# >> FUNCTIONS <<
+
+def timeIt(function, repeats=5): # Median ms
+	times = []
+	for i in range(repeats):
+		start = perf_counter()
+		function()
+		times.append(perf_counter()-start)
+	return median(times)*1000
+
+def describe(workspace):
+	return [(body.ID, body.Position.x, body.Position.y, body.Rotation, body.Velocity.x, body.Velocity.y, body.AngularVelocity) for body in workspace.GetDescendants()]
+
+def run():
+	saveSnapshot(buildScene("Stack", 1).Workspace, keyframe) # Loads NumPy so it isn't timed
+	for count in bodyCounts:
+		game = buildScene("Pile", count)
+		for frame in range(5):
+			updatePhysics(game.Workspace, 1/60)
+		saved = describe(game.Workspace)
+		save = timeIt(lambda: saveSnapshot(game.Workspace, keyframe))
+		size = path.getsize(keyframe)
+		load = timeIt(lambda: loadSnapshot(keyframe))
+		body = timeIt(lambda: loadSnapshot(keyframe).Body(count//2))
+		for frame in range(5):
+			updatePhysics(game.Workspace, 1/60)
+		restore = timeIt(lambda: loadSnapshot(keyframe).Restore(game.Workspace), 1)
+		print(f"{count} bodies, {size/1024:.0f}KB: save {save:.2f}ms, open {load:.2f}ms, one body {body:.2f}ms, restore {restore:.1f}ms, restored correctly: {describe(game.Workspace) == saved}")
+	remove(keyframe)
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,45 @@
+# >> CREDITS <<
+# Startup.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times how long a fresh Python process takes to import the engine and build a model,
+# headless and with the pygame renderer (what every import used to cost), in separate processes so nothing is cached.
+# Run from the physics_engine folder with: python -m benchmarks.startup
+
+# >> MODULES <<
+import os
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+# >> GLOBALS <<
+
+scripts = {
+	"headless": "from engine.engine_model import createModel, updatePhysics",
+	"with pygame": "import pygame; from engine.engine_model import createModel, updatePhysics; from engine.renderer import render; from classes.interface import Interface",
+}
+measure = "import sys; from time import perf_counter; start = perf_counter(); {}; createModel(); print(perf_counter()-start, 'pygame' in sys.modules)"
+
+# >> FUNCTIONS <<
+
+def timeStartup(script, repeats=10): # Median import time inside the process and median wall time of the whole process
+	environment = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1", SDL_VIDEODRIVER="dummy")
+	imports, walls = [], []
+	for i in range(repeats):
+		start = perf_counter()
+		output = subprocess.run([sys.executable, "-c", measure.format(script)], capture_output=True, text=True, env=environment, check=True).stdout.split()
+		walls.append(perf_counter()-start)
+		imports.append(float(output[0]))
+		usedPygame = output[1] == "True"
+	return median(imports), median(walls), usedPygame
+
+def run():
+	results = {name: timeStartup(script) for name, script in scripts.items()}
+	for name, (importTime, wallTime, usedPygame) in results.items():
+		print(f"{name}: import {importTime*1000:.1f}ms, whole process {wallTime*1000:.1f}ms, pygame loaded: {usedPygame}")
+	headless, rendered = results["headless"], results["with pygame"]
+	print(f"headless imports {rendered[0]/headless[0]:.1f}x faster")
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,161 @@
+# >> CREDITS <<
+# Suite.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Runs updatePhysics headless on the canned scenes for several numbers of bodies and writes what it measured to a JSON file,
+# so a change to the collision handler or RigidBody.Update can be checked against the commit before it.
+# For every scene and count it records the time per step (mean, median, 95th percentile), broadphase pairs per step,
+# how many of those pairs the narrowphase found touching, and the peak memory used building the scene and stepping it.
+# Memory is traced in a separate run from the timing, because tracemalloc slows everything down.
+# Sleeping is switched off so every step does the same work, otherwise a pile that has settled costs nothing.
+# Run from the physics_engine folder with: python -m benchmarks.suite
+# Compare against an earlier run with: python -m benchmarks.suite --compare old.json
+
+# >> MODULES <<
+from engine import engine_model
+from engine.scenes import buildScene
+from engine.collision_handler import getBroadphase
+from engine.collisions import getContactCache
+from engine.world_config import WorldConfig, setWorldConfig
+from shared import settings
+
+import argparse
+import json
+import platform
+import subprocess
+import tracemalloc
+from statistics import mean, median
+from time import perf_counter, strftime
+
+# >> GLOBALS <<
+
+sceneNames = ["Box", "Pyramid", "Pile", "Field"]
+bodyCounts = [10, 100, 1000, 10000]
+warmUp = 5 # Steps before timing starts, so first frame set up (sorting, caches) isn't counted
+steps = 20 # Timed steps per scene and count
+memorySteps = 3 # Steps taken while tracing memory
+timeStep = 1/120
+slower = 1.1 # Comparisons flag anything taking this many times as long as before
+
+# >> UTILITY FUNCTIONS <<
+
+def percentile(values, fraction): # Nearest rank, good enough for a handful of steps
+	ordered = sorted(values)
+	return ordered[min(len(ordered)-1, int(fraction*len(ordered)))]
+
+def findCommit(): # Short hash of the checked out commit, with + on the end if there are uncommitted changes
+	try:
+		commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+		changed = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True).stdout.strip()
+	except (OSError, subprocess.CalledProcessError):
+		return None
+	return commit + ("+" if changed else "")
+
+def describeMachine():
+	try:
+		import numpy
+		numpyVersion = numpy.__version__
+	except ImportError:
+		numpyVersion = None
+	return {
+		"Commit": findCommit(),
+		"Date": strftime("%Y-%m-%d %H:%M:%S"),
+		"Python": platform.python_version(),
+		"NumPy": numpyVersion,
+		"Platform": platform.platform(),
+		"Processor": platform.processor() or platform.machine(),
+		"Settings": {name: getattr(settings, name) for name in ("broadphase", "useBodyStore", "batchNarrowphase", "parallelWorkers", "solverIterations", "positionIterations")},
+	}
+
+# >> FUNCTIONS <<
+
+def buildAwake(name, count, seed=0): # The scene with sleeping switched off for its world
+	game = buildScene(name, count, seed)
+	setWorldConfig(game.Workspace, WorldConfig(allowSleeping=False))
+	return game
+
+def timeScene(name, count, seed=0): # Times steps of one scene and counts its pairs and contacts
+	game = buildAwake(name, count, seed)
+	workspace = game.Workspace
+	broad, cache = getBroadphase(workspace), getContactCache(workspace)
+	for step in range(warmUp):
+		engine_model.updatePhysics(workspace, timeStep)
+	times, candidates, pruned, touching = [], [], [], []
+	for step in range(steps):
+		start = perf_counter()
+		engine_model.updatePhysics(workspace, timeStep)
+		times.append((perf_counter()-start)*1000)
+		candidates.append(broad.CandidatePairs)
+		pruned.append(broad.PrunedPairs)
+		touching.append(len(cache.Manifolds))
+	engine_model.releaseWorld(workspace)
+	return {
+		"Scene": name,
+		"Count": count,
+		"Bodies": len(workspace.GetDescendants()), # Includes the ground and walls
+		"Steps": steps,
+		"MeanStep": mean(times), # ms
+		"MedianStep": median(times),
+		"P95Step": percentile(times, 0.95),
+		"FastestStep": min(times),
+		"CandidatePairs": mean(candidates), # Pairs the broadphase handed on, per step
+		"PrunedPairs": mean(pruned), # Pairs it ruled out, per step
+		"TouchingPairs": mean(touching), # Candidate pairs the narrowphase found touching, per step
+		"HitRate": sum(touching)/sum(candidates) if sum(candidates) else 0,
+	}
+
+def traceScene(name, count, seed=0): # Peak bytes allocated building the scene, and stepping it afterwards
+	tracemalloc.start()
+	game = buildAwake(name, count, seed)
+	building = tracemalloc.get_traced_memory()[1]
+	tracemalloc.reset_peak()
+	for step in range(memorySteps):
+		engine_model.updatePhysics(game.Workspace, timeStep)
+	stepping = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	engine_model.releaseWorld(game.Workspace)
+	return {"PeakBuildMemory": building, "PeakStepMemory": stepping}
+
+def compare(results, previous): # Prints how each scene and count changed against an earlier results file
+	old = {(result["Scene"], result["Count"]): result for result in previous["Results"]}
+	print(f"\nAgainst {previous['Machine']['Commit']} from {previous['Machine']['Date']}:")
+	for result in results:
+		before = old.get((result["Scene"], result["Count"]))
+		if before == None:
+			continue
+		ratio = result["MedianStep"]/before["MedianStep"] if before["MedianStep"] else 1
+		flag = " SLOWER" if ratio > slower else " faster" if ratio < 1/slower else ""
+		pairs = "" if result["CandidatePairs"] == before["CandidatePairs"] else f", pairs {before['CandidatePairs']:.0f} >> {result['CandidatePairs']:.0f}"
+		memory = result["PeakStepMemory"]/before["PeakStepMemory"] if before.get("PeakStepMemory") else 1
+		print(f"\t{result['Scene']} {result['Count']}: {before['MedianStep']:.2f}ms >> {result['MedianStep']:.2f}ms ({ratio:.2f}x){flag}, memory {memory:.2f}x{pairs}")
+
+def run(names=sceneNames, counts=bodyCounts, output="benchmark.json", previous=None, seed=0):
+	results = []
+	for count in counts:
+		for name in names:
+			result = timeScene(name, count, seed)
+			result.update(traceScene(name, count, seed))
+			results.append(result)
+			print(f"{name} {count}: {result['MedianStep']:.2f}ms per step (p95 {result['P95Step']:.2f}ms), "
+				f"{result['CandidatePairs']:.0f} pairs, {result['HitRate']*100:.0f}% touching, peak {result['PeakStepMemory']/2**20:.1f}MB")
+	report = {"Machine": describeMachine(), "Seed": seed, "WarmUp": warmUp, "TimeStep": timeStep, "Results": results}
+	if output:
+		with open(output, "w") as file:
+			json.dump(report, file, indent="\t")
+		print(f"Written to {output}")
+	if previous:
+		with open(previous) as file:
+			compare(results, json.load(file))
+	return report
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Times the physics step on the canned scenes")
+	parser.add_argument("--scenes", nargs="+", default=sceneNames)
+	parser.add_argument("--counts", nargs="+", type=int, default=bodyCounts)
+	parser.add_argument("--steps", type=int, default=steps)
+	parser.add_argument("--output", default="benchmark.json")
+	parser.add_argument("--compare", help="Earlier results file to compare against")
+	parser.add_argument("--seed", type=int, default=0)
+	arguments = parser.parse_args()
+	steps = arguments.steps
+	run(arguments.scenes, arguments.counts, arguments.output, arguments.compare, arguments.seed)
@@ -0,0 +1,41 @@
+# >> CREDITS <<
+# Sweep.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times the same parameter sweep on 1, 2, 4... worker processes up to the number of cores,
+# to check sweep_runner scales with cores, and checks every worker count gives the same results.
+# Run from the physics_engine folder with: python -m benchmarks.sweep
+
+# >> MODULES <<
+from engine.sweep_runner import runSweep, parameterGrid
+
+from os import cpu_count
+from time import perf_counter
+
+# >> GLOBALS <<
+
+grid = parameterGrid(gravity=[150, 300], drag=[0, 0.01], elasticity=[0.2, 0.5], friction=[0.3, 0.6])
+sceneNames = ["Stack", "Pyramid", "Pile"]
+
+# >> FUNCTIONS <<
+
+def run(count=20, steps=120):
+	cores = cpu_count() or 1
+	workerCounts = [1]
+	while workerCounts[-1]*2 <= cores:
+		workerCounts.append(workerCounts[-1]*2)
+	if workerCounts[-1] != cores:
+		workerCounts.append(cores)
+	print(f"{len(sceneNames)*len(grid)} jobs of {count} bodies for {steps} steps, {cores} cores")
+	baseline, expected = None, None
+	for workers in workerCounts:
+		start = perf_counter()
+		summaries = runSweep(sceneNames, grid, count, steps, workers=workers)
+		elapsed = perf_counter()-start
+		states = [summary["FinalStates"] for summary in summaries]
+		expected = expected or states
+		baseline = baseline or elapsed
+		print(f"{workers} workers: {elapsed:.2f}s, {baseline/elapsed:.2f}x speed up ({baseline/elapsed/workers*100:.0f}% efficient), same results: {states == expected}")
+
+if __name__ == "__main__":
+	run()
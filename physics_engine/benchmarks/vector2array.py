@@ -0,0 +1,68 @@
+# >> CREDITS <<
+# Vector2Array.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Times the bulk vector maths the engine does on vertex lists, with a list of Vector2s and with a Vector2Array,
+# for polygons as small as the ones the engine makes up to big batches of vertices,
+# and checks both give the same answers.
+# Run from the physics_engine folder with: python -m benchmarks.vector2array
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.vector2array import Vector2Array
+from engine.collision_handler import getNormalsFromVertices, projectVerticesOntoNormal
+
+import random
+from math import isclose
+from timeit import repeat
+
+# >> GLOBALS <<
+
+vertexCounts = [4, 8, 64, 1024, 16384]
+rotation, position, normal = 0.7, Vector2(120, 340), Vector2(0.6, 0.8)
+
+operations = { # Name >> function doing it to vertices, which is either a list of Vector2s or a Vector2Array
+	"rotate and move": lambda vertices: vertices.rotatedRadians(rotation) + position if isinstance(vertices, Vector2Array) else [vertex.rotatedRadians(rotation) + position for vertex in vertices],
+	"edge normals": getNormalsFromVertices,
+	"project onto normal": lambda vertices: projectVerticesOntoNormal(vertices, normal),
+	"dot with normal": lambda vertices: vertices.dot(normal) if isinstance(vertices, Vector2Array) else [vertex.dot(normal) for vertex in vertices],
+	"projection": lambda vertices: vertices.projection(normal) if isinstance(vertices, Vector2Array) else [vertex.projection(normal) for vertex in vertices],
+	"scale": lambda vertices: vertices*1.5 if isinstance(vertices, Vector2Array) else [vertex*1.5 for vertex in vertices],
+}
+
+# >> FUNCTIONS <<
+
+def flatten(result): # Either path's answer as a flat list of floats, to compare them
+	if isinstance(result, Vector2Array):
+		return result.Array.ravel().tolist()
+	if hasattr(result, "tolist"):
+		return result.tolist()
+	values = []
+	for item in result:
+		if isinstance(item, tuple): # (projection, vertex) pairs
+			values.append(item[0])
+			values.extend((item[1].x, item[1].y))
+		elif isinstance(item, Vector2):
+			values.extend((item.x, item.y))
+		else:
+			values.append(item)
+	return values
+
+def timeOperation(operation, vertices): # Best of 5 runs, in microseconds per call
+	number = max(1, 20000//len(vertices))
+	return min(repeat(lambda: operation(vertices), number=number, repeat=5))/number*1e6
+
+def run(seed=0):
+	generator = random.Random(seed)
+	print("microseconds per call, list of Vector2 >> Vector2Array")
+	for count in vertexCounts:
+		objects = [Vector2(generator.uniform(-50, 50), generator.uniform(-50, 50)) for i in range(count)]
+		array = Vector2Array(objects)
+		print(f"{count} vertices:")
+		for name, operation in operations.items():
+			same = all(isclose(a, b, rel_tol=1e-9, abs_tol=1e-9) for a, b in zip(flatten(operation(objects)), flatten(operation(array))))
+			listTime, arrayTime = timeOperation(operation, objects), timeOperation(operation, array)
+			print(f"\t{name}: {listTime:.1f} >> {arrayTime:.1f} ({listTime/arrayTime:.1f}x), same results: {same}")
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,33 @@
+# >> CREDITS << 
+# Colour.py written by Haashim Hussain 
+
+# >> DESCRIPTION <<
+# This is a module that contains a Colour class to stand in for pygame's Color
+# so the simulation core can be imported without pygame.
+# It is a tuple, so pygame still accepts it anywhere it wants a colour.
+
+# >> CLASSES <<
+class Colour(tuple):
+	__slots__ = []
+
+	def __new__(cls, r=0, g=0, b=0, a=255):
+		return tuple.__new__(cls, (r, g, b, a))
+
+	def __repr__(self):
+		return f"Colour{tuple(self)}"
+
+	@property
+	def r(self):
+		return self[0]
+
+	@property
+	def g(self):
+		return self[1]
+
+	@property
+	def b(self):
+		return self[2]
+
+	@property
+	def a(self):
+		return self[3]
@@ -38,21 +38,13 @@ class Interface(UIBase):
 
 	@UIBase.Rectangle.getter
 	def Rectangle(self):
+		position, size = self.AbsolutePosition, self.AbsoluteSize # Both cached, so this is two lookups
 		if not self.ConstrainAxes:
-			return Rectangle(
-				self.AbsolutePosition.x, self.AbsolutePosition.y,
-				self.AbsoluteSize.x, self.AbsoluteSize.y
-				)
+			return Rectangle(position.x, position.y, size.x, size.y)
 		elif self.DominantAxis == "y":
-			return Rectangle(
-				self.AbsolutePosition.x + (self.AbsoluteSize.x-self.AbsoluteSize.y)/2, self.AbsolutePosition.y,
-				self.AbsoluteSize.y, self.AbsoluteSize.y
-				)
+			return Rectangle(position.x + (size.x-size.y)/2, position.y, size.y, size.y)
 		else:
-			return Rectangle(
-				self.AbsolutePosition.x, self.AbsolutePosition.y + (self.AbsoluteSize.y-self.AbsoluteSize.x)/2,
-				self.AbsoluteSize.x, self.AbsoluteSize.x
-				)
+			return Rectangle(position.x, position.y + (size.y-size.x)/2, size.x, size.x)
 
 	@UIBase.Parent.setter
 	def Parent(self, newParent): # reParenting instances yields. Set attributes before parenting.
@@ -63,8 +55,7 @@ class Interface(UIBase):
 		self._Parent = newParent
 		if newParent:
 			newParent._AddChild(self)
-			while not newParent.FindFirstChildOfID(self.ID):
-				pass
+		self._InvalidateTransforms()
 
 	def _UpdateImage(self, completeness):
 		if completeness <= 1:
@@ -107,6 +98,7 @@ class Interface(UIBase):
 	@UIBase.Size.setter
 	def Size(self, newSize):
 		self._Size = newSize
+		self._InvalidateTransforms()
 		self._UpdateImage(1)
 
 	@property
@@ -144,8 +136,7 @@ class Interface(UIBase):
 		clone._Position = self.Position
 		clone._Size = self._Size
 		clone._Vertices = deepcopy(self._Vertices)
-		clone._Children = []
-		for child in self._Children:
+		for child in self._Children.values():
 			subChild = child.Clone()
 			subChild.Parent = clone
 		# Interface attributes
@@ -0,0 +1,33 @@
+# >> CREDITS << 
+# Rectangle.py written by Haashim Hussain 
+
+# >> DESCRIPTION <<
+# This is a module that contains a Rectangle class to stand in for pygame's Rect
+# so the simulation core can be imported without pygame.
+# It is an (x, y, width, height) tuple, so pygame still accepts it anywhere it wants a rect.
+
+# >> CLASSES <<
+class Rectangle(tuple):
+	__slots__ = []
+
+	def __new__(cls, x=0, y=0, width=0, height=0):
+		return tuple.__new__(cls, (x, y, width, height))
+
+	def __repr__(self):
+		return f"Rectangle{tuple(self)}"
+
+	@property
+	def x(self):
+		return self[0]
+
+	@property
+	def y(self):
+		return self[1]
+
+	@property
+	def width(self):
+		return self[2]
+
+	@property
+	def height(self):
+		return self[3]
@@ -8,26 +8,50 @@
 
 # >> MODULES << 
 from classes.vector2d import Vector2 # 2D Vector Class from pygame
+from classes.vector2view import Vector2View # Position, Velocity and Acceleration read as these, so changing them in place clears the caches
 from classes.udim2 import UDim2 # UDim2 >> Allows me to quickly position UI elements using a mixture of % and px
 from classes.uibase import UIBase # UIBase >> allows me to inherit
+from classes.vector2array import Vector2Array # Local vertices can be one of these instead of a list
+from classes.shape import getShape # Shared, unchangeable local vertices with their axes and inertia worked out
 from shared.settings import gravity,drag,screenSize,classNames,slop,angularSlop # Grab settings like gravity, drag, friction, elasticity
 
 from copy import deepcopy,copy # Copy >> Allows me to deepCopy whole classes (Useful for Cloning)
 from math import pi, sin, floor # For rigidbody math
+from weakref import WeakMethod # Listeners are held weakly, see addParentChangedListener
 
 # >> GLOBALS <<
 
 gravityVector = Vector2(0, gravity)
 dragCoeff = 1-drag
+parentChangedListeners = [] # Weak references to methods called with (body, oldParent, newParent) whenever a RigidBody is reparented
+cacheStats = {"Hits": 0, "Recomputes": 0} # How often cached world vertices, axes and bounding boxes were reused or rebuilt
+
+# >> FUNCTIONS <<
+
+def addParentChangedListener(method): # Held weakly, so listening doesn't keep a spatial index, or the world it indexes, alive
+	reference = WeakMethod(method, dropParentChangedListener) # Taken out as soon as the index is thrown away
+	if not reference in parentChangedListeners:
+		parentChangedListeners.append(reference)
+
+def removeParentChangedListener(method):
+	dropParentChangedListener(WeakMethod(method))
+
+def dropParentChangedListener(reference):
+	if reference in parentChangedListeners:
+		parentChangedListeners.remove(reference)
 
 # >> CLASS <<
 class RigidBody(UIBase):
 
-	__slots__ = ["Position", "Velocity", "Acceleration", "Rotation", "AngularVelocity", "AngularAcceleration", "_Forces", "_Impulses", "Anchored", "Mass", "SafeAnchored"]
+	__slots__ = ["_Velocity", "_Acceleration", "_AngularVelocity", "_AngularAcceleration", "_Forces", "_Impulses", "_Anchored", "_Mass", "_SafeAnchored", "_Store", "_StoreIndex", "_Shape", "_StoreGeneration", "_WorldVertices", "_WorldAxes", "_WorldBox", "_SleepTime", "_Island", "Bullet"]
 
 	def __init__(self, className="Polygon", parent=None):
 		UIBase.__init__(self, className, parent)
 
+		self._Store = None # BodyStore holding this body's state, if it has been attached to one
+		self._StoreIndex = 0 # Row of the body in its store
+		self._StoreGeneration = 0 # The store's Generation for that row when the caches were last checked against it
+
 		self.Position = Vector2() # Convert to Vector2. No need for UDim2 anymore.
 		self.Velocity = Vector2() # Initial velocity has to be set while self.Velocity = Vector2()
 		self.Acceleration = Vector2()
@@ -38,10 +62,14 @@ class RigidBody(UIBase):
 		self._Forces = [] # Forces with a force and an origin (origins are local)
 		self._Impulses = [] # Forces with a duration of 1 frame.
 
-		self.SafeAnchored = False
+		self.SafeAnchored = False # Sleeping. Set by Sleep and cleared by Wake, forces or impulses.
 		self.Anchored = False
 		self.Mass = 1
 
+		self._SleepTime = 0 # Seconds spent moving slowly enough to sleep
+		self._Island = None # Bodies that went to sleep with this one and wake up with it
+		self.Bullet = False # Always swept when the world uses continuous collision, however slowly it moves
+
 	def __str__(self):
 		return f"RigidBody({self.ClassName}) {self.Name}"
 
@@ -49,15 +77,134 @@ class RigidBody(UIBase):
 	def Parent(self, newParent): # reParenting instances yields. Set attributes before parenting.
 		if newParent!=None and (not newParent.IsDescendantOfClass("Workspace")):
 			raise ValueError(f"{str(newParent)} is not descended from a valid Workspace")
+		oldParent = self._Parent
 		if self._Parent:
 			self._Parent._RemoveChild(self)
 		self._Parent = newParent
 		if newParent:
 			newParent._AddChild(self)
+		self._InvalidateTransforms()
+		for reference in list(parentChangedListeners): # Lets spatial indexes keep track of which bodies are in their Workspace
+			listener = reference()
+			if listener != None: # None if its index was thrown away while this was going on
+				listener(self, oldParent, newParent)
+
+	# >> CACHED GEOMETRY << (worked out once per move instead of once per access. Assign Position/Rotation rather than
+	# changing their x/y in place so the cache notices, and don't modify the returned lists.
+	# A BodyStore moves bodies by writing its arrays and bumping their Generation, and the caches catch up when next read.)
+
+	def _Sync(self): # Throws the caches away if the store has moved the body since they were made
+		store = self._Store
+		if store and store.Generation[self._StoreIndex] != self._StoreGeneration:
+			self._StoreGeneration = store.Generation[self._StoreIndex]
+			self._InvalidateTransforms()
+
+	def _ClearCache(self):
+		self._WorldVertices = None
+		self._WorldAxes = None
+		self._WorldBox = None
+
+	def _InvalidateTransforms(self): # Position, Rotation or something up the parent chain changed
+		self._ClearCache()
+		self._AbsolutePosition = None
+		self._AbsoluteSize = None
+		self._TransformGeneration += 1
+		for child in self._Children.values():
+			child._InvalidateTransforms()
+
+	@property
+	def TransformGeneration(self):
+		self._Sync()
+		return self._TransformGeneration
 
 	@UIBase.Vertices.getter # Change this because all rigidbodies will have vertices input as Vector2s
 	def Vertices(self):
-		return [vertex.rotatedRadians(self.Rotation) + self.AbsolutePosition for vertex in self._Vertices]
+		self._Sync()
+		if self._WorldVertices == None:
+			cacheStats["Recomputes"] += 1
+			rotation, position = self.Rotation, self.AbsolutePosition
+			if isinstance(self._Vertices, Vector2Array): # All at once, staying a Vector2Array
+				self._WorldVertices = self._Vertices.rotatedRadians(rotation) + position
+			else:
+				self._WorldVertices = [vertex.rotatedRadians(rotation) + position for vertex in self._Vertices]
+		else:
+			cacheStats["Hits"] += 1
+		return self._WorldVertices
+
+	@property
+	def _Vertices(self): # Local vertices, from the body's Shape. Replacing them swaps the Shape and clears the cached geometry.
+		return self._Shape.Vertices
+
+	@_Vertices.setter
+	def _Vertices(self, newVertices):
+		self.Shape = newVertices
+
+	@property
+	def Shape(self): # Shared with every other body with the same vertices, so it and its vertices are frozen
+		return self._Shape
+
+	@Shape.setter
+	def Shape(self, newShape): # A Shape, or vertices to find or make one from
+		self._Shape = getShape(newShape)
+		self._ClearCache()
+
+	def _EditVertices(self, edit): # Shapes can't change, so edits are made to a copy of the vertices which becomes a new Shape
+		vertices = Vector2Array(self._Shape.Vertices) if isinstance(self._Shape.Vertices, Vector2Array) else list(self._Shape.Vertices)
+		edit(vertices)
+		self.Shape = vertices
+
+	def AddVertex(self, newVertex):
+		self._EditVertices(lambda vertices: vertices.append(newVertex))
+
+	def RemoveVertex(self, oldVertex):
+		self._EditVertices(lambda vertices: vertices.remove(oldVertex))
+
+	def ChangeVertex(self, index, newValue):
+		def change(vertices):
+			vertices[index] = newValue
+		self._EditVertices(change)
+
+	@property
+	def LocalAxes(self): # Unique SAT axes in local space, as ((normal, paired)), worked out once per Shape
+		return self._Shape.Axes
+
+	@property
+	def Inertia(self): # Resistance to turning, used by the contact solver
+		return self.Mass * self._Shape.UnitInertia
+
+	@property
+	def Radius(self): # Furthest any vertex is from the body's position, whichever way it's turned
+		return self._Shape.Radius
+
+	@property
+	def Axes(self): # LocalAxes rotated into world space, as [(normal, paired)]
+		self._Sync()
+		if self._WorldAxes == None:
+			cacheStats["Recomputes"] += 1
+			rotation = self.Rotation
+			self._WorldAxes = [(axis.rotatedRadians(rotation), paired) for axis, paired in self.LocalAxes]
+		else:
+			cacheStats["Hits"] += 1
+		return self._WorldAxes
+
+	@property
+	def BoundingBox(self): # Axis aligned box around the vertices as (minX, minY, maxX, maxY). Used by the broadphase.
+		self._Sync()
+		if self._WorldBox == None:
+			cacheStats["Recomputes"] += 1
+			vertices = self.Vertices
+			if not vertices:
+				position = self.AbsolutePosition
+				self._WorldBox = (position.x, position.y, position.x, position.y)
+			elif isinstance(vertices, Vector2Array):
+				self._WorldBox = vertices.bounds()
+			else:
+				xs = [vertex.x for vertex in vertices]
+				ys = [vertex.y for vertex in vertices]
+				self._WorldBox = (min(xs), min(ys), max(xs), max(ys))
+		else:
+			cacheStats["Hits"] += 1
+		return self._WorldBox
 
 	@UIBase.SpriteVertices.getter
 	def SpriteVertices(self): # Unnecessary with RigidBody
@@ -69,15 +216,31 @@ class RigidBody(UIBase):
 
 	def AddForce(self, force, origin=False):
 		if self.SafeAnchored:
-			self.SafeAnchored = False
+			self.Wake()
 		self._Forces.append((force, origin-self.AbsolutePosition if origin else Vector2())) # Origin of force determines angular velocity component.
+		if self._Store:
+			self._Store.MarkForced(self)
 
 	def AddImpulse(self, impulse, origin=False):
 		if self.SafeAnchored:
-			self.SafeAnchored = False
+			self.Wake()
 		self._Impulses.append((impulse, origin-self.AbsolutePosition if origin else Vector2())) # Origin of force determines angular velocity component.
+		if self._Store:
+			self._Store.MarkForced(self)
+
+	def Sleep(self, island=None): # Stops the body being integrated or pushed until it is woken
+		self.SafeAnchored = True
+		self.Velocity = Vector2()
+		self.AngularVelocity = 0
+		self._Island = island or [self]
 
-	def HandleForces(self): # TODO: add in drag
+	def Wake(self): # Wakes the whole island the body fell asleep with
+		for body in self._Island or [self]:
+			body.SafeAnchored = False
+			body._SleepTime = 0
+			body._Island = None
+
+	def SumForces(self): # Totals forces and impulses (and their turning effect), then clears the impulses
 		acceleration = Vector2()
 		angularAcceleration = 0
 		impulseAcceleration = Vector2()
@@ -93,24 +256,145 @@ class RigidBody(UIBase):
 			if not (impulse[1].length == 0):
 				impulseAngularAcceleration += sin(vector.get_radians_between(origin)) * vector.length * origin.length
 		self._Impulses = []
-		return acceleration/self.Mass + gravityVector, angularAcceleration/self.Mass, impulseAcceleration, impulseAngularAcceleration
+		return acceleration, angularAcceleration, impulseAcceleration, impulseAngularAcceleration
+
+	def HandleForces(self, gravity=None): # TODO: add in drag. gravity defaults to gravityVector from settings
+		acceleration, angularAcceleration, impulseAcceleration, impulseAngularAcceleration = self.SumForces()
+		return acceleration/self.Mass + (gravityVector if gravity == None else gravity), angularAcceleration/self.Mass, impulseAcceleration, impulseAngularAcceleration
 
-	def Update(self, dt): # Delta time parameter. Help from https://en.wikipedia.org/wiki/Verlet_integration
-		if not self.Anchored and not self.SafeAnchored:
+	def Update(self, dt, config=None): # Delta time parameter. Help from https://en.wikipedia.org/wiki/Verlet_integration
+		if not self.Anchored and not self.SafeAnchored: # config is the world's WorldConfig, otherwise settings are used
 			newPosition = self.Position + self.Velocity*dt + self.Acceleration*dt*dt*0.5
 			newRotation = self.Rotation + self.AngularVelocity*dt + self.AngularAcceleration*dt*dt*0.5
-			newAcceleration, newAngularAcceleration, impulseAcceleration, impulseAngularAcceleration = self.HandleForces()
-			newVelocity = self.Velocity*(1-drag) + (self.Acceleration+newAcceleration)*dt*0.5 + impulseAcceleration*0.5
+			newAcceleration, newAngularAcceleration, impulseAcceleration, impulseAngularAcceleration = self.HandleForces(config.GravityVector if config else None)
+			newVelocity = self.Velocity*(1-(config.Drag if config else drag)) + (self.Acceleration+newAcceleration)*dt*0.5 + impulseAcceleration*0.5
 			newAngularVelocity = self.AngularVelocity + (self.AngularAcceleration+newAngularAcceleration)*dt*0.5 + impulseAngularAcceleration*0.5
 			self.Position, self.Velocity, self.Acceleration = newPosition, newVelocity, newAcceleration
 			self.Rotation, self.AngularVelocity, self.AngularAcceleration = newRotation, newAngularVelocity, newAngularAcceleration
 
-	@property # Polymorphism to conform with Vector2
-	def AbsolutePosition(self):
-		if self.Parent:
-			return self.Position + self.Parent.AbsolutePosition
+	# >> PHYSICAL STATE << (stored on the body, or in its BodyStore's arrays once attached to one)
+
+	@property
+	def Position(self):
+		return Vector2View(self, "Position")
+
+	@Position.setter
+	def Position(self, newPosition):
+		if self._Store:
+			self._Store.Write("Position", self._StoreIndex, newPosition)
+		else: # Copied, so the vector handed in (or another body's view) can't change it later
+			self._Position = Vector2(newPosition[0], newPosition[1])
+		self._InvalidateTransforms()
+
+	@property
+	def Velocity(self):
+		return Vector2View(self, "Velocity")
+
+	@Velocity.setter
+	def Velocity(self, newVelocity):
+		if self._Store:
+			self._Store.Write("Velocity", self._StoreIndex, newVelocity)
+		else: # Copied, so the vector handed in (or another body's view) can't change it later
+			self._Velocity = Vector2(newVelocity[0], newVelocity[1])
+
+	@property
+	def Acceleration(self):
+		return Vector2View(self, "Acceleration")
+
+	@Acceleration.setter
+	def Acceleration(self, newAcceleration):
+		if self._Store:
+			self._Store.Write("Acceleration", self._StoreIndex, newAcceleration)
+		else: # Copied, so the vector handed in (or another body's view) can't change it later
+			self._Acceleration = Vector2(newAcceleration[0], newAcceleration[1])
+
+	@property
+	def Rotation(self):
+		if self._Store:
+			return self._Store.Read("Rotation", self._StoreIndex)
+		return self._Rotation
+
+	@Rotation.setter
+	def Rotation(self, newRotation):
+		if self._Store:
+			self._Store.Write("Rotation", self._StoreIndex, newRotation)
+		else:
+			self._Rotation = newRotation
+		self._InvalidateTransforms()
+
+	@property
+	def AngularVelocity(self):
+		if self._Store:
+			return self._Store.Read("AngularVelocity", self._StoreIndex)
+		return self._AngularVelocity
+
+	@AngularVelocity.setter
+	def AngularVelocity(self, newAngularVelocity):
+		if self._Store:
+			self._Store.Write("AngularVelocity", self._StoreIndex, newAngularVelocity)
 		else:
+			self._AngularVelocity = newAngularVelocity
+
+	@property
+	def AngularAcceleration(self):
+		if self._Store:
+			return self._Store.Read("AngularAcceleration", self._StoreIndex)
+		return self._AngularAcceleration
+
+	@AngularAcceleration.setter
+	def AngularAcceleration(self, newAngularAcceleration):
+		if self._Store:
+			self._Store.Write("AngularAcceleration", self._StoreIndex, newAngularAcceleration)
+		else:
+			self._AngularAcceleration = newAngularAcceleration
+
+	@property
+	def Mass(self):
+		if self._Store:
+			return self._Store.Read("Mass", self._StoreIndex)
+		return self._Mass
+
+	@Mass.setter
+	def Mass(self, newMass):
+		if self._Store:
+			self._Store.Write("Mass", self._StoreIndex, newMass)
+		else:
+			self._Mass = newMass
+
+	@property
+	def Anchored(self):
+		if self._Store:
+			return self._Store.Read("Anchored", self._StoreIndex)
+		return self._Anchored
+
+	@Anchored.setter
+	def Anchored(self, newAnchored):
+		if self._Store:
+			self._Store.Write("Anchored", self._StoreIndex, newAnchored)
+		else:
+			self._Anchored = newAnchored
+
+	@property
+	def SafeAnchored(self):
+		if self._Store:
+			return self._Store.Read("SafeAnchored", self._StoreIndex)
+		return self._SafeAnchored
+
+	@SafeAnchored.setter
+	def SafeAnchored(self, newSafeAnchored):
+		if self._Store:
+			self._Store.Write("SafeAnchored", self._StoreIndex, newSafeAnchored)
+		else:
+			self._SafeAnchored = newSafeAnchored
+
+	@property # Polymorphism to conform with Vector2. Cached like UIBase's, and caught up with BodyStore moves by _Sync.
+	def AbsolutePosition(self):
+		if not self.Parent:
 			return self.Position
+		self._Sync()
+		if self._AbsolutePosition == None:
+			self._AbsolutePosition = self.Position + self.Parent.AbsolutePosition
+		return self._AbsolutePosition
 
 	def Clone(self):
 		# >> Attributes
@@ -122,17 +406,15 @@ class RigidBody(UIBase):
 		if self.ClassName == "Polygon":
 			clone.Rotation = self.Rotation
 		# >> Private Attributes
-		clone._Position = self.Position
 		clone._Size = self._Size
-		clone._Vertices = deepcopy(self._Vertices)
-		clone._Children = []
-		for child in self._Children:
+		clone.Shape = self.Shape # Shared rather than copied
+		for child in self._Children.values():
 			subChild = child.Clone()
 			subChild.Parent = clone
-		# RigidBody attributes
-		clone.Position = self.Position
-		clone.Velocity = self.Velocity
-		clone.Acceleration = self.Acceleration
+		# RigidBody attributes (vectors are copied so the clone never shares them, or a store's rows, with the original)
+		clone.Position = Vector2(self.Position)
+		clone.Velocity = Vector2(self.Velocity)
+		clone.Acceleration = Vector2(self.Acceleration)
 		clone.Rotation = self.Rotation
 		clone.AngularVelocity = self.AngularVelocity
 		clone.AngularAcceleration = self.AngularAcceleration
@@ -141,4 +423,5 @@ class RigidBody(UIBase):
 		clone.Anchored = self.Anchored
 		clone.SafeAnchored = self.SafeAnchored
 		clone.Mass = self.Mass
+		clone.Bullet = self.Bullet
 		return clone
\ No newline at end of file
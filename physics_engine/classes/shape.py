@@ -0,0 +1,123 @@
+# >> CREDITS <<
+# Shape.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This is a module that contains a Shape Class
+# A Shape is a RigidBody's local vertices plus everything that only depends on them:
+# SAT axes, bounding radius, area, centroid and moment of inertia, all worked out once when it's made.
+# Shapes are interned, so every body with the same vertices (every clone of a pentagon, say) shares one Shape.
+# They are never changed after they're made. Changing a body's vertices gives it a different Shape instead.
+
+# >> MODULES <<
+from classes.vector2d import Vector2, FrozenVector2
+from classes.vector2array import Vector2Array, FrozenVector2Array
+
+from weakref import WeakValueDictionary
+
+# >> GLOBALS <<
+
+shapes = WeakValueDictionary() # Vertex coordinates >> Shape. Shapes no body uses any more are dropped.
+namedShapes = WeakValueDictionary() # Other keys, like ("Regular", n, size), >> Shape, so they can be found without making the vertices
+
+# >> UTILITY FUNCTIONS <<
+
+def findUniqueAxes(vertices): # Edge normals with parallel edges collapsed into one axis. Returns [[normal, paired]]
+	axes = [] # paired is True when an opposite edge exists, so the axis has to be tested in both directions
+	n = len(vertices)
+	for i in range(n):
+		normal = (vertices[(i+1)%n] - vertices[i]).perpendicular_normal()
+		for axis in axes:
+			if abs(axis[0].cross(normal)) < 1e-9: # Parallel. A convex polygon can only have one edge facing each way
+				axis[1] = True
+				break
+		else:
+			axes.append([normal, False])
+	return axes
+
+def findUnitInertia(vertices): # Moment of inertia of a uniform polygon of mass 1 about the origin, which is what it rotates around
+	n = len(vertices)
+	numerator, denominator = 0, 0
+	for i in range(n):
+		a, b = vertices[i], vertices[(i+1)%n]
+		cross = a.cross(b)
+		numerator += cross * (a.dot(a) + a.dot(b) + b.dot(b))
+		denominator += cross
+	if abs(denominator) < 1e-9: # Dots and lines have no area, so treat the vertices as point masses instead
+		return sum(vertex.dot(vertex) for vertex in vertices)/n if n else 0
+	return numerator/(6*denominator)
+
+def findAreaAndCentroid(vertices): # Shoelace formula. Shapes without area use the average vertex as their centroid.
+	n = len(vertices)
+	area, centroidX, centroidY = 0, 0, 0
+	for i in range(n):
+		a, b = vertices[i], vertices[(i+1)%n]
+		cross = a.cross(b)
+		area += cross
+		centroidX += (a.x + b.x)*cross
+		centroidY += (a.y + b.y)*cross
+	if abs(area) < 1e-9:
+		if not n:
+			return 0, Vector2()
+		return 0, Vector2(sum(vertex.x for vertex in vertices)/n, sum(vertex.y for vertex in vertices)/n)
+	return abs(area)/2, Vector2(centroidX/(3*area), centroidY/(3*area))
+
+def shapeKey(vertices):
+	if isinstance(vertices, Vector2Array):
+		return ("Array",) + tuple(map(tuple, vertices.Array.tolist()))
+	return tuple((vertex[0], vertex[1]) for vertex in vertices)
+
+# >> FUNCTIONS <<
+
+def getShape(vertices): # The Shape with these vertices, made the first time it's asked for
+	if isinstance(vertices, Shape):
+		return vertices
+	if not len(vertices): # Every body starts with no vertices, so this one is kept rather than remade every time
+		return emptyShape
+	key = shapeKey(vertices)
+	shape = shapes.get(key)
+	if shape == None:
+		shape = Shape(vertices)
+		shapes[key] = shape
+	return shape
+
+def getNamedShape(key, makeVertices): # The Shape filed under key, or one made from makeVertices() the first time
+	shape = namedShapes.get(key)
+	if shape == None:
+		shape = getShape(makeVertices())
+		namedShapes[key] = shape
+	return shape
+
+# >> CLASSES <<
+
+class Shape:
+
+	__slots__ = ["Vertices", "Axes", "Radius", "Area", "Centroid", "UnitInertia", "__weakref__"]
+
+	def __init__(self, vertices):
+		# Everything here is shared between bodies, so it's all frozen and changing it raises instead of moving every body
+		if isinstance(vertices, Vector2Array): # Kept as an array so bodies transform it in one go
+			self.Vertices = FrozenVector2Array(vertices)
+		else:
+			self.Vertices = tuple(FrozenVector2(vertex[0], vertex[1]) for vertex in vertices) # Local vertices
+		points = list(self.Vertices)
+		self.Axes = tuple((FrozenVector2(normal), paired) for normal, paired in findUniqueAxes(points)) # Unique SAT axes as (normal, paired)
+		self.Radius = max((vertex.get_length() for vertex in points), default=0) # Furthest any vertex is from the origin
+		area, centroid = findAreaAndCentroid(points)
+		self.Area, self.Centroid = area, FrozenVector2(centroid)
+		self.UnitInertia = findUnitInertia(points) # Moment of inertia per unit mass about the origin. Multiply by mass for a body's.
+
+	def __len__(self):
+		return len(self.Vertices)
+
+	def __str__(self):
+		return f"Shape({len(self)} vertices, area {self.Area:.1f})"
+
+	__repr__=__str__
+
+	def __deepcopy__(self, memo): # Shared on purpose, so copying a body never copies its Shape
+		return self
+
+	def __copy__(self):
+		return self
+
+emptyShape = Shape(())
@@ -7,8 +7,8 @@
 # It simplifies the process of instanciating screen objects in PyGame
 
 # >> MODULES << 
-from pygame import Rect as Rectangle # I like longer variable names
-from pygame import Color as Colour # UK > US
+from classes.rectangle import Rectangle # Stands in for pygame's Rect so the core doesn't need pygame
+from classes.colour import Colour # UK > US
 
 from classes.vector2d import Vector2 # 2D Vector Class from pygame
 from classes.udim2 import UDim2 # UDim2 >> Allows me to quickly position UI elements using a mixture of % and px
@@ -16,11 +16,19 @@ from shared.settings import screenSize,classNames # Grab settings like gravity,
 
 from copy import deepcopy,copy # Copy >> Allows me to deepCopy whole classes (Useful for Cloning)
 from uuid import uuid1 as UUID # ID Generation
+from bisect import bisect_left, bisect_right # Keeps each instance's children in ZIndex order without sorting them
+from itertools import count
+
+# >> GLOBALS <<
+
+addOrder = count() # Ties between equal ZIndexes go to whichever child was added first
 
 # >> CLASS <<
 class UIBase: # No Inheritance necessary.
 
-	__slots__ = ["Name", "Visible", "Colour", "ZIndex", "ID", "ClassName", "_Rotation", "_Parent", "_Position", "_Size", "_Vertices", "_Children"]
+	__slots__ = ["_Name", "_Visible", "Colour", "_ZIndex", "ID", "ClassName", "_Rotation", "_Parent", "_Position", "_Size", "_Vertices", "_Children",
+		"_ChildrenByName", "_ChildrenByClass", "_Ordered", "_OrderKeys", "_OrderKey", "_Descendants", "_DescendantsShared",
+		"_AbsolutePosition", "_AbsoluteSize", "_TransformGeneration", "_TreeVersion", "_Kept"]
 
 
 	def __init__(self, className, parent=None):
@@ -30,25 +38,37 @@ class UIBase: # No Inheritance necessary.
 		else:
 			raise ValueError(f"Unknown className, {className}")
 		# >> Attributes
-		self.Name = ""
-		self.Visible = True
+		self._Name = ""
+		self._Visible = True # Not in a tree yet, so there's nothing to tell
 		self.Colour = Colour(255,255,255)
-		self.ZIndex = 0
+		self._ZIndex = 0
 		self.ID = UUID()
 		if self.ClassName == "Polygon":
 			self._Rotation = 0 # In radians to simplify calculations
 		# >> Private Attributes
+		self._AbsolutePosition = None # Worked out the first time they're read, and thrown away by _InvalidateTransforms
+		self._AbsoluteSize = None
+		self._TransformGeneration = 0 # Goes up every time they're thrown away, see TransformGeneration
 		self._Parent = parent
 		self._Position = UDim2(0,0,0,0)
 		self._Size = UDim2(1,0,1,0)
 		self._Vertices = [] # List of UDim2 Values for easy manipulation
-		self._Children = []
+		self._Children = {} # ID >> child, in the order they were added
+		self._ChildrenByName = {} # Name >> {ID >> child}, so finding a child by name doesn't look through them all
+		self._ChildrenByClass = {} # ClassName >> {ID >> child}
+		self._Ordered = [] # Children sorted by _OrderKey, which is the order GetChildren gives
+		self._OrderKeys = [] # Their _OrderKeys, to bisect
+		self._OrderKey = None # (ZIndex, when it was added) while it has a parent
+		self._Descendants = [] # What GetDescendants returns, kept up to date as children come and go. None when it has to be rebuilt.
+		self._DescendantsShared = False # Handed out by GetDescendants, so it's copied before being changed
+		self._TreeVersion = 0 # Goes up whenever anything in this subtree is reparented or has its ZIndex or Visible changed, see _TreeChanged
+		self._Kept = None # Things that should live exactly as long as this does, see _Keep
 
 	def __del__(self): # Deletion Behaviour
 		if self._Parent:
 			self._Parent._RemoveChild(self)
 		if self._Children:
-			for child in self._Children:
+			for child in list(self._Children.values()):
 				del(child)
 
 	def __eq__(self, other):
@@ -63,17 +83,15 @@ class UIBase: # No Inheritance necessary.
 	__repr__=__str__
 
 	def __getitem__(self, index):
-		if self._Children:
-			for child in self._Children:
-				if child.Name == index:
-					return child
+		named = self._ChildrenByName.get(index)
+		if named:
+			return next(iter(named.values())) # The first child added with that name
 		raise ValueError(f"{str(self)} has no such child {index}")
 
 	def __getattr__(self, index):
-		if self.__getattribute__("_Children"):
-			for child in self.__getattribute__("_Children"):
-				if child.Name == index:
-					return child
+		named = self.__getattribute__("_ChildrenByName").get(index)
+		if named:
+			return next(iter(named.values()))
 		raise AttributeError(f"{str(self)} has no such attribute {index}")
 	
 	def IsDescendantOfClass(self, className):
@@ -84,29 +102,123 @@ class UIBase: # No Inheritance necessary.
 		else:
 			return False
 
-	def _AddChild(self, newChild):
-		if not newChild in self._Children:
-			self._Children.append(newChild)
+	def FindFirstAncestorOfClass(self, className): # Includes itself, like IsDescendantOfClass
+		instance = self
+		while instance != None and instance.ClassName != className:
+			instance = instance.Parent
+		return instance or False
 
-	def _RemoveChild(self, oldChild):
-		if oldChild in self._Children:
-			self._Children.remove(oldChild)
+	def _InvalidateTransforms(self): # Called when this instance's absolute position may have changed. Subclasses clear their caches here.
+		self._AbsolutePosition = None
+		self._AbsoluteSize = None
+		self._TransformGeneration += 1
+		for child in self._Children.values():
+			child._InvalidateTransforms()
+
+	# >> CHILD INDEXES << (every child is in _Children, _ChildrenByName, _ChildrenByClass and _Ordered.
+	# _Descendants starts with _Ordered, then each child's descendants in the same order.)
 
-	def GetChildren(self):
-		orderedChildren = copy(self._Children)
-		orderedChildren.sort(key=lambda n: n.ZIndex) # Order children by ZIndex for rendering.
-		return orderedChildren
+	def _AddChild(self, newChild):
+		if newChild.ID in self._Children:
+			return
+		self._Children[newChild.ID] = newChild
+		self._ChildrenByName.setdefault(newChild.Name, {})[newChild.ID] = newChild
+		self._ChildrenByClass.setdefault(newChild.ClassName, {})[newChild.ID] = newChild
+		newChild._OrderKey = (newChild.ZIndex, next(addOrder))
+		index = bisect_right(self._OrderKeys, newChild._OrderKey)
+		self._OrderKeys.insert(index, newChild._OrderKey)
+		self._Ordered.insert(index, newChild)
+		if newChild._Children: # Its descendants have to go in too, so it's simplest to rebuild
+			self._Descendants = None
+		elif self._Descendants != None:
+			self._EditableDescendants().insert(index, newChild)
+		self._DescendantsChanged()
+		self._TreeChanged()
 
-	def GetDescendants(self):
-		descendantList = self.GetChildren()
-		for i in range(len(descendantList)):
-			for subChild in descendantList[i].GetDescendants():
-				descendantList.append(subChild)
-		return descendantList
+	def _RemoveChild(self, oldChild):
+		if not oldChild.ID in self._Children:
+			return
+		del self._Children[oldChild.ID]
+		for index, key in ((self._ChildrenByName, oldChild.Name), (self._ChildrenByClass, oldChild.ClassName)):
+			del index[key][oldChild.ID]
+			if not index[key]:
+				del index[key]
+		index = bisect_left(self._OrderKeys, oldChild._OrderKey)
+		del self._OrderKeys[index]
+		del self._Ordered[index]
+		oldChild._OrderKey = None
+		if oldChild._Children:
+			self._Descendants = None
+		elif self._Descendants != None:
+			del self._EditableDescendants()[index]
+		self._DescendantsChanged()
+		self._TreeChanged()
+
+	def _Reorder(self, child, newZIndex): # Moves child to where its new ZIndex puts it, keeping when it was added for ties
+		index = bisect_left(self._OrderKeys, child._OrderKey)
+		del self._OrderKeys[index]
+		del self._Ordered[index]
+		child._OrderKey = (newZIndex, child._OrderKey[1])
+		index = bisect_right(self._OrderKeys, child._OrderKey)
+		self._OrderKeys.insert(index, child._OrderKey)
+		self._Ordered.insert(index, child)
+		self._Descendants = None
+		self._DescendantsChanged()
+
+	def _Rename(self, child, oldName): # Moves child between name indexes
+		del self._ChildrenByName[oldName][child.ID]
+		if not self._ChildrenByName[oldName]:
+			del self._ChildrenByName[oldName]
+		self._ChildrenByName.setdefault(child.Name, {})[child.ID] = child
+
+	def _EditableDescendants(self): # _Descendants, copied first if _DescendantList has handed it out
+		if self._DescendantsShared:
+			self._Descendants = self._Descendants[:]
+			self._DescendantsShared = False
+		return self._Descendants
+
+	def _DescendantsChanged(self): # Something under this changed, so every ancestor's descendant list is out of date.
+		ancestor = self._Parent # Anything already out of date has out of date ancestors too, so it can stop there
+		while ancestor != None and ancestor._Descendants != None:
+			ancestor._Descendants = None
+			ancestor = ancestor._Parent
+
+	def _Keep(self, value): # State filed by ID in weak dictionaries, like a Workspace's broadphase or a root's draw list,
+		if self._Kept == None: # is held here, so it is thrown away along with the instance it belongs to
+			self._Kept = []
+		self._Kept.append(value)
+
+	def _Release(self, value): # Stops holding value, so it goes as soon as nothing else uses it
+		if self._Kept:
+			self._Kept = [kept for kept in self._Kept if kept is not value]
+
+	def _TreeChanged(self): # Bumps the version of every subtree this is in, so draw lists of just those rebuild
+		instance = self
+		while instance != None:
+			instance._TreeVersion += 1
+			instance = instance._Parent
+
+	def GetChildren(self): # Ordered by ZIndex for rendering. A copy, so it's safe to change.
+		return self._Ordered[:]
+
+	def GetDescendants(self): # Children by ZIndex, then each of their descendants. A copy, so it's safe to change.
+		return self._CachedDescendants()[:]
+
+	def _DescendantList(self): # The list GetDescendants copies, for the engine to read every frame without copying. Never change it.
+		self._DescendantsShared = True # So it's copied before the tree next edits it, rather than changing under whoever holds it
+		return self._CachedDescendants()
+
+	def _CachedDescendants(self):
+		if self._Descendants == None:
+			descendantList = self._Ordered[:]
+			for child in self._Ordered:
+				descendantList.extend(child._CachedDescendants())
+			self._Descendants = descendantList
+		return self._Descendants
 
 	def RemoveChildren(self):
 		if self._Children:
-			for child in self._Children:
+			for child in list(self._Children.values()):
 				del(child)
 
 	def Clone(self):
@@ -122,23 +234,17 @@ class UIBase: # No Inheritance necessary.
 		clone._Position = self.Position
 		clone._Size = self._Size
 		clone._Vertices = deepcopy(self._Vertices)
-		clone._Children = []
-		for child in self._Children:
+		for child in self._Children.values():
 			subChild = child.Clone()
 			subChild.Parent = clone
 		return clone
 
 	def FindFirstChildOfClass(self, className):
-		for child in self._Children:
-			if child.ClassName == className:
-				return child
-		return False
+		ofClass = self._ChildrenByClass.get(className)
+		return next(iter(ofClass.values())) if ofClass else False
 
 	def FindFirstChildOfID(self, ID):
-		for child in self._Children:
-			if child.ID == ID:
-				return child
-		return False
+		return self._Children.get(ID, False)
 
 	def AddVertex(self, newVertex): 
 		self._Vertices.append(newVertex)
@@ -152,6 +258,39 @@ class UIBase: # No Inheritance necessary.
 	def SetVertices(self, newVertices):
 		self._Vertices = newVertices
 
+	@property
+	def Name(self):
+		return self._Name
+
+	@Name.setter
+	def Name(self, newName):
+		oldName = self._Name
+		self._Name = newName
+		if self._Parent and self._OrderKey != None and newName != oldName:
+			self._Parent._Rename(self, oldName)
+
+	@property
+	def Visible(self):
+		return self._Visible
+
+	@Visible.setter
+	def Visible(self, newVisible):
+		if newVisible != self._Visible:
+			self._Visible = newVisible
+			self._TreeChanged()
+
+	@property
+	def ZIndex(self):
+		return self._ZIndex
+
+	@ZIndex.setter
+	def ZIndex(self, newZIndex):
+		if newZIndex != self._ZIndex:
+			if self._Parent and self._OrderKey != None:
+				self._Parent._Reorder(self, newZIndex)
+			self._ZIndex = newZIndex
+			self._TreeChanged()
+
 	@property
 	def Parent(self):
 		return self._Parent
@@ -163,22 +302,31 @@ class UIBase: # No Inheritance necessary.
 		self._Parent = newParent
 		if newParent:
 			newParent._AddChild(self)
-			while not newParent.FindFirstChildOfID(self.ID):
-				pass
+		self._InvalidateTransforms()
+
+	# Absolute transforms are cached until Position, Size or Parent change here or further up. Don't modify what they return.
+
+	@property
+	def TransformGeneration(self): # Goes up every time the cached transforms are thrown away, so anything built from them can tell it's stale
+		return self._TransformGeneration
 
 	@property
 	def AbsoluteSize(self):
-		if self.Parent:
-			return self.Size.ToVector2(self.Parent.AbsoluteSize)
-		else:
-			return Vector2(screenSize[0], screenSize[1])
+		if self._AbsoluteSize == None:
+			if self.Parent:
+				self._AbsoluteSize = self.Size.ToVector2(self.Parent.AbsoluteSize)
+			else:
+				self._AbsoluteSize = Vector2(screenSize[0], screenSize[1])
+		return self._AbsoluteSize
 
 	@property
 	def AbsolutePosition(self):
-		if self.Parent:
-			return self.Position.ToVector2(self.Parent.AbsoluteSize) + self.Parent.AbsolutePosition
-		else:
-			return self.Position.ToVector2(Vector2(screenSize[0], screenSize[1]))
+		if self._AbsolutePosition == None:
+			if self.Parent:
+				self._AbsolutePosition = self.Position.ToVector2(self.Parent.AbsoluteSize) + self.Parent.AbsolutePosition
+			else:
+				self._AbsolutePosition = self.Position.ToVector2(Vector2(screenSize[0], screenSize[1]))
+		return self._AbsolutePosition
 
 	@property
 	def SpriteVertices(self):
@@ -198,8 +346,8 @@ class UIBase: # No Inheritance necessary.
 	@property
 	def Vertices(self):
 		if self._Vertices:
-			center = self.SpriteCenter
-			return [(vertex-center).rotatedRadians(self.Rotation) + self.AbsolutePosition for vertex in self.SpriteVertices]
+			center, position = self.SpriteCenter, self.AbsolutePosition
+			return [(vertex-center).rotatedRadians(self.Rotation) + position for vertex in self.SpriteVertices]
 		else:
 			return []
 	
@@ -210,6 +358,7 @@ class UIBase: # No Inheritance necessary.
 	@Size.setter
 	def Size(self, newSize):
 		self._Size = newSize
+		self._InvalidateTransforms()
 
 	@property
 	def Position(self):
@@ -218,13 +367,12 @@ class UIBase: # No Inheritance necessary.
 	@Position.setter
 	def Position(self, newPosition):
 		self._Position = newPosition
+		self._InvalidateTransforms()
 	
 	@property
 	def Rectangle(self):
-		return Rectangle(
-			self.AbsolutePosition.x, self.AbsolutePosition.y,
-			self.AbsoluteSize.x, self.AbsoluteSize.y
-			)
+		position, size = self.AbsolutePosition, self.AbsoluteSize
+		return Rectangle(position.x, position.y, size.x, size.y)
 
 	@property
 	def Rotation(self):
@@ -244,13 +392,13 @@ class UIBase: # No Inheritance necessary.
 	def Tree(self):
 		string = str(self)
 		if self._Children:
-			for idx,child in enumerate(self._Children):
+			for idx,child in enumerate(self._Children.values()):
 				string = string +f"\n{idx+1}."+ child._DescendantTree(1)
 		return string
 
 	def _DescendantTree(self, depth=0):
 		string = "".join("\t" for i in range(0, depth)) + str(self)
 		if self._Children:
-			for idx,child in enumerate(self._Children):
+			for idx,child in enumerate(self._Children.values()):
 				string = string +f"\n{idx+1}."+ child._DescendantTree(depth+1)
 		return string
\ No newline at end of file
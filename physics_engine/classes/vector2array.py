@@ -0,0 +1,207 @@
+# >> CREDITS <<
+# Vector2Array.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This is a module that contains a Vector2Array Class
+# It holds lots of 2D vectors in one NumPy (N,2) array and does the same maths as Vector2 on all of them at once,
+# so a vertex list can be rotated, moved and projected without making a Vector2 per vertex.
+# Indexing and iterating give back Vector2s, so it can stand in for a list of Vector2s anywhere one is read.
+# NumPy is only imported the first time a Vector2Array is made.
+# Each call costs a few microseconds however few vectors there are, so it only wins past about 8 of them (benchmarks/vector2array.py).
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+
+# >> FUNCTIONS <<
+
+def loadNumpy():
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("Vector2Array needs NumPy, install numpy or use lists of Vector2")
+		numpy = module
+
+def wrapArray(array): # A Vector2Array using array, an (N,2) float array, without copying it
+	vectors = Vector2Array.__new__(Vector2Array)
+	vectors.Array = array
+	return vectors
+
+def asRows(other): # other as something that broadcasts against an (N,2) array: (N,2), (2,) or a number
+	if isinstance(other, Vector2Array):
+		return other.Array
+	if isinstance(other, Vector2):
+		return numpy.array((other.x, other.y))
+	if hasattr(other, "__getitem__") and not hasattr(other, "shape"):
+		return numpy.array((other[0], other[1]), dtype=float)
+	if hasattr(other, "shape") and other.ndim == 1 and len(other) != 2: # One number per row, like lengths
+		return other[:, None]
+	return other
+
+# >> CLASSES <<
+
+class Vector2Array:
+
+	__slots__ = ["Array"]
+
+	def __init__(self, vectors=()): # vectors is a list of Vector2s or pairs, another Vector2Array, or an (N,2) array
+		loadNumpy()
+		if isinstance(vectors, Vector2Array):
+			self.Array = vectors.Array.copy()
+		elif hasattr(vectors, "shape"):
+			self.Array = numpy.array(vectors, dtype=float).reshape(-1, 2)
+		else:
+			self.Array = numpy.array([(vector[0], vector[1]) for vector in vectors], dtype=float).reshape(-1, 2)
+
+	def __repr__(self):
+		return f"Vector2Array({self.Array.tolist()})"
+
+	# >> SEQUENCE << (so it can be read like a list of Vector2s)
+
+	def __len__(self):
+		return len(self.Array)
+
+	def __iter__(self):
+		return map(Vector2, self.Array[:, 0].tolist(), self.Array[:, 1].tolist())
+
+	def __getitem__(self, key):
+		if isinstance(key, slice):
+			return wrapArray(self.Array[key])
+		x, y = self.Array[key].tolist()
+		return Vector2(x, y)
+
+	def __setitem__(self, key, value):
+		self.Array[key] = asRows(value)
+
+	def __eq__(self, other):
+		if isinstance(other, Vector2Array):
+			return self.Array.shape == other.Array.shape and bool((self.Array == other.Array).all())
+		if isinstance(other, list) and len(other) == len(self):
+			return all(vector == pair for vector, pair in zip(self, other))
+		return False
+
+	def __ne__(self, other):
+		return not self == other
+
+	def __getstate__(self):
+		return self.Array.tolist()
+
+	def __setstate__(self, state):
+		loadNumpy()
+		self.Array = numpy.array(state, dtype=float).reshape(-1, 2)
+
+	def append(self, vector): # Copies the whole array, so build from a list if there are lots to add
+		self.Array = numpy.vstack((self.Array, asRows(vector)))
+
+	def remove(self, vector): # Removes the first row equal to vector, like list.remove
+		matches = numpy.flatnonzero((self.Array == asRows(vector)).all(axis=1))
+		if not len(matches):
+			raise ValueError(f"{vector} is not in the Vector2Array")
+		self.Array = numpy.delete(self.Array, matches[0], axis=0)
+
+	def tolist(self):
+		return list(self)
+
+	@property
+	def x(self):
+		return self.Array[:, 0]
+
+	@property
+	def y(self):
+		return self.Array[:, 1]
+
+	# >> ARITHMETIC << (with another Vector2Array row by row, or with one Vector2 or number for every row)
+
+	def __add__(self, other):
+		return wrapArray(self.Array + asRows(other))
+	__radd__ = __add__
+
+	def __sub__(self, other):
+		return wrapArray(self.Array - asRows(other))
+
+	def __rsub__(self, other):
+		return wrapArray(asRows(other) - self.Array)
+
+	def __mul__(self, other):
+		return wrapArray(self.Array * asRows(other))
+	__rmul__ = __mul__
+
+	def __truediv__(self, other):
+		return wrapArray(self.Array / asRows(other))
+
+	def __neg__(self):
+		return wrapArray(-self.Array)
+
+	# >> VECTOR FUNCTIONS << (named like Vector2's. Ones that give a number per vector give an (N,) array.)
+
+	def get_length_sqrd(self):
+		return numpy.einsum("ij,ij->i", self.Array, self.Array)
+
+	def get_length(self):
+		return numpy.sqrt(self.get_length_sqrd())
+
+	def normalized(self): # Zero length vectors stay as they are, like Vector2.normalized
+		lengths = self.get_length()
+		return wrapArray(self.Array / numpy.where(lengths == 0, 1, lengths)[:, None])
+
+	def rotatedRadians(self, radians):
+		cos, sin = numpy.cos(radians), numpy.sin(radians)
+		x, y = self.Array[:, 0], self.Array[:, 1]
+		return wrapArray(numpy.column_stack((x*cos - y*sin, x*sin + y*cos)))
+
+	def perpendicular(self):
+		return wrapArray(numpy.column_stack((-self.Array[:, 1], self.Array[:, 0])))
+
+	def perpendicular_normal(self):
+		return self.perpendicular().normalized()
+
+	def dot(self, other):
+		if isinstance(other, Vector2Array):
+			return numpy.einsum("ij,ij->i", self.Array, other.Array)
+		return self.Array @ asRows(other)
+
+	def cross(self, other):
+		other = asRows(other)
+		if other.ndim == 1:
+			return self.Array[:, 0]*other[1] - self.Array[:, 1]*other[0]
+		return self.Array[:, 0]*other[:, 1] - self.Array[:, 1]*other[:, 0]
+
+	def projection(self, other): # Every vector projected onto other
+		other = asRows(other)
+		if other.ndim == 1:
+			return wrapArray(numpy.outer(self.Array @ other / (other @ other), other))
+		scale = numpy.einsum("ij,ij->i", self.Array, other) / numpy.einsum("ij,ij->i", other, other)
+		return wrapArray(other * scale[:, None])
+
+	def edges(self): # Vector from each vertex to the next, wrapping round, for a polygon's vertices
+		return wrapArray(numpy.roll(self.Array, -1, axis=0) - self.Array)
+
+	def bounds(self): # (minX, minY, maxX, maxY)
+		low, high = self.Array.min(axis=0).tolist(), self.Array.max(axis=0).tolist()
+		return (low[0], low[1], high[0], high[1])
+
+class FrozenVector2Array(Vector2Array): # A Vector2Array that can't be changed, for a Shape's vertices which bodies share
+
+	__slots__ = []
+
+	def __init__(self, vectors=()):
+		Vector2Array.__init__(self, vectors)
+		self.Array.flags.writeable = False
+
+	def __setstate__(self, state):
+		Vector2Array.__setstate__(self, state)
+		self.Array.flags.writeable = False
+
+	def __setitem__(self, key, value):
+		raise TypeError("FrozenVector2Array can't be changed, change a copy made with Vector2Array(vectors)")
+
+	def append(self, vector):
+		raise TypeError("FrozenVector2Array can't be changed, change a copy made with Vector2Array(vectors)")
+
+	def remove(self, vector):
+		raise TypeError("FrozenVector2Array can't be changed, change a copy made with Vector2Array(vectors)")
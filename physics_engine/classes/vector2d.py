@@ -369,3 +369,38 @@ class Vector2(object):
 
     def __setstate__(self, dict):
         self.x, self.y = dict
+
+class FrozenVector2(Vector2):
+    "A Vector2 that can't be changed, for vectors shared between bodies like a Shape's vertices"
+    __slots__ = []
+
+    def __init__(self, x_or_pair=None, y = None):
+        vector = Vector2(x_or_pair, y)
+        object.__setattr__(self, 'x', vector.x)
+        object.__setattr__(self, 'y', vector.y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenVector2 can't be changed, change a copy made with Vector2(vector)")
+
+    # In-place operators hand back a new Vector2, so "vector += other" rebinds instead of changing the shared one
+    def __iadd__(self, other):
+        return self + other
+    def __isub__(self, other):
+        return self - other
+    def __imul__(self, other):
+        return self * other
+    def __itruediv__(self, other):
+        return self / other
+    def __ifloordiv__(self, other):
+        return self // other
+    def __floor__(self):
+        return Vector2(math.floor(self.x), math.floor(self.y))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (FrozenVector2, (self.x, self.y))
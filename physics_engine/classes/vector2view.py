@@ -0,0 +1,56 @@
+# >> CREDITS <<
+# Vector2View.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This is a module that contains a Vector2View Class
+# It is what a RigidBody's Position, Velocity and Acceleration read as.
+# Changing one in place (body.Position.x += 5) goes back through the body, so its cached geometry is thrown away
+# the same as if the whole vector had been assigned, whether the body's state is kept on it or in a BodyStore.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+
+# >> CLASSES <<
+
+class Vector2View(Vector2): # A Vector2 that reads and writes one of a body's vectors, wherever the body's state is kept
+	# The row is looked up through the body every time, so a view kept hold of still works after rows are moved,
+	# the arrays are grown or the body leaves the store.
+
+	__slots__ = ["_Body", "_Field"]
+
+	def __init__(self, body, field):
+		self._Body = body
+		self._Field = field
+
+	def _Get(self, column):
+		body = self._Body
+		store = body._Store
+		if store:
+			return float(getattr(store, self._Field)[body._StoreIndex, column])
+		return getattr(body, "_"+self._Field)[column]
+
+	def _Set(self, column, value):
+		body = self._Body
+		store = body._Store
+		if store:
+			getattr(store, self._Field)[body._StoreIndex, column] = value
+			store.Generation[body._StoreIndex] += 1 # So the body's cached geometry notices
+		else: # Assigned through the body's setter, which clears the caches a Position change leaves stale
+			vector = getattr(body, "_"+self._Field)
+			setattr(body, self._Field, Vector2(value, vector.y) if column == 0 else Vector2(vector.x, value))
+
+	@property
+	def x(self):
+		return self._Get(0)
+
+	@x.setter
+	def x(self, value):
+		self._Set(0, value)
+
+	@property
+	def y(self):
+		return self._Get(1)
+
+	@y.setter
+	def y(self, value):
+		self._Set(1, value)
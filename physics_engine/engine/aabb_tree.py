@@ -0,0 +1,248 @@
+# >> CREDITS <<
+# AABB_Tree.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module contains a dynamic bounding volume tree of axis aligned boxes.
+# Leaves hold fattened boxes so a moving body is only reinserted once it leaves its fat box.
+# It works as a broadphase (GetPairs) and also answers region queries (QueryRegion).
+# Insertion and balancing follow the approach used by Box2D's b2DynamicTree.
+
+# >> MODULES <<
+from classes import rigidbody # For parentChangedListeners
+from engine.broadphase import boxesOverlap, orderPairs
+from shared.settings import treeMargin
+
+# >> UTILITY FUNCTIONS <<
+
+def combineBoxes(boxOne, boxTwo):
+	return (min(boxOne[0], boxTwo[0]), min(boxOne[1], boxTwo[1]), max(boxOne[2], boxTwo[2]), max(boxOne[3], boxTwo[3]))
+
+def perimeter(box): # 2D version of surface area, used as the cost of a node
+	return 2*((box[2]-box[0]) + (box[3]-box[1]))
+
+def containsBox(outer, inner):
+	return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+def fattenBox(box, margin):
+	return (box[0]-margin, box[1]-margin, box[2]+margin, box[3]+margin)
+
+# >> CLASSES <<
+
+class TreeNode:
+
+	__slots__ = ["Box", "TightBox", "Parent", "Left", "Right", "Height", "Shape", "Index"]
+
+	def __init__(self, box, shape=None):
+		self.Box = box # Fat box for leaves, union of the children for branches
+		self.TightBox = box # Actual bounding box of the shape. Only used by leaves.
+		self.Parent = None
+		self.Left = None
+		self.Right = None
+		self.Height = 0 # Leaves have height 0
+		self.Shape = shape
+		self.Index = 0 # Position of the shape in the last list passed to GetPairs
+
+	@property
+	def IsLeaf(self):
+		return self.Left == None
+
+class AABBTree:
+
+	__slots__ = ["Root", "Margin", "Workspace", "CandidatePairs", "PrunedPairs", "Reinsertions", "_Leaves", "__weakref__"]
+
+	def __init__(self, margin=treeMargin):
+		self.Root = None
+		self.Margin = margin # How far leaf boxes are fattened
+		self.Workspace = None # The Workspace being watched for reparenting, if any
+		self.CandidatePairs = 0
+		self.PrunedPairs = 0
+		self.Reinsertions = 0 # How many leaves had to be reinserted last frame
+		self._Leaves = {} # Shape ID >> leaf
+
+	def __len__(self):
+		return len(self._Leaves)
+
+	# >> MEMBERSHIP <<
+
+	def Watch(self, workspace): # Insert and remove bodies as soon as they are parented in or out of workspace
+		self.Workspace = workspace
+		rigidbody.addParentChangedListener(self._ParentChanged)
+		for descendant in workspace._DescendantList():
+			self.Insert(descendant)
+
+	def Unwatch(self):
+		rigidbody.removeParentChangedListener(self._ParentChanged)
+		self.Workspace = None
+
+	def _ParentChanged(self, body, oldParent, newParent):
+		inside = newParent != None and newParent.FindFirstAncestorOfClass("Workspace") == self.Workspace
+		for shape in [body] + body._DescendantList(): # Children move with their parent
+			if inside:
+				self.Insert(shape)
+			else:
+				self.Remove(shape)
+
+	def Insert(self, shape):
+		if shape.ID in self._Leaves:
+			return self._Leaves[shape.ID]
+		tightBox = shape.BoundingBox
+		leaf = TreeNode(fattenBox(tightBox, self.Margin), shape)
+		leaf.TightBox = tightBox
+		self._Leaves[shape.ID] = leaf
+		self._InsertLeaf(leaf)
+		return leaf
+
+	def Remove(self, shape):
+		if shape.ID in self._Leaves:
+			self._RemoveLeaf(self._Leaves.pop(shape.ID))
+
+	def Update(self, shape, tightBox=None): # Refits a shape's leaf, only reinserting it if it left its fat box.
+		leaf = self._Leaves.get(shape.ID) or self.Insert(shape) # tightBox replaces the shape's BoundingBox, like a swept box.
+		tightBox = tightBox or shape.BoundingBox
+		leaf.TightBox = tightBox
+		if containsBox(leaf.Box, tightBox):
+			return False
+		self._RemoveLeaf(leaf)
+		leaf.Box = fattenBox(tightBox, self.Margin)
+		self._InsertLeaf(leaf)
+		return True
+
+	# >> QUERIES <<
+
+	def _QueryLeaves(self, box):
+		leaves = []
+		stack = [self.Root] if self.Root else []
+		while stack:
+			node = stack.pop()
+			if boxesOverlap(node.Box, box):
+				if node.IsLeaf:
+					leaves.append(node)
+				else:
+					stack.append(node.Left)
+					stack.append(node.Right)
+		return leaves
+
+	def QueryRegion(self, box): # Shapes whose bounding box overlaps box, given as (minX, minY, maxX, maxY)
+		return [leaf.Shape for leaf in self._QueryLeaves(box) if boxesOverlap(leaf.TightBox, box)]
+
+	def GetPairs(self, shapes, swept=None):
+		present = set()
+		self.Reinsertions = 0
+		for i, shape in enumerate(shapes): # Bodies parented before the tree existed are picked up here too
+			present.add(shape.ID)
+			if self.Update(shape, swept.get(shape.ID) if swept else None):
+				self.Reinsertions += 1
+			self._Leaves[shape.ID].Index = i
+		for key in [key for key in self._Leaves if not key in present]:
+			self._RemoveLeaf(self._Leaves.pop(key))
+		indexPairs = []
+		for shape in shapes:
+			leaf = self._Leaves[shape.ID]
+			for other in self._QueryLeaves(leaf.TightBox):
+				if other.Index > leaf.Index and boxesOverlap(leaf.TightBox, other.TightBox):
+					indexPairs.append((leaf.Index, other.Index))
+		n = len(shapes)
+		self.CandidatePairs = len(indexPairs)
+		self.PrunedPairs = n*(n-1)//2 - len(indexPairs)
+		return orderPairs(indexPairs, shapes)
+
+	# >> TREE MAINTENANCE <<
+
+	def _ReplaceChild(self, parent, oldChild, newChild):
+		if parent == None:
+			self.Root = newChild
+		elif parent.Left is oldChild:
+			parent.Left = newChild
+		else:
+			parent.Right = newChild
+
+	def _InsertLeaf(self, leaf):
+		if self.Root == None:
+			self.Root = leaf
+			leaf.Parent = None
+			return
+		box = leaf.Box
+		node = self.Root
+		while not node.IsLeaf: # Walk down picking the child that grows the least
+			area = perimeter(node.Box)
+			combinedArea = perimeter(combineBoxes(node.Box, box))
+			cost = 2*combinedArea # Cost of making a new parent for this node and the leaf
+			inheritance = 2*(combinedArea-area) # Cost of pushing the leaf further down
+			costs = []
+			for child in (node.Left, node.Right):
+				childCost = perimeter(combineBoxes(box, child.Box)) + inheritance
+				if not child.IsLeaf:
+					childCost -= perimeter(child.Box)
+				costs.append(childCost)
+			if cost < costs[0] and cost < costs[1]:
+				break
+			node = node.Left if costs[0] < costs[1] else node.Right
+		sibling = node
+		oldParent = sibling.Parent
+		newParent = TreeNode(combineBoxes(box, sibling.Box))
+		newParent.Parent = oldParent
+		newParent.Height = sibling.Height+1
+		self._ReplaceChild(oldParent, sibling, newParent)
+		newParent.Left, newParent.Right = sibling, leaf
+		sibling.Parent, leaf.Parent = newParent, newParent
+		self._Refit(oldParent)
+
+	def _RemoveLeaf(self, leaf):
+		if leaf is self.Root:
+			self.Root = None
+			return
+		parent = leaf.Parent
+		grandParent = parent.Parent
+		sibling = parent.Right if parent.Left is leaf else parent.Left
+		self._ReplaceChild(grandParent, parent, sibling)
+		sibling.Parent = grandParent
+		leaf.Parent = None
+		self._Refit(grandParent)
+
+	def _Refit(self, node): # Walks back up to the root fixing boxes and heights
+		while node != None:
+			node = self._Balance(node)
+			node.Height = 1+max(node.Left.Height, node.Right.Height)
+			node.Box = combineBoxes(node.Left.Box, node.Right.Box)
+			node = node.Parent
+
+	def _Balance(self, a): # Rotates a subtree whose children differ in height by more than one
+		if a.IsLeaf or a.Height < 2:
+			return a
+		b, c = a.Left, a.Right
+		balance = c.Height - b.Height
+		if balance > 1: # Rotate c up
+			f, g = c.Left, c.Right
+			c.Left = a
+			c.Parent = a.Parent
+			a.Parent = c
+			self._ReplaceChild(c.Parent, a, c)
+			if f.Height > g.Height:
+				c.Right, a.Right = f, g
+				g.Parent = a
+			else:
+				c.Right, a.Right = g, f
+				f.Parent = a
+			a.Box = combineBoxes(b.Box, a.Right.Box)
+			a.Height = 1+max(b.Height, a.Right.Height)
+			c.Box = combineBoxes(a.Box, c.Right.Box)
+			c.Height = 1+max(a.Height, c.Right.Height)
+			return c
+		if balance < -1: # Rotate b up
+			d, e = b.Left, b.Right
+			b.Left = a
+			b.Parent = a.Parent
+			a.Parent = b
+			self._ReplaceChild(b.Parent, a, b)
+			if d.Height > e.Height:
+				b.Right, a.Left = d, e
+				e.Parent = a
+			else:
+				b.Right, a.Left = e, d
+				d.Parent = a
+			a.Box = combineBoxes(c.Box, a.Left.Box)
+			a.Height = 1+max(c.Height, a.Left.Height)
+			b.Box = combineBoxes(a.Box, b.Right.Box)
+			b.Height = 1+max(a.Height, b.Right.Height)
+			return b
+		return a
@@ -0,0 +1,173 @@
+# >> CREDITS <<
+# Batch_Collision_Handler.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module does the same Separating Axis Theorem test as collision_handler.py,
+# but for every candidate pair at once using NumPy instead of one pair at a time.
+# It gives back the same (a, b, mtv, point, impulse) records as checkCollisions, in the same order.
+# findSeparationsBatched does the same for the contact manifolds in collisions.py.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from shared.settings import elasticity
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+chunkSize = 4096 # Pairs handled per NumPy call, keeps the (pairs, axes, vertices) arrays a sensible size
+
+# >> FUNCTIONS <<
+
+def loadNumpy(): # Only needed when batchNarrowphase is switched on
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("The batched narrowphase needs NumPy, turn batchNarrowphase off or install numpy")
+		numpy = module
+
+def packShapes(shapes): # Pads every shape's vertices and axes to the same length so they all fit in one array
+	rows = {} # Shape ID >> row
+	unique = []
+	for shape in shapes:
+		if not shape.ID in rows:
+			rows[shape.ID] = len(unique)
+			unique.append(shape)
+	worldVertices = [shape.Vertices for shape in unique]
+	worldAxes = [shape.Axes for shape in unique]
+	longest = max((len(shapeVertices) for shapeVertices in worldVertices), default=0)
+	mostAxes = max((len(shapeAxes) for shapeAxes in worldAxes), default=0)
+	vertices = numpy.zeros((len(unique), longest, 2))
+	counts = numpy.zeros(len(unique), dtype=int)
+	axes = numpy.zeros((len(unique), mostAxes, 2))
+	paired = numpy.zeros((len(unique), mostAxes), dtype=bool)
+	axisCounts = numpy.zeros(len(unique), dtype=int)
+	velocities = numpy.zeros((len(unique), 2))
+	for row, shape in enumerate(unique):
+		shapeVertices, shapeAxes = worldVertices[row], worldAxes[row]
+		counts[row], axisCounts[row] = len(shapeVertices), len(shapeAxes)
+		if shapeVertices:
+			vertices[row, :len(shapeVertices)] = [(vertex.x, vertex.y) for vertex in shapeVertices]
+		if shapeAxes:
+			axes[row, :len(shapeAxes)] = [(axis.x, axis.y) for axis, isPaired in shapeAxes]
+			paired[row, :len(shapeAxes)] = [isPaired for axis, isPaired in shapeAxes]
+		velocity = shape.Velocity
+		velocities[row] = velocity.x, velocity.y
+	axesValid = numpy.arange(mostAxes)[None, :] < axisCounts[:, None]
+	return vertices, counts, axes, paired & axesValid, axesValid, velocities, rows
+
+def project(axes, vertices): # (pairs, axes, 2) onto (pairs, vertices, 2) >> (pairs, axes, vertices)
+	return axes[:, :, None, 0]*vertices[:, None, :, 0] + axes[:, :, None, 1]*vertices[:, None, :, 1]
+
+def interleave(forwards, backwards): # (pairs, axes) twice >> (pairs, 2*axes) going forwards, backwards, forwards...
+	return numpy.stack((forwards, backwards), axis=2).reshape(forwards.shape[0], -1)
+
+def areShapesCollidingBatched(pairs, vertices, counts, axes, paired, axesValid, velocities, rows, elasticity=elasticity):
+	records = []
+	if not pairs:
+		return records
+	vertexValid = numpy.arange(vertices.shape[1])[None, :] < counts[:, None]
+	for start in range(0, len(pairs), chunkSize):
+		chunk = pairs[start:start+chunkSize]
+		one = numpy.array([rows[pair[0].ID] for pair in chunk])
+		two = numpy.array([rows[pair[1].ID] for pair in chunk])
+		# Axes are shape one's followed by shape two's, the same order as areShapesColliding
+		pairAxes = numpy.concatenate((axes[one], axes[two]), axis=1)
+		pairValid = numpy.concatenate((axesValid[one], axesValid[two]), axis=1)
+		pairPaired = numpy.concatenate((paired[one], paired[two]), axis=1)
+		relativeVelocity = velocities[two] - velocities[one]
+		velocityAlongNormal = pairAxes[:, :, 0]*relativeVelocity[:, None, 0] + pairAxes[:, :, 1]*relativeVelocity[:, None, 1]
+		forwards = pairValid & (velocityAlongNormal <= 0.1) # Directions the shapes are already separating along are skipped
+		backwards = pairPaired & (-velocityAlongNormal <= 0.1)
+		projectionsOne = project(pairAxes, vertices[one])
+		projectionsTwo = project(pairAxes, vertices[two])
+		validOne = vertexValid[one][:, None, :]
+		validTwo = vertexValid[two][:, None, :]
+		oneMax = numpy.where(validOne, projectionsOne, -numpy.inf).max(axis=2)
+		oneMin = numpy.where(validOne, projectionsOne, numpy.inf).min(axis=2)
+		twoMax = numpy.where(validTwo, projectionsTwo, -numpy.inf).max(axis=2)
+		twoMin = numpy.where(validTwo, projectionsTwo, numpy.inf).min(axis=2)
+		separated = ((twoMin > oneMax) | (oneMin > twoMax)) & (forwards | backwards)
+		colliding = ~separated.any(axis=1)
+		# Along -normal every projection is negated, so the maxima and minima swap over
+		forwardsDominant = oneMax > twoMax
+		backwardsDominant = -oneMin > -twoMin
+		used = interleave(forwards, backwards)
+		depths = interleave(
+			numpy.where(forwardsDominant, twoMax-oneMin, oneMax-twoMin),
+			numpy.where(backwardsDominant, (-twoMin)-(-oneMax), (-oneMin)-(-twoMax))
+		)
+		dominant = interleave(forwardsDominant, backwardsDominant)
+		# The point of collision is the average of the inferior shape's deepest vertices, which are its
+		# minima going forwards and its maxima going backwards.
+		deepest = interleave(numpy.where(forwardsDominant, twoMin, oneMin), numpy.where(backwardsDominant, twoMax, oneMax))
+		best = numpy.where(used, depths, numpy.inf).argmin(axis=1) # First of the shallowest, like the stable sort
+		pairIndices = numpy.arange(len(chunk))
+		bestAxis = best//2
+		bestBackwards = (best % 2) == 1
+		bestDominant = dominant[pairIndices, best]
+		selectedProjections = numpy.where(bestDominant[:, None], projectionsTwo[pairIndices, bestAxis], projectionsOne[pairIndices, bestAxis])
+		selectedVertices = numpy.where(bestDominant[:, None, None], vertices[two], vertices[one])
+		selectedValid = numpy.where(bestDominant[:, None], vertexValid[two], vertexValid[one])
+		minima = (selectedProjections == deepest[pairIndices, best][:, None]) & selectedValid
+		amountOfMinima = minima.sum(axis=1)
+		with numpy.errstate(divide="ignore", invalid="ignore"): # Only pairs that aren't colliding can have no minima
+			points = numpy.where(minima[:, :, None], selectedVertices, 0).sum(axis=1) / amountOfMinima[:, None]
+		direction = numpy.where(bestBackwards, -1, 1)
+		bestNormals = pairAxes[pairIndices, bestAxis] * direction[:, None]
+		bestDepths = depths[pairIndices, best]
+		impulses = velocityAlongNormal[pairIndices, bestAxis] * direction * -(1+elasticity)
+		for i in numpy.flatnonzero(colliding):
+			depth = float(bestDepths[i])
+			records.append((
+				chunk[i][0], chunk[i][1],
+				Vector2(float(bestNormals[i, 0])*depth, float(bestNormals[i, 1])*depth),
+				Vector2(float(points[i, 0]), float(points[i, 1])),
+				float(impulses[i])
+			))
+	return records
+
+def checkCollisionsBatched(pairs, elasticity=elasticity): # Drop in for the loop in checkCollisions
+	loadNumpy()
+	if not pairs:
+		return []
+	shapes = [shape for pair in pairs for shape in pair]
+	return areShapesCollidingBatched(pairs, *packShapes(shapes), elasticity)
+
+def findSeparationsBatched(pairs): # Same as collisions.findSeparation for every pair: (normal from A to B, depth), or None
+	loadNumpy()
+	if not pairs:
+		return []
+	vertices, counts, axes, paired, axesValid, velocities, rows = packShapes([shape for pair in pairs for shape in pair])
+	vertexValid = numpy.arange(vertices.shape[1])[None, :] < counts[:, None]
+	separations = []
+	for start in range(0, len(pairs), chunkSize):
+		chunk = pairs[start:start+chunkSize]
+		one = numpy.array([rows[pair[0].ID] for pair in chunk])
+		two = numpy.array([rows[pair[1].ID] for pair in chunk])
+		pairAxes = numpy.concatenate((axes[one], axes[two]), axis=1)
+		pairValid = numpy.concatenate((axesValid[one], axesValid[two]), axis=1)
+		projectionsOne = project(pairAxes, vertices[one])
+		projectionsTwo = project(pairAxes, vertices[two])
+		validOne = vertexValid[one][:, None, :]
+		validTwo = vertexValid[two][:, None, :]
+		oneMax = numpy.where(validOne, projectionsOne, -numpy.inf).max(axis=2)
+		oneMin = numpy.where(validOne, projectionsOne, numpy.inf).min(axis=2)
+		twoMax = numpy.where(validTwo, projectionsTwo, -numpy.inf).max(axis=2)
+		twoMin = numpy.where(validTwo, projectionsTwo, numpy.inf).min(axis=2)
+		forwards = oneMax - twoMin # Overlap if two is in front of one along the axis
+		backwards = twoMax - oneMin # and along -axis
+		overlapping = (((forwards > 0) & (backwards > 0)) | ~pairValid).all(axis=1) & pairValid.any(axis=1)
+		depths = interleave(numpy.where(pairValid, forwards, numpy.inf), numpy.where(pairValid, backwards, numpy.inf))
+		best = depths.argmin(axis=1) # First of the shallowest, like the strict < in findSeparation
+		pairIndices = numpy.arange(len(chunk))
+		direction = numpy.where((best % 2) == 1, -1, 1)
+		normals = pairAxes[pairIndices, best//2] * direction[:, None]
+		bestDepths = depths[pairIndices, best]
+		for i in range(len(chunk)):
+			if overlapping[i]:
+				separations.append((Vector2(float(normals[i, 0]), float(normals[i, 1])), float(bestDepths[i])))
+			else:
+				separations.append(None)
+	return separations
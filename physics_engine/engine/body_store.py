@@ -0,0 +1,198 @@
+# >> CREDITS <<
+# Body_Store.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module keeps the physical state of every RigidBody in a Workspace in NumPy arrays.
+# Each body is a row, so the whole world can be integrated in one go instead of body by body.
+# Attached bodies read and write their attributes straight from the arrays, so nothing else has to change.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.vector2view import Vector2View # What a body's vector attributes read as, in or out of a store
+from classes import rigidbody # For parentChangedListeners
+from shared.settings import useBodyStore
+
+from weakref import WeakValueDictionary
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+stores = WeakValueDictionary() # Workspace ID >> BodyStore. The Workspace holds its own (UIBase._Keep), so it goes when the Workspace does.
+vectorFields = ["Position", "Velocity", "Acceleration"]
+scalarFields = ["Rotation", "AngularVelocity", "AngularAcceleration", "Mass"]
+flagFields = ["Anchored", "SafeAnchored"]
+
+# >> FUNCTIONS <<
+
+def loadNumpy(): # Only needed when useBodyStore is switched on
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("BodyStore needs NumPy, turn useBodyStore off or install numpy")
+		numpy = module
+
+def getBodyStore(workspace): # The workspace's store, or None if stores are switched off in settings
+	if not useBodyStore:
+		return None
+	store = stores.get(workspace.ID)
+	if store == None:
+		store = BodyStore()
+		stores[workspace.ID] = store
+		workspace._Keep(store)
+		store.Watch(workspace)
+	return store
+
+# >> CLASSES <<
+
+class BodyStore:
+
+	__slots__ = ["Bodies", "Count", "Workspace", "Position", "Velocity", "Acceleration", "Rotation", "AngularVelocity", "AngularAcceleration", "Mass", "Anchored", "SafeAnchored", "Generation", "_Forced", "_Nested", "__weakref__"]
+
+	def __init__(self, capacity=64):
+		loadNumpy()
+		self.Bodies = [] # Bodies[i] owns row i
+		self.Count = 0
+		self.Workspace = None
+		for field in vectorFields:
+			setattr(self, field, numpy.zeros((capacity, 2)))
+		for field in scalarFields:
+			setattr(self, field, numpy.zeros(capacity))
+		for field in flagFields:
+			setattr(self, field, numpy.zeros(capacity, dtype=bool))
+		self.Generation = numpy.zeros(capacity, dtype=numpy.int64) # Goes up whenever a row is moved by writing the arrays, see RigidBody._Sync
+		self._Forced = {} # Body ID >> body, for bodies that have forces or impulses waiting
+		self._Nested = {} # Body ID >> body, for bodies whose parent is another RigidBody rather than the Workspace
+
+	# >> ROWS <<
+
+	def View(self, field, body):
+		return Vector2View(body, field)
+
+	def Read(self, field, row):
+		return getattr(self, field)[row].item() # .item() gives back a plain float/bool
+
+	def Write(self, field, row, value):
+		array = getattr(self, field)
+		if field in vectorFields:
+			array[row, 0] = value[0]
+			array[row, 1] = value[1]
+		else:
+			array[row] = value
+
+	def _Grow(self):
+		capacity = 2*len(self.Mass)
+		for field in vectorFields + scalarFields + flagFields + ["Generation"]:
+			old = getattr(self, field)
+			new = numpy.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+			new[:self.Count] = old[:self.Count]
+			setattr(self, field, new)
+
+	# >> MEMBERSHIP <<
+
+	def Watch(self, workspace): # Attach every body in workspace and follow reparenting from then on
+		self.Workspace = workspace
+		rigidbody.addParentChangedListener(self._ParentChanged)
+		for descendant in workspace._DescendantList():
+			self.Attach(descendant)
+
+	def Unwatch(self):
+		rigidbody.removeParentChangedListener(self._ParentChanged)
+		for body in list(self.Bodies):
+			self.Detach(body)
+		self.Workspace = None
+
+	def _ParentChanged(self, body, oldParent, newParent):
+		inside = newParent != None and newParent.FindFirstAncestorOfClass("Workspace") == self.Workspace
+		for shape in [body] + body._DescendantList():
+			if inside:
+				self.Attach(shape)
+				self._Track(shape)
+			elif shape._Store is self:
+				self.Detach(shape)
+
+	def _Track(self, body): # Keeps _Nested up to date, since Attach skips bodies that are already attached
+		if body.Parent != None and body.Parent.ClassName != "Workspace":
+			self._Nested[body.ID] = body
+		else:
+			self._Nested.pop(body.ID, None)
+
+	def Attach(self, body):
+		if body._Store is self:
+			return
+		if body._Store:
+			body._Store.Detach(body)
+		if self.Count == len(self.Mass):
+			self._Grow()
+		row = self.Count
+		for field in vectorFields + scalarFields + flagFields:
+			self.Write(field, row, getattr(body, field)) # Read through the properties before switching over
+		self.Generation[row] = 0
+		self.Bodies.append(body)
+		self.Count += 1
+		body._Store, body._StoreIndex, body._StoreGeneration = self, row, 0
+		if body._Forces or body._Impulses:
+			self.MarkForced(body)
+		self._Track(body)
+
+	def Detach(self, body): # Copies the row back onto the body then fills the gap with the last row
+		row = body._StoreIndex
+		body._Sync() # Catch the caches up while the row is still there
+		values = {field: (Vector2(*getattr(self, field)[row].tolist()) if field in vectorFields else self.Read(field, row)) for field in vectorFields + scalarFields + flagFields}
+		body._Store = None
+		for field, value in values.items():
+			setattr(body, field, value)
+		last = self.Count-1
+		if row != last:
+			moved = self.Bodies[last]
+			for field in vectorFields + scalarFields + flagFields + ["Generation"]:
+				array = getattr(self, field)
+				array[row] = array[last]
+			self.Bodies[row] = moved
+			moved._StoreIndex = row
+		self.Bodies.pop()
+		self.Count -= 1
+		self._Forced.pop(body.ID, None)
+		self._Nested.pop(body.ID, None)
+
+	def MarkForced(self, body):
+		self._Forced[body.ID] = body
+
+	# >> INTEGRATION <<
+
+	def Integrate(self, dt, config): # Same Verlet step as RigidBody.Update, applied to every row at once. config is a WorldConfig.
+		n = self.Count
+		moving = numpy.flatnonzero(~(self.Anchored[:n] | self.SafeAnchored[:n]))
+		if len(moving) == 0:
+			return
+		force = numpy.zeros((n, 2))
+		torque = numpy.zeros(n)
+		impulse = numpy.zeros((n, 2))
+		impulseTorque = numpy.zeros(n)
+		for key, body in list(self._Forced.items()): # Only bodies with forces need a Python level loop
+			row = body._StoreIndex
+			if self.Anchored[row] or self.SafeAnchored[row]: # Update doesn't touch these so their impulses wait
+				continue
+			bodyForce, bodyTorque, bodyImpulse, bodyImpulseTorque = body.SumForces()
+			force[row] = bodyForce.x, bodyForce.y
+			torque[row] = bodyTorque
+			impulse[row] = bodyImpulse.x, bodyImpulse.y
+			impulseTorque[row] = bodyImpulseTorque
+			if not body._Forces and not body._Impulses:
+				del self._Forced[key]
+		position, velocity, acceleration = self.Position[moving], self.Velocity[moving], self.Acceleration[moving]
+		rotation, angularVelocity, angularAcceleration = self.Rotation[moving], self.AngularVelocity[moving], self.AngularAcceleration[moving]
+		mass = self.Mass[moving]
+		with numpy.errstate(divide="ignore", invalid="ignore"): # Massless bodies get inf just like they would get an error in Update
+			newAcceleration = force[moving]/mass[:, None] + (config.GravityVector.x, config.GravityVector.y)
+			newAngularAcceleration = torque[moving]/mass
+		self.Position[moving] = position + velocity*dt + acceleration*dt*dt*0.5
+		self.Rotation[moving] = rotation + angularVelocity*dt + angularAcceleration*dt*dt*0.5
+		self.Velocity[moving] = velocity*(1-config.Drag) + (acceleration+newAcceleration)*dt*0.5 + impulse[moving]*0.5
+		self.AngularVelocity[moving] = angularVelocity + (angularAcceleration+newAngularAcceleration)*dt*0.5 + impulseTorque[moving]*0.5
+		self.Acceleration[moving] = newAcceleration
+		self.AngularAcceleration[moving] = newAngularAcceleration
+		self.Generation[moving] += 1 # The arrays were written directly, so the moved bodies' caches are stale. They notice when next read.
+		for body in self._Nested.values(): # Bodies inside other bodies move with them, so they are always treated as moved
+			self.Generation[body._StoreIndex] += 1
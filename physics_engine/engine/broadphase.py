@@ -0,0 +1,146 @@
+# >> CREDITS <<
+# Broadphase.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module filters out pairs of shapes that can't possibly be colliding.
+# It compares axis aligned bounding boxes so that SAT only runs on pairs that are close.
+# Every broadphase has GetPairs(shapes, swept=None) which returns pairs in the same order as broadScaleCollision.
+# swept is Body ID >> box to use instead of the body's BoundingBox, which continuous collision uses for the box
+# covering a fast body's whole move, so the bodies it could have hit on the way come back as pairs too.
+
+# >> MODULES <<
+from math import floor
+from heapq import heappush, heappop
+
+# >> UTILITY FUNCTIONS <<
+
+def boxesOverlap(boxOne, boxTwo): # Boxes are (minX, minY, maxX, maxY)
+	return boxOne[0] <= boxTwo[2] and boxTwo[0] <= boxOne[2] and boxOne[1] <= boxTwo[3] and boxTwo[1] <= boxOne[3]
+
+def chooseCellSize(boxes): # Twice the median box extent. The median ignores a few huge walls.
+	if not boxes:
+		return 1
+	extents = sorted(max(box[2]-box[0], box[3]-box[1]) for box in boxes)
+	return max(2*extents[len(extents)//2], 1)
+
+def boxesOf(shapes, swept=None): # Every shape's BoundingBox, or its box in swept if it has one
+	if not swept:
+		return [shape.BoundingBox for shape in shapes]
+	return [swept.get(shape.ID) or shape.BoundingBox for shape in shapes]
+
+def orderPairs(indexPairs, shapes): # Sorting the indices keeps the pair order the same as broadScaleCollision
+	indexPairs.sort()
+	return [(shapes[i], shapes[j]) for i, j in indexPairs]
+
+# >> CLASSES <<
+
+class AllPairs: # Every i<j pair, the same as broadScaleCollision. Kept so the broadphases can be compared.
+
+	__slots__ = ["CandidatePairs", "PrunedPairs", "__weakref__"]
+
+	def __init__(self):
+		self.CandidatePairs = 0 # How many pairs were handed to the narrowphase last frame
+		self.PrunedPairs = 0 # How many pairs were thrown away last frame
+
+	def GetPairs(self, shapes, swept=None):
+		n = len(shapes)
+		pairs = [(shapes[i], shapes[j]) for i in range(n) for j in range(i+1, n)]
+		self.CandidatePairs = len(pairs)
+		self.PrunedPairs = 0
+		return pairs
+
+class SweepAndPrune: # Sort and sweep along one axis. The sorted list is kept between frames.
+
+	__slots__ = ["Axis", "CandidatePairs", "PrunedPairs", "_Entries", "__weakref__"]
+
+	def __init__(self, axis=0):
+		self.Axis = axis # 0 sweeps along x, 1 sweeps along y
+		self.CandidatePairs = 0
+		self.PrunedPairs = 0
+		self._Entries = [] # [minX, minY, maxX, maxY, index, shape] sorted by the minimum along Axis
+
+	def _Synchronise(self, shapes, swept=None): # Drop shapes that have left and append new ones, keeping the old sorted order
+		indices = {shape.ID: i for i, shape in enumerate(shapes)}
+		entries = [entry for entry in self._Entries if entry[5].ID in indices]
+		tracked = {entry[5].ID for entry in entries}
+		for shape in shapes:
+			if not shape.ID in tracked:
+				entries.append([0, 0, 0, 0, 0, shape])
+		for entry in entries:
+			entry[0], entry[1], entry[2], entry[3] = (swept.get(entry[5].ID) if swept else None) or entry[5].BoundingBox
+			entry[4] = indices[entry[5].ID]
+		self._Entries = entries
+		return entries
+
+	def GetPairs(self, shapes, swept=None):
+		entries = self._Synchronise(shapes, swept)
+		low, high = self.Axis, self.Axis+2 # Sweep axis bounds
+		otherLow, otherHigh = 1-self.Axis, 3-self.Axis # Bounds on the other axis
+		# Bodies barely move between frames, so last frame's order is almost sorted.
+		# Timsort spots those runs and finishes in close to linear time, like an insertion sort would but in C.
+		entries.sort(key=lambda entry: entry[low])
+		indexPairs = []
+		active = [] # Heap of (end along the axis, index, entry) for entries that could still overlap the current one
+		for entry in entries:
+			start = entry[low]
+			while active and active[0][0] < start: # Anything ending before this starts is done, and those end first
+				heappop(active)
+			for end, index, other in active:
+				if other[otherLow] <= entry[otherHigh] and entry[otherLow] <= other[otherHigh]:
+					indexPairs.append((index, entry[4]) if index < entry[4] else (entry[4], index))
+			heappush(active, (entry[high], entry[4], entry))
+		n = len(shapes)
+		self.CandidatePairs = len(indexPairs)
+		self.PrunedPairs = n*(n-1)//2 - len(indexPairs)
+		return orderPairs(indexPairs, shapes)
+
+class SpatialHash: # Uniform grid keyed on cell coordinates. Rebuilt every frame, best for lots of similar sized bodies.
+
+	__slots__ = ["CellSize", "Automatic", "CandidatePairs", "PrunedPairs", "_SizedFor", "__weakref__"]
+
+	def __init__(self, cellSize=None):
+		self.CellSize = cellSize or 1
+		self.Automatic = cellSize == None # Pick the cell size from the bodies whenever the amount of bodies changes
+		self.CandidatePairs = 0
+		self.PrunedPairs = 0
+		self._SizedFor = -1 # How many shapes the cell size was picked for
+
+	def GetPairs(self, shapes, swept=None):
+		boxes = boxesOf(shapes, swept)
+		if self.Automatic and len(shapes) != self._SizedFor:
+			self.CellSize = chooseCellSize(boxes)
+			self._SizedFor = len(shapes)
+		size = self.CellSize
+		cells = {} # (cellX, cellY) >> indices of shapes touching that cell
+		corners = [] # Lowest cell of each shape
+		for i, box in enumerate(boxes):
+			lowX, lowY = floor(box[0]/size), floor(box[1]/size)
+			highX, highY = floor(box[2]/size), floor(box[3]/size)
+			corners.append((lowX, lowY))
+			for cellX in range(lowX, highX+1):
+				for cellY in range(lowY, highY+1):
+					cell = (cellX, cellY)
+					if cell in cells:
+						cells[cell].append(i)
+					else:
+						cells[cell] = [i]
+		indexPairs = []
+		for cell, members in cells.items():
+			count = len(members)
+			if count < 2:
+				continue
+			cellX, cellY = cell
+			for a in range(count):
+				i = members[a]
+				for b in range(a+1, count):
+					j = members[b] # Members were added in order so i < j
+					# Bodies spanning several cells meet in each of them. Only the cell holding the
+					# lowest corner of their shared cells reports the pair, so there are no duplicates.
+					if max(corners[i][0], corners[j][0]) != cellX or max(corners[i][1], corners[j][1]) != cellY:
+						continue
+					if boxesOverlap(boxes[i], boxes[j]):
+						indexPairs.append((i, j))
+		n = len(shapes)
+		self.CandidatePairs = len(indexPairs)
+		self.PrunedPairs = n*(n-1)//2 - len(indexPairs)
+		return orderPairs(indexPairs, shapes)
@@ -7,17 +7,42 @@
 
 # >> MODULES <<
 import math
+from time import perf_counter
+from weakref import WeakValueDictionary
 
 from classes.vector2d import Vector2
-from shared.settings import elasticity
+from classes.vector2array import Vector2Array
+from shared.settings import elasticity, broadphase, broadphaseNames, batchNarrowphase
+from engine.batch_collision_handler import checkCollisionsBatched
+from engine.broadphase import AllPairs, SweepAndPrune, SpatialHash, boxesOverlap
+from engine.aabb_tree import AABBTree
+from engine.islands import isActive
+from engine.world_config import getWorldConfig
+from engine import profiler
 
-def getNormalsFromVertices(vertices):
+# >> GLOBALS <<
+
+broadphaseClasses = {
+	"AllPairs": AllPairs,
+	"SweepAndPrune": SweepAndPrune,
+	"SpatialHash": SpatialHash,
+	"AABBTree": AABBTree,
+}
+broadphases = WeakValueDictionary() # Workspace ID >> broadphase, so that each world keeps its own state between frames.
+	# The Workspace holds its own (UIBase._Keep), so it goes when the Workspace does.
+sharedBroadphase = [] # Holds the one used without a Workspace, since nothing else does
+
+def getNormalsFromVertices(vertices): # A Vector2Array gives back a Vector2Array of normals, worked out all at once
+	if isinstance(vertices, Vector2Array):
+		return vertices.edges().perpendicular_normal()
 	points = len(vertices) # Amount of vertices to make processing efficient
 	edges = [(vertices[(i+1)%points] - vertices[i]) for i in range(points)] # Edges are differences between vertices
 	normals = [edge.perpendicular_normal() for edge in edges] # Perpendicular normals found
 	return normals # Return normals in case we need them. Remove duplicates for efficiency later
 
 def projectVerticesOntoNormal(vertices, normal):
+	if isinstance(vertices, Vector2Array): # One matrix product, then paired up with the vertices the same way
+		return list(zip(vertices.dot(normal).tolist(), vertices))
 	return [(normal.dot(vertex), vertex) for vertex in vertices] # Keep a link between vertices and their projection
 	# So that I can find the deepest vertex easily.
 
@@ -33,39 +58,52 @@ def getMaxAndMinVertices(projections): # Projections has list of tuples [ (float
 			mins.append(projection)
 	return maxs, mins # Returns max and min dot products and the vertices assosciated with said projections.
 
-def isSeparatingAxis(normal, verticesOne, verticesTwo):
-	oneMax, oneMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesOne, normal) ) # [ (projection, vertex), (projection, vertex) ]
-	twoMax, twoMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesTwo, normal) )
-	if (twoMin[0][0] > oneMax[0][0]) or (oneMin[0][0] > twoMax[0][0]): # If there is no collision along this axis
-		return False, 0, Vector2(), Vector2() # Return no collision, empty MTV and empty coordinate of collision
+def resolveAxis(normal, oneMax, oneMin, twoMax, twoMin): # Depth, normal and vertex of collision along an axis the shapes overlap on
 	if oneMax[0][0] > twoMax[0][0]: # We know there is collision, now filter to see which shape is dominant
 		depth = twoMax[0][0]-oneMin[0][0]
 		amountOfMinima = len(twoMin)
 		vertex = twoMin[0][1] # Vectors of collision will be stored in twoMin I choose twoMin where shapeTwo is dominant
 		if amountOfMinima > 1:
 			vertex = sum([projection[1] for projection in twoMin])/amountOfMinima
-		return True, depth, normal, vertex
+		return depth, normal, vertex
 	else:
 		depth = oneMax[0][0]-twoMin[0][0]
 		amountOfMinima = len(oneMin)
 		vertex = oneMin[0][1] # Vectors of collision will be stored in oneMin I choose oneMin where shapeOne is dominant
 		if amountOfMinima > 1:
 			vertex = sum([projection[1] for projection in oneMin])/amountOfMinima # Average position of vertices of collision (middle of edge)
-		return True, depth, normal, vertex
+		return depth, normal, vertex
+
+def flipProjections(projections): # Projections onto -normal are just negated, so maxima become minima
+	return [(-projection[0], projection[1]) for projection in projections]
+
+def isSeparatingAxis(normal, verticesOne, verticesTwo):
+	oneMax, oneMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesOne, normal) ) # [ (projection, vertex), (projection, vertex) ]
+	twoMax, twoMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesTwo, normal) )
+	if (twoMin[0][0] > oneMax[0][0]) or (oneMin[0][0] > twoMax[0][0]): # If there is no collision along this axis
+		return False, 0, Vector2(), Vector2() # Return no collision, empty MTV and empty coordinate of collision
+	return (True,) + resolveAxis(normal, oneMax, oneMin, twoMax, twoMin)
 
-def areShapesColliding(shapeOne, shapeTwo):
+def areShapesColliding(shapeOne, shapeTwo, elasticity=elasticity): # elasticity defaults to settings, only the impulse uses it
 	verticesOne, verticesTwo = shapeOne.Vertices, shapeTwo.Vertices
-	normals = set(getNormalsFromVertices(verticesOne)+getNormalsFromVertices(verticesTwo)) # Combine normals and make set
-	relativeVelocity = shapeTwo.Velocity - shapeOne.Velocity # How shapeOne is moving relative to shapeTwo
+	relativeVelocity = shapeTwo.Velocity - shapeOne.Velocity # How shapeOne is moving relative to shapeTwo
 	mtvs = [] # minimal translation vectors: List of tuples [ (depth, tv, vertex) ]
-	for normal in normals:
+	for normal, paired in shapeOne.Axes + shapeTwo.Axes: # Parallel edges share one axis, so it only gets projected once
 		velocityAlongNormal = normal.dot(relativeVelocity)
-		if velocityAlongNormal > 0.1: # If the shapes are already separating themselves
-			continue # Skip to next iteration
-		collision, depth, mtv, vertex = isSeparatingAxis(normal, verticesOne, verticesTwo)
-		if not collision:
-			return collision, mtv, vertex, 0 # Return empty stuff
-		mtvs.append((depth, mtv, vertex, velocityAlongNormal))
+		forwards = velocityAlongNormal <= 0.1 # Directions the shapes are already separating along are skipped
+		backwards = paired and -velocityAlongNormal <= 0.1 # The opposite edge's normal, -normal
+		if not forwards and not backwards:
+			continue # Skip to next iteration
+		oneMax, oneMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesOne, normal) )
+		twoMax, twoMin = getMaxAndMinVertices( projectVerticesOntoNormal(verticesTwo, normal) )
+		if (twoMin[0][0] > oneMax[0][0]) or (oneMin[0][0] > twoMax[0][0]): # Separating axis found
+			return False, Vector2(), Vector2(), 0 # Return empty stuff
+		if forwards:
+			depth, mtv, vertex = resolveAxis(normal, oneMax, oneMin, twoMax, twoMin)
+			mtvs.append((depth, mtv, vertex, velocityAlongNormal))
+		if backwards:
+			depth, mtv, vertex = resolveAxis(-normal, flipProjections(oneMin), flipProjections(oneMax), flipProjections(twoMin), flipProjections(twoMax))
+			mtvs.append((depth, mtv, vertex, -velocityAlongNormal))
 	depth, mtv, vertex, velocityAlongNormal = sorted(mtvs, key=lambda x: x[0])[0] # Sort by depth (lowest to highest)
 	impulse = velocityAlongNormal * -(1+elasticity)
 	return True, depth*mtv, vertex, impulse # Return collision, translation normal * depth, and vertex of collision
@@ -78,11 +116,54 @@ def broadScaleCollision(shapes):
 			filtered.append((shapes[i], shapes[j]))
 	return filtered
 
-def checkCollisions(shapes):
-	broad = broadScaleCollision(shapes)
-	collisions = []
-	for pair in broad:
-		collision, mtv, collisionPoint, impulse = areShapesColliding(pair[0], pair[1]) # Bool, MTV, Vertex/Point of Collision
-		if collision:
-			collisions.append((pair[0], pair[1], mtv, collisionPoint, impulse))
+def getBroadphase(workspace=None): # Returns the broadphase belonging to a workspace, making one from settings if needed
+	key = workspace.ID if workspace else None
+	index = broadphases.get(key)
+	if index == None:
+		if not broadphase in broadphaseNames:
+			raise ValueError(f"Unknown broadphase, {broadphase}")
+		index = broadphaseClasses[broadphase]()
+		broadphases[key] = index
+		if workspace:
+			workspace._Keep(index)
+			if broadphase == "AABBTree":
+				index.Watch(workspace) # The tree follows bodies being reparented straight away
+		else:
+			sharedBroadphase.append(index)
+	return index
+
+def queryRegion(workspace, box): # Bodies in workspace whose bounding box overlaps box, given as (minX, minY, maxX, maxY)
+	index = getBroadphase(workspace)
+	if isinstance(index, AABBTree):
+		return index.QueryRegion(box)
+	return [descendant for descendant in workspace._DescendantList() if boxesOverlap(descendant.BoundingBox, box)]
+
+def activePairs(pairs): # Drops pairs where neither body can move (anchored or sleeping), since nothing would happen
+	return [pair for pair in pairs if isActive(pair[0]) or isActive(pair[1])]
+
+def checkCollisions(shapes, broad=None, config=None): # broad is a broadphase, defaulting to the one chosen in settings. config is a WorldConfig.
+	timing = profiler.profiling
+	if timing:
+		owned = profiler.current == None # Called on its own rather than from updatePhysics, so it gets its own record
+		mark = profiler.beginFrame() if owned else perf_counter()
+	candidates = (broad or getBroadphase()).GetPairs(shapes)
+	broad = activePairs(candidates)
+	elasticity = (config or getWorldConfig()).Elasticity
+	if timing:
+		mark = profiler.lap("Broadphase", mark)
+		profiler.count("CandidatePairs", len(candidates))
+		profiler.count("ActivePairs", len(broad))
+	if batchNarrowphase:
+		collisions = checkCollisionsBatched(broad, elasticity) # Every pair at once with NumPy
+	else:
+		collisions = []
+		for pair in broad:
+			collision, mtv, collisionPoint, impulse = areShapesColliding(pair[0], pair[1], elasticity) # Bool, MTV, Vertex/Point of Collision
+			if collision:
+				collisions.append((pair[0], pair[1], mtv, collisionPoint, impulse))
+	if timing:
+		profiler.lap("Narrowphase", mark)
+		profiler.count("Collisions", len(collisions))
+		if owned:
+			profiler.endFrame()
 	return collisions
\ No newline at end of file
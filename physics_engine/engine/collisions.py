@@ -6,12 +6,20 @@
 # It attempts to do so in a very efficient way to minimise frame loss.
 # It uses clipping to determine vertices/polygons of collision.
 # It builds upon my previous implementation of SAT.
+# Contacts are kept between frames in a ContactCache so their impulses can be reused (warm starting).
+# contact_solver.py turns the manifolds into impulses.
 
 # >> MODULES <<
 import math
+from weakref import WeakValueDictionary
 
 from classes.vector2d import Vector2
-from shared.settings import elasticity # Used to compute impulse vector
+from shared.settings import batchNarrowphase
+from engine.batch_collision_handler import findSeparationsBatched
+
+# >> GLOBALS <<
+
+contactCaches = WeakValueDictionary() # Workspace ID >> ContactCache. The Workspace holds its own (UIBase._Keep), so it goes when the Workspace does.
 
 # >> PSEUDOCODE <<
 '''
@@ -100,19 +108,154 @@ def isSeparatingAxis(normal, verticesA, verticesB):
 	return True, normal, maxA[1]-minB[1], maxA[0], minB[0] 
 # Returns collision, MTV direction, MTV depth, vertex of collision from A, vertex of collision from B
 
+def findSeparation(shapeA, shapeB): # Axis of least penetration pointing from A to B, and its depth. None if the shapes don't overlap.
+	verticesA, verticesB = shapeA.Vertices, shapeB.Vertices
+	depth, mtv = math.inf, None
+	for normal, paired in shapeA.Axes + shapeB.Axes: # Unlike collision_handler, no axes are skipped for velocity. Resting contacts need a manifold too.
+		projectionsA = [normal.dot(vertex) for vertex in verticesA]
+		projectionsB = [normal.dot(vertex) for vertex in verticesB]
+		forwards = max(projectionsA) - min(projectionsB) # Overlap if B is in front of A along normal
+		backwards = max(projectionsB) - min(projectionsA) # Overlap if B is in front of A along -normal
+		if forwards <= 0 or backwards <= 0:
+			return None
+		if forwards < depth:
+			depth, mtv = forwards, normal
+		if backwards < depth:
+			depth, mtv = backwards, -normal
+	if mtv == None:
+		return None
+	return mtv, depth
+
+def findSeparations(pairs): # findSeparation for every pair, all at once if batchNarrowphase is on
+	if batchNarrowphase:
+		return findSeparationsBatched(pairs)
+	return [findSeparation(shapeA, shapeB) for shapeA, shapeB in pairs]
+
 # >> POLYGON CLIPPING <<
 
-def computeEdge(vertices, vertex, mtv):
+def findFurthestVertex(vertices, normal):
+	return max(range(len(vertices)), key=lambda i: normal.dot(vertices[i]))
+
+def computeEdge(vertices, vertex, mtv): # Of the two edges meeting at vertex, the one most perpendicular to mtv
 	n = len(vertices)
-	# Extract vertices
-	mainVertex = vertices[vertex]
-	nextVertex = vertices[(vertex+1)%n]
-	prevVertex = vertices[(vertex-1)%n]
-	# Extract edges
-	edgeOne = mainVertex - nextVertex
-	edgeOneProjection = edgeOne.dot(mtv) 
-	edgeTwo = mainVertex - prevVertex
-	edgeTwoProjection = edgeTwo.dot(mtv)
-	if edgeOneProjection > 0 and edgeTwoProjection > 0:
-		return (edgeOne, edgeOneProjection, mainVertex, nextVertex) if edgeOneProjection <= edgeTwoProjection else (edgeTwo, edgeTwoProjection, mainVertex, prevVertex)
-# Returns edge vector, edge projection along mtv, incident vertex, and supporting vertex
\ No newline at end of file
+	nextVertex = (vertex+1)%n
+	prevVertex = (vertex-1)%n
+	edgeOneProjection = abs((vertices[vertex] - vertices[nextVertex]).normalized().dot(mtv))
+	edgeTwoProjection = abs((vertices[vertex] - vertices[prevVertex]).normalized().dot(mtv))
+	if edgeOneProjection <= edgeTwoProjection:
+		return vertex, nextVertex
+	return prevVertex, vertex
+# Returns indices of the start and end of the edge, in the same order as the vertices
+
+def clipPoints(points, direction, offset, feature): # Keeps the parts of a segment where direction.dot(point) >= offset
+	distances = [direction.dot(point) - offset for point, pointFeature in points]
+	clipped = [point for point, distance in zip(points, distances) if distance >= 0]
+	if len(points) == 2 and distances[0]*distances[1] < 0: # The segment crosses the line, so add where it crosses
+		ratio = distances[0]/(distances[0]-distances[1])
+		clipped.append((points[0][0] + (points[1][0]-points[0][0])*ratio, feature))
+	return clipped
+# Points are (point, feature id). Points made by clipping get the feature id of the side that clipped them.
+
+def getContactManifold(shapeA, shapeB, normal, depth): # normal points from A to B
+	verticesA, verticesB = shapeA.Vertices, shapeB.Vertices
+	manifold = Manifold(shapeA, shapeB, normal, depth)
+	if len(verticesA) < 2 or len(verticesB) < 2: # Dots have no edges to clip
+		point = verticesB[findFurthestVertex(verticesB, -normal)] if len(verticesA) >= 2 else verticesA[findFurthestVertex(verticesA, normal)]
+		manifold.Contacts.append(Contact(point, depth, (False, 0, 0, 0)))
+		return manifold
+	edgeA = computeEdge(verticesA, findFurthestVertex(verticesA, normal), normal)
+	edgeB = computeEdge(verticesB, findFurthestVertex(verticesB, -normal), -normal)
+	projectionA = abs((verticesA[edgeA[1]] - verticesA[edgeA[0]]).normalized().dot(normal))
+	projectionB = abs((verticesB[edgeB[1]] - verticesB[edgeB[0]]).normalized().dot(normal))
+	flipped = projectionA > projectionB # The reference edge is the one most perpendicular to the normal
+	if flipped:
+		referenceVertices, reference, incidentVertices, incident, outwards = verticesB, edgeB, verticesA, edgeA, -normal
+	else:
+		referenceVertices, reference, incidentVertices, incident, outwards = verticesA, edgeA, verticesB, edgeB, normal
+	referenceStart, referenceEnd = referenceVertices[reference[0]], referenceVertices[reference[1]]
+	direction = (referenceEnd - referenceStart).normalized()
+	points = [(incidentVertices[incident[0]], incident[0]), (incidentVertices[incident[1]], incident[1])]
+	points = clipPoints(points, direction, direction.dot(referenceStart), -1) # Clip by the reference edge's first vertex
+	points = clipPoints(points, -direction, -direction.dot(referenceEnd), -2) # Then by its second
+	referenceNormal = direction.perpendicular()
+	if referenceNormal.dot(outwards) < 0:
+		referenceNormal = -referenceNormal
+	front = referenceNormal.dot(referenceStart)
+	for point, feature in points:
+		separation = front - referenceNormal.dot(point)
+		if separation >= 0: # Points in front of the reference edge aren't touching
+			manifold.Contacts.append(Contact(point, separation, (flipped, reference[0], incident[0], feature)))
+	if not manifold.Contacts: # Only happens with very thin overlaps, so fall back to the deepest vertex
+		furthest = findFurthestVertex(incidentVertices, -outwards)
+		manifold.Contacts.append(Contact(incidentVertices[furthest], depth, (flipped, reference[0], incident[0], furthest)))
+	return manifold
+
+# >> CONTACT CACHE <<
+
+def getContactCache(workspace):
+	cache = contactCaches.get(workspace.ID)
+	if cache == None:
+		cache = ContactCache()
+		contactCaches[workspace.ID] = cache
+		workspace._Keep(cache)
+	return cache
+
+# >> CLASSES <<
+
+class Contact:
+
+	__slots__ = ["Point", "Depth", "ID", "NormalImpulse", "TangentImpulse"]
+
+	def __init__(self, point, depth, ID):
+		self.Point = point # World position, on the incident edge
+		self.Depth = depth
+		self.ID = ID # (flipped, reference edge, incident edge, vertex or clipping side), the same from frame to frame while the features touch
+		self.NormalImpulse = 0 # Accumulated over the solver passes, and carried over to the next frame
+		self.TangentImpulse = 0
+
+class Manifold:
+
+	__slots__ = ["BodyA", "BodyB", "Normal", "Depth", "Contacts", "Began"]
+
+	def __init__(self, bodyA, bodyB, normal, depth):
+		self.BodyA = bodyA
+		self.BodyB = bodyB
+		self.Normal = normal # Unit vector from A to B
+		self.Depth = depth
+		self.Contacts = [] # Up to two Contacts
+		self.Began = True # False when the bodies were already touching last frame
+
+class ContactCache: # Remembers the manifolds from last frame so matching contacts keep their impulses
+
+	__slots__ = ["Manifolds", "WarmStarted", "__weakref__"]
+
+	def __init__(self):
+		self.Manifolds = {} # (ID of A, ID of B) >> Manifold
+		self.WarmStarted = 0 # How many contacts were matched to last frame's on the last Update
+
+	def Update(self, pairs): # Builds this frame's manifolds from broadphase pairs. Pairs that stopped touching are forgotten.
+		manifolds = {}
+		self.WarmStarted = 0
+		for pair, separation in zip(pairs, findSeparations(pairs)):
+			if separation == None:
+				continue
+			key = (pair[0].ID, pair[1].ID)
+			manifold = getContactManifold(pair[0], pair[1], *separation)
+			self.Match(key, manifold)
+			manifolds[key] = manifold
+		self.Manifolds = manifolds
+		return list(manifolds.values())
+
+	def Match(self, key, manifold): # Gives a new manifold the impulses of last frame's contacts on the same features
+		if not key in self.Manifolds:
+			return
+		manifold.Began = False
+		previous = {contact.ID: contact for contact in self.Manifolds[key].Contacts}
+		for contact in manifold.Contacts:
+			if contact.ID in previous:
+				contact.NormalImpulse = previous[contact.ID].NormalImpulse
+				contact.TangentImpulse = previous[contact.ID].TangentImpulse
+				self.WarmStarted += 1
+
+	def Clear(self):
+		self.Manifolds = {}
@@ -0,0 +1,257 @@
+# >> CREDITS <<
+# Contact_Solver.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module resolves the contact manifolds from collisions.py with sequential impulses.
+# Every contact is visited several times per frame, with friction, restitution and clamped
+# accumulated impulses, and it stops early once the impulses stop changing.
+# Overlap is then removed over a few position passes, leaving slop px so contacts persist.
+# angularSlop is left the same way: overlap a turn that small would account for, at the contact's distance from the body, is tolerated.
+# Body state is copied into SolverBodies first so the inner loops only touch plain floats.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from shared.settings import slop, angularSlop, solverIterations, positionIterations, solverTolerance, correctionFactor
+
+# >> GLOBALS <<
+
+bounceThreshold = 30 # Bodies approaching slower than this (px/s) don't bounce. A few frames of gravity, so resting contacts stay put.
+maxCorrection = 10 # Most a single position pass can push a contact apart (px), so deep overlaps don't explode
+solverStats = {"VelocityIterations": 0, "PositionIterations": 0} # Passes used on the last frame
+
+# >> UTILITY FUNCTIONS <<
+
+def inverseMass(body): # Anchored and massless bodies can't be pushed
+	if body.Anchored or body.SafeAnchored or body.Mass == 0:
+		return 0
+	return 1/body.Mass
+
+def inverseInertia(body):
+	if body.Anchored or body.SafeAnchored or body.Mass == 0:
+		return 0
+	inertia = body.Inertia
+	return 1/inertia if inertia else 0
+
+def writeBack(body, velocityX, velocityY, angularVelocity, shiftX, shiftY, turn): # Puts the solver's results onto a movable body
+	body.Velocity = Vector2(velocityX, velocityY)
+	body.AngularVelocity = angularVelocity
+	if shiftX or shiftY:
+		position = body.Position
+		body.Position = Vector2(position.x + shiftX, position.y + shiftY)
+	if turn:
+		body.Rotation += turn
+
+# >> CLASSES <<
+
+class SolverBody: # Copy of a body's velocity and mass properties, written back once the solver is done
+
+	__slots__ = ["Body", "VelocityX", "VelocityY", "AngularVelocity", "InverseMass", "InverseInertia", "ShiftX", "ShiftY", "Turn"]
+
+	def __init__(self, body):
+		velocity = body.Velocity
+		self.Body = body
+		self.VelocityX, self.VelocityY = velocity.x, velocity.y
+		self.AngularVelocity = body.AngularVelocity
+		self.InverseMass = inverseMass(body)
+		self.InverseInertia = inverseInertia(body)
+		self.ShiftX, self.ShiftY, self.Turn = 0, 0, 0 # Position correction so far
+
+	def ApplyImpulse(self, impulseX, impulseY, offsetX, offsetY): # offset is from the body's position to where the impulse acts
+		self.VelocityX += impulseX * self.InverseMass
+		self.VelocityY += impulseY * self.InverseMass
+		self.AngularVelocity += (offsetX*impulseY - offsetY*impulseX) * self.InverseInertia
+
+	def WriteBack(self):
+		if self.InverseMass == 0 and self.InverseInertia == 0:
+			return
+		writeBack(self.Body, self.VelocityX, self.VelocityY, self.AngularVelocity, self.ShiftX, self.ShiftY, self.Turn)
+
+class ContactConstraint: # One contact point, with everything the solver needs worked out once per frame
+
+	__slots__ = ["Contact", "BodyA", "BodyB", "NormalX", "NormalY", "OffsetAX", "OffsetAY", "OffsetBX", "OffsetBY", "NormalMass", "TangentMass", "Bounce", "Friction", "Tolerance"]
+
+	def __init__(self, contact, normal, bodyA, bodyB, elasticity, friction):
+		self.Contact = contact
+		self.BodyA, self.BodyB = bodyA, bodyB
+		self.NormalX, self.NormalY = normal.x, normal.y
+		positionA, positionB = bodyA.Body.AbsolutePosition, bodyB.Body.AbsolutePosition
+		self.OffsetAX, self.OffsetAY = contact.Point.x - positionA.x, contact.Point.y - positionA.y
+		self.OffsetBX, self.OffsetBY = contact.Point.x - positionB.x, contact.Point.y - positionB.y
+		self.NormalMass = self.EffectiveMass(self.NormalX, self.NormalY)
+		self.TangentMass = self.EffectiveMass(self.NormalY, -self.NormalX)
+		armA = abs(self.OffsetAX*self.NormalY - self.OffsetAY*self.NormalX) if bodyA.InverseInertia else 0 # How far a turn moves the contact along the normal
+		armB = abs(self.OffsetBX*self.NormalY - self.OffsetBY*self.NormalX) if bodyB.InverseInertia else 0
+		self.Tolerance = slop + angularSlop*max(armA, armB) # Overlap left alone, linear slop plus what angularSlop of turn accounts for
+		velocityAlongNormal = self.RelativeVelocity(self.NormalX, self.NormalY)
+		self.Bounce = -elasticity * velocityAlongNormal if velocityAlongNormal < -bounceThreshold else 0
+		self.Friction = friction
+
+	def EffectiveMass(self, directionX, directionY): # 1 / how much the contact speeds up along direction per unit impulse
+		a, b = self.BodyA, self.BodyB
+		turnA = self.OffsetAX*directionY - self.OffsetAY*directionX
+		turnB = self.OffsetBX*directionY - self.OffsetBY*directionX
+		total = a.InverseMass + b.InverseMass + a.InverseInertia*turnA*turnA + b.InverseInertia*turnB*turnB
+		return 1/total if total > 0 else 0
+
+	def RelativeVelocity(self, directionX, directionY): # Velocity of B's contact point relative to A's, along direction
+		a, b = self.BodyA, self.BodyB
+		velocityX = b.VelocityX - b.AngularVelocity*self.OffsetBY - a.VelocityX + a.AngularVelocity*self.OffsetAY
+		velocityY = b.VelocityY + b.AngularVelocity*self.OffsetBX - a.VelocityY - a.AngularVelocity*self.OffsetAX
+		return velocityX*directionX + velocityY*directionY
+
+	def Apply(self, impulseX, impulseY):
+		self.BodyA.ApplyImpulse(-impulseX, -impulseY, self.OffsetAX, self.OffsetAY)
+		self.BodyB.ApplyImpulse(impulseX, impulseY, self.OffsetBX, self.OffsetBY)
+
+	def WarmStart(self):
+		contact = self.Contact
+		tangentX, tangentY = self.NormalY, -self.NormalX
+		self.Apply(
+			self.NormalX*contact.NormalImpulse + tangentX*contact.TangentImpulse,
+			self.NormalY*contact.NormalImpulse + tangentY*contact.TangentImpulse
+		)
+
+	def SolveFriction(self): # Returns how much the accumulated impulse changed
+		contact = self.Contact
+		tangentX, tangentY = self.NormalY, -self.NormalX
+		limit = self.Friction * contact.NormalImpulse # Coulomb's law
+		total = min(max(contact.TangentImpulse - self.RelativeVelocity(tangentX, tangentY)*self.TangentMass, -limit), limit)
+		change, contact.TangentImpulse = total - contact.TangentImpulse, total
+		self.Apply(tangentX*change, tangentY*change)
+		return abs(change)
+
+	def SolveNormal(self): # Returns how much the accumulated impulse changed
+		contact = self.Contact
+		total = max(contact.NormalImpulse + (self.Bounce - self.RelativeVelocity(self.NormalX, self.NormalY))*self.NormalMass, 0) # Push, never pull
+		change, contact.NormalImpulse = total - contact.NormalImpulse, total
+		self.Apply(self.NormalX*change, self.NormalY*change)
+		return abs(change)
+
+	def Separation(self): # Overlap left after the corrections so far, negative when overlapping
+		a, b = self.BodyA, self.BodyB
+		shiftX = b.ShiftX - b.Turn*self.OffsetBY - a.ShiftX + a.Turn*self.OffsetAY
+		shiftY = b.ShiftY + b.Turn*self.OffsetBX - a.ShiftY - a.Turn*self.OffsetAX
+		return shiftX*self.NormalX + shiftY*self.NormalY - self.Contact.Depth
+
+	def Correction(self, separation): # How far this pass should move the contact apart, negative. Tolerance is left overlapping.
+		return min(max(correctionFactor*(separation + self.Tolerance), -maxCorrection), 0)
+
+	def SolvePosition(self): # Returns the separation before correcting it
+		separation = self.Separation()
+		self.Push(-self.Correction(separation) * self.NormalMass)
+		return separation
+
+	def Push(self, push): # Moves the bodies apart along the normal as if by an impulse of push
+		a, b = self.BodyA, self.BodyB
+		pushX, pushY = self.NormalX*push, self.NormalY*push
+		a.ShiftX -= pushX * a.InverseMass
+		a.ShiftY -= pushY * a.InverseMass
+		a.Turn -= (self.OffsetAX*pushY - self.OffsetAY*pushX) * a.InverseInertia
+		b.ShiftX += pushX * b.InverseMass
+		b.ShiftY += pushY * b.InverseMass
+		b.Turn += (self.OffsetBX*pushY - self.OffsetBY*pushX) * b.InverseInertia
+
+class ManifoldConstraint: # The contact points of one manifold. Two points are solved together, like Box2D's block solver.
+
+	__slots__ = ["Points", "Block", "K11", "K12", "K22"]
+
+	def __init__(self, points):
+		self.Points = points
+		self.Block = False
+		if len(points) == 2: # Solving both points at once stops boxes rocking between their two corners
+			one, two = points
+			a, b = one.BodyA, one.BodyB
+			turnA1 = one.OffsetAX*one.NormalY - one.OffsetAY*one.NormalX
+			turnB1 = one.OffsetBX*one.NormalY - one.OffsetBY*one.NormalX
+			turnA2 = two.OffsetAX*two.NormalY - two.OffsetAY*two.NormalX
+			turnB2 = two.OffsetBX*two.NormalY - two.OffsetBY*two.NormalX
+			masses = a.InverseMass + b.InverseMass
+			self.K11 = masses + a.InverseInertia*turnA1*turnA1 + b.InverseInertia*turnB1*turnB1
+			self.K22 = masses + a.InverseInertia*turnA2*turnA2 + b.InverseInertia*turnB2*turnB2
+			self.K12 = masses + a.InverseInertia*turnA1*turnA2 + b.InverseInertia*turnB1*turnB2
+			self.Block = self.K11*self.K11 < 1000*(self.K11*self.K22 - self.K12*self.K12) # Otherwise the points are too close together to tell apart
+
+	def WarmStart(self):
+		for point in self.Points:
+			point.WarmStart()
+
+	def SolveVelocity(self): # Returns how much the accumulated impulses changed
+		change = 0
+		for point in self.Points:
+			change += point.SolveFriction()
+		if not self.Block:
+			for point in self.Points:
+				change += point.SolveNormal()
+			return change
+		one, two = self.Points
+		old1, old2 = one.Contact.NormalImpulse, two.Contact.NormalImpulse
+		# Find impulses x >= 0 with K*x + b >= 0 where they are 0 (a linear complementarity problem) by trying each case in turn
+		b1 = one.RelativeVelocity(one.NormalX, one.NormalY) - one.Bounce - (self.K11*old1 + self.K12*old2)
+		b2 = two.RelativeVelocity(two.NormalX, two.NormalY) - two.Bounce - (self.K12*old1 + self.K22*old2)
+		determinant = self.K11*self.K22 - self.K12*self.K12
+		x1 = -(self.K22*b1 - self.K12*b2)/determinant # Both points pushing
+		x2 = -(self.K11*b2 - self.K12*b1)/determinant
+		if x1 < 0 or x2 < 0:
+			x1, x2 = -b1/self.K11, 0 # Only the first point pushing
+			if x1 < 0 or self.K12*x1 + b2 < 0:
+				x1, x2 = 0, -b2/self.K22 # Only the second
+				if x2 < 0 or self.K12*x2 + b1 < 0:
+					x1, x2 = 0, 0 # Neither, they are separating
+					if b1 < 0 or b2 < 0: # No case fits, which only happens through rounding
+						return change
+		change1, change2 = x1 - old1, x2 - old2
+		one.Contact.NormalImpulse, two.Contact.NormalImpulse = x1, x2
+		one.Apply(one.NormalX*change1, one.NormalY*change1)
+		two.Apply(two.NormalX*change2, two.NormalY*change2)
+		return change + abs(change1) + abs(change2)
+
+	def SolvePosition(self): # Returns the deepest separation before correcting it
+		if self.Block: # Both points at once, like SolveVelocity. One after the other leaves a little turn behind every frame.
+			one, two = self.Points
+			separation1, separation2 = one.Separation(), two.Separation()
+			correction1, correction2 = one.Correction(separation1), two.Correction(separation2)
+			determinant = self.K11*self.K22 - self.K12*self.K12
+			push1 = -(self.K22*correction1 - self.K12*correction2)/determinant
+			push2 = -(self.K11*correction2 - self.K12*correction1)/determinant
+			if push1 >= 0 and push2 >= 0: # Otherwise one point would have to pull, so they're done one at a time instead
+				one.Push(push1)
+				two.Push(push2)
+				return min(separation1, separation2)
+		return min(point.SolvePosition() for point in self.Points)
+
+# >> FUNCTIONS <<
+
+def solveContacts(manifolds, config, iterations=None): # config is the world's WorldConfig. iterations defaults to settings.solverIterations
+	for body in solveManifolds(manifolds, config, iterations).values():
+		body.WriteBack()
+
+def solveManifolds(manifolds, config, iterations=None): # Runs the solver without touching the bodies. Returns Body ID >> SolverBody.
+	bodies = {} # Body ID >> SolverBody
+	constraints = []
+	for manifold in manifolds:
+		for body in (manifold.BodyA, manifold.BodyB):
+			if not body.ID in bodies:
+				bodies[body.ID] = SolverBody(body)
+		bodyA, bodyB = bodies[manifold.BodyA.ID], bodies[manifold.BodyB.ID]
+		if bodyA.InverseMass + bodyB.InverseMass == 0 or not manifold.Contacts:
+			continue
+		constraints.append(ManifoldConstraint([ContactConstraint(contact, manifold.Normal, bodyA, bodyB, config.Elasticity, config.Friction) for contact in manifold.Contacts]))
+	for constraint in constraints:
+		constraint.WarmStart()
+	solverStats["VelocityIterations"] = 0
+	for i in range(solverIterations if iterations == None else iterations):
+		solverStats["VelocityIterations"] += 1
+		change = 0
+		for constraint in constraints:
+			change += constraint.SolveVelocity()
+		if change < solverTolerance: # Quiet scenes stop here, usually on the first pass thanks to warm starting
+			break
+	solverStats["PositionIterations"] = 0
+	for i in range(positionIterations):
+		solverStats["PositionIterations"] += 1
+		deepest = 0
+		for constraint in constraints:
+			deepest = min(deepest, constraint.SolvePosition())
+		if deepest >= -2*slop: # Close enough, the rest is left as slop
+			break
+	return bodies
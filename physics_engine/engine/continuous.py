@@ -0,0 +1,120 @@
+# >> CREDITS <<
+# Continuous.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module stops fast bodies tunnelling through thin ones when the timestep is coarse (continuous collision detection).
+# It's off unless a WorldConfig has ContinuousCollision on. Then updatePhysics notes where every active body was before
+# integrating, and afterwards sweeps the bodies that moved a long way (or are flagged Bullet):
+# the broadphase is given the box covering where each of them was and where it is now instead of its BoundingBox,
+# and every pair that comes back with one of them in it is tested for a time of impact with swept SAT along the move.
+# Bodies that would have hit something are put back to where they first touched, just overlapping it, and the
+# ones that started the step overlapping something and were driven further into it are put back to where they were.
+# The usual narrowphase and contact solver then handle the collision. The rest of the step's movement is lost.
+# Rotation during the step is ignored: shapes are swept in a straight line as they were at the start of it,
+# and bodies that are put back keep that rotation.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.vector2array import Vector2Array
+from shared.settings import slop, ccdMotionFraction
+from engine.islands import isActive
+
+# >> UTILITY FUNCTIONS <<
+
+def projectExtent(vertices, normal): # (min, max) of the vertices projected onto normal
+	if isinstance(vertices, Vector2Array):
+		projections = vertices.dot(normal).tolist()
+	else:
+		projections = [normal.dot(vertex) for vertex in vertices]
+	return min(projections), max(projections)
+
+def sweptBox(box, displacement): # Box around where a body's box was before moving by displacement and where it is now
+	dx, dy = displacement.x, displacement.y
+	return (min(box[0], box[0]-dx), min(box[1], box[1]-dy), max(box[2], box[2]-dx), max(box[3], box[3]-dy))
+
+def startGeometry(body, starts): # (world vertices, world axes) of body where it was before integrating, or where it is if it can't move
+	if not body.ID in starts:
+		return body.Vertices, body.Axes
+	position, rotation = starts[body.ID]
+	vertices = body._Vertices
+	if isinstance(vertices, Vector2Array):
+		vertices = vertices.rotatedRadians(rotation) + position
+	else:
+		vertices = [vertex.rotatedRadians(rotation) + position for vertex in vertices]
+	return vertices, [(axis.rotatedRadians(rotation), paired) for axis, paired in body.LocalAxes]
+
+def findTimeOfImpact(geometryOne, geometryTwo, motion): # Geometry is (vertices, axes) at the start of the step. motion is how far
+	(verticesOne, axesOne), (verticesTwo, axesTwo) = geometryOne, geometryTwo # the first moved relative to the second over it.
+	enter, exit, speedAtEnter = float("-inf"), float("inf"), 0 # Returns (fraction of the step they first touch at, closing speed), or None
+	shallowest, deepening = float("inf"), 0 # Least overlap at the start and how far the motion pushed further in along it
+	for normal, paired in axesOne + axesTwo: # Direction doesn't matter for intervals, so paired axes need no extra test
+		oneMin, oneMax = projectExtent(verticesOne, normal)
+		twoMin, twoMax = projectExtent(verticesTwo, normal)
+		speed = normal.dot(motion)
+		overlap = min(oneMax-twoMin, twoMax-oneMin)
+		if overlap < shallowest:
+			shallowest, deepening = overlap, speed if oneMax-twoMin < twoMax-oneMin else -speed
+		if abs(speed) < 1e-9: # Not moving along this axis, so it separates them for the whole step or none of it
+			if oneMax < twoMin or twoMax < oneMin:
+				return None
+			continue
+		first, last = (twoMin-oneMax)/speed, (twoMax-oneMin)/speed # When the intervals start and stop overlapping
+		if first > last:
+			first, last = last, first
+		if first > enter:
+			enter, speedAtEnter = first, abs(speed)
+		exit = min(exit, last)
+		if enter > exit: # Separated on some axis the whole time they'd overlap on another
+			return None
+	if enter > 1 or enter == float("-inf"): # No hit this step
+		return None
+	if enter < 0: # Already overlapping at the start. Small pushes in are the narrowphase's to deal with,
+		if deepening <= slop: # but a fast one could carry it out the far side, so it's stopped where it was.
+			return None
+		return 0, deepening
+	return enter, speedAtEnter
+
+# >> FUNCTIONS <<
+
+def recordStarts(bodies): # Body ID >> (position, rotation) of each active body, before it's integrated
+	return {body.ID: (Vector2(body.AbsolutePosition), body.Rotation) for body in bodies if isActive(body)}
+
+def sweepFastBodies(bodies, starts): # (Body ID >> displacement this step for every active body, Body ID >> swept box for the fast ones)
+	displacements, sweptBoxes = {}, {} # The swept boxes go to the broadphase in place of the bodies' BoundingBoxes
+	for body in bodies:
+		if not body.ID in starts:
+			continue
+		displacement = body.AbsolutePosition - starts[body.ID][0]
+		displacements[body.ID] = displacement
+		if not len(body._Vertices):
+			continue
+		reach = ccdMotionFraction*body.Radius
+		if body.Bullet or displacement.get_length_sqrd() > reach*reach: # Otherwise slow enough for the narrowphase to catch
+			sweptBoxes[body.ID] = sweptBox(body.BoundingBox, displacement)
+	return displacements, sweptBoxes
+
+def advanceFastBodies(pairs, displacements, sweptBoxes, starts): # Puts fast bodies back to their first time of impact this step.
+	times = {} # Body ID >> earliest fraction of the step it can keep. pairs come from the broadphase, given the swept boxes.
+	bodies = {}
+	for bodyOne, bodyTwo in pairs:
+		if not (bodyOne.ID in sweptBoxes or bodyTwo.ID in sweptBoxes) or not len(bodyOne._Vertices) or not len(bodyTwo._Vertices):
+			continue
+		displacementOne, displacementTwo = displacements.get(bodyOne.ID), displacements.get(bodyTwo.ID)
+		if displacementOne == None: # Only the second one moves
+			motion = -displacementTwo
+		else:
+			motion = displacementOne - displacementTwo if displacementTwo != None else displacementOne
+		hit = findTimeOfImpact(startGeometry(bodyOne, starts), startGeometry(bodyTwo, starts), motion)
+		if hit == None:
+			continue
+		time, speed = hit
+		time = min(1, time + slop/speed) # Just past touching, so the narrowphase sees the contact
+		for body in (bodyOne, bodyTwo):
+			if body.ID in displacements and time < times.get(body.ID, 1):
+				times[body.ID] = time
+				bodies[body.ID] = body
+	advanced = list(bodies.values()) # Rewinding leaves the velocity alone, the contact solver takes out the part heading into the hit.
+	for body in advanced: # The swept boxes covered where fast bodies are put back to. Slow ones barely move, so their pairs still hold.
+		body.Position = body.Position - displacements[body.ID]*(1-times[body.ID])
+		body.Rotation = starts[body.ID][1] # The sweep was done at this rotation, so it's the one that's just touching
+	return advanced
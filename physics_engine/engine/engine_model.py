@@ -3,7 +3,7 @@
 
 # >> DESCRIPTION <<
 # This module uses the uihelper classes to create an essential engine model.
-# It also implements a recurisve rendering function.
+# Rendering lives in renderer.py so the simulation can run headless, without pygame.
 # It simplifies the process of adding objects, such as UI elements, to the engine.
 # It is the first module to be ran within engine, followed by ui_model.
 
@@ -11,15 +11,25 @@
 from classes.vector2d import Vector2
 from classes.udim2 import UDim2
 from classes.uibase import UIBase
-from classes.interface import Interface 
 from classes.rigidbody import RigidBody
-from shared.settings import screenSize, polygonNames, gravity, friction, elasticity
-from engine.collision_handler import checkCollisions
+from classes.shape import getNamedShape
+from shared.settings import screenSize, polygonNames
+from engine.collision_handler import getBroadphase, activePairs, broadphases
+from engine.collisions import getContactCache, contactCaches
+from engine.contact_solver import solveContacts
+from engine.body_store import getBodyStore, stores
+from engine.islands import isActive, updateSleep
+from engine.world_config import getWorldConfig, setWorldConfig
+from engine.parallel_solver import getParallelSolver, parallelSolvers
+from engine.continuous import recordStarts, sweepFastBodies, advanceFastBodies
+from engine import profiler
 
-from pygame import draw
-from pygame import Color as Colour
 from math import pi,sin,cos,floor
-from time import time
+from time import time, perf_counter
+
+# >> GLOBALS <<
+
+stepListeners = [] # Functions called with (Workspace, dt) at the end of every updatePhysics, like the trajectory Recorder
 
 # >> UTILITY FUNCTIONS <<
 
@@ -49,62 +59,86 @@ def createModel():
 	userInterface.Parent = game
 	return game # Constructed tree structure
 
-def render(object, display): # Recursively calls itself to render all object and object's descendants
-	if object.ClassName == "EngineModel": # EngineModel sets game background of course.
-		display.fill(object.Colour)
-	if object.Visible:
-		renderAfter = []
-		for child in object.GetChildren(): # If they are a lower or equal ZIndex, render them before the parent
-			if child.ZIndex >= object.ZIndex:
-				render(child, display) # Pass in display again
-			else:
-				renderAfter.append(child) # If they are lower than ZIndex of parent, render them after
-		if object.ClassName == "Polygon": # All rendered classes done!
-			rect = draw.polygon(
-				display,
-				object.Colour,
-				object.Vertices
-			)
-		elif object.ClassName == "Rectangle":
-			display.fill(
-				object.Colour,
-				object.Rectangle
-			)
-		elif object.ClassName == "Ellipse":
-			draw.ellipse(
-				display,
-				object.Colour,
-				object.Rectangle
-			)
-		elif object.ClassName == "ImageLabel" or object.ClassName == "ImageButton":
-			object.Draw(display) # Custom render function for these objects
-		(render(child, display) for child in renderAfter)
-
 def updatePhysics(Workspace, dt):
-	descendants = Workspace.GetDescendants()
-	for descendant in descendants:
-		descendant.Update(dt)
-	collisions = checkCollisions(descendants)
-	for collision in collisions:
-		dominant, inferior, mtv, collisionPoint, impulse = collision
-		ratio = dominant.Mass / (dominant.Mass+inferior.Mass)
-		if not dominant.Anchored or dominant.SafeAnchored:
-			#print(f"{dominant.Name} is colliding with {inferior.Name}. Impulse{-mtv*ratio*impulse}. MTV{mtv}")
-			additionalVelocity = impulse * mtv.normalized() * ratio
-			if additionalVelocity.length > 50:
-				dominant.Velocity -= impulse * mtv.normalized() * ratio
-			dominant.Position -= mtv * ratio
-		if not inferior.Anchored or inferior.SafeAnchored:
-			additionalVelocity = impulse * mtv.normalized() * (1-ratio)
-			if additionalVelocity.length > 50:
-				inferior.Velocity += impulse * mtv.normalized() * (1-ratio)
-			inferior.Position -= mtv * (1-ratio) 
+	timing = profiler.profiling # Read once, so switching it on mid step can't leave half a record
+	if timing:
+		mark = profiler.beginFrame(Workspace)
+	descendants = Workspace._DescendantList() # Read only, so the cached list rather than a copy
+	config = getWorldConfig(Workspace) # Gravity, drag, elasticity and friction for this world
+	starts = recordStarts(descendants) if config.ContinuousCollision else None # Where everything was, so fast bodies can be swept from there
+	store = getBodyStore(Workspace)
+	if store:
+		store.Integrate(dt, config) # Every body at once
+	else:
+		for descendant in descendants:
+			descendant.Update(dt, config)
+	active = any(isActive(descendant) for descendant in descendants) # Otherwise everything is asleep or anchored, so nothing can collide
+	if timing:
+		mark = profiler.lap("Integrate", mark)
+		profiler.count("Bodies", len(descendants))
+		profiler.count("ActiveBodies", sum(1 for descendant in descendants if isActive(descendant)))
+	if active:
+		collide(Workspace, descendants, config, dt, timing, starts)
+	if timing:
+		mark = perf_counter()
+	for listener in stepListeners:
+		listener(Workspace, dt)
+	if timing:
+		profiler.lap("Listeners", mark)
+		profiler.endFrame()
+
+def collide(Workspace, descendants, config, dt, timing=False, starts=None): # Finds and resolves contacts, then puts resting islands to sleep.
+	if timing: # starts is where bodies were before integrating, when continuous collision is on
+		mark = perf_counter()
+	sweptBoxes = None
+	if starts != None:
+		displacements, sweptBoxes = sweepFastBodies(descendants, starts)
+	candidates = getBroadphase(Workspace).GetPairs(descendants, sweptBoxes)
+	pairs = activePairs(candidates)
+	if timing:
+		mark = profiler.lap("Broadphase", mark)
+		profiler.count("CandidatePairs", len(candidates))
+		profiler.count("ActivePairs", len(pairs))
+	if sweptBoxes:
+		advanced = advanceFastBodies(pairs, displacements, sweptBoxes, starts)
+		if timing:
+			mark = profiler.lap("Continuous", mark)
+			profiler.count("SweptBodies", len(sweptBoxes))
+			profiler.count("TimesOfImpact", len(advanced))
+	parallel = getParallelSolver(Workspace)
+	if parallel:
+		manifolds = parallel.Step(pairs, config) # The same again, an island at a time on worker processes
+		if timing: # Workers do the narrowphase and solving together, so it all goes down as solving
+			mark = profiler.lap("Solve", mark)
+	else:
+		manifolds = getContactCache(Workspace).Update(pairs) # Two point contact manifolds, with last frame's impulses
+		if timing:
+			mark = profiler.lap("Narrowphase", mark)
+		solveContacts(manifolds, config)
+		if timing:
+			mark = profiler.lap("Solve", mark)
+	if timing:
+		profiler.count("Manifolds", len(manifolds))
+		profiler.count("Contacts", sum(len(manifold.Contacts) for manifold in manifolds))
+	if config.AllowSleeping:
+		updateSleep(descendants, manifolds, dt)
+		if timing:
+			profiler.lap("Sleep", mark)
+
+def releaseWorld(workspace): # Drops everything kept about a workspace straight away. Without it, it all goes once the workspace is collected.
+	for index in (broadphases.pop(workspace.ID, None), stores.pop(workspace.ID, None), contactCaches.pop(workspace.ID, None), parallelSolvers.pop(workspace.ID, None)):
+		if hasattr(index, "Unwatch"): # Stops following reparenting and gives bodies their state back
+			index.Unwatch()
+		if hasattr(index, "Close"): # Stops the parallel solver's workers
+			index.Close()
+		workspace._Release(index)
+	setWorldConfig(workspace, None)
 
 # >> RIGID BODY HELPERS <<  (to speed up rigidbody creation and centralise them)
 
 def createRigidBody(n, size):
 	body = RigidBody()
-	empty = [body.AddVertex(size/2 * vertex) for vertex in findPointsOnUnitCircle(n)]# Scale up vectors
+	body.Shape = getNamedShape(("Regular", n, size), lambda: [size/2 * vertex for vertex in findPointsOnUnitCircle(n)]) # Scale up vectors. Only worked out the first time, every later body of the same n and size shares it.
 	body.Name = polygonNames[n]
 	return body
 
@@ -0,0 +1,66 @@
+# >> CREDITS <<
+# Islands.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module puts resting bodies to sleep and wakes them back up.
+# Bodies that touch form an island, and an island only sleeps once every body in it has been slow for timeToSleep.
+# Sleeping bodies are SafeAnchored, so they aren't integrated, pushed or collision tested against each other.
+# Anchored and sleeping bodies don't join islands together, just like the ground doesn't link everything on it.
+
+# >> MODULES <<
+from shared.settings import sleepVelocity, sleepAngularVelocity, timeToSleep
+
+# >> FUNCTIONS <<
+
+def isActive(body): # Awake and free to move
+	return not (body.Anchored or body.SafeAnchored)
+
+def findRoot(parents, key): # Union find lookup. parents maps every key to its parent, roots to themselves.
+	while parents[key] != key:
+		parents[key] = parents[parents[key]] # Path halving keeps the trees flat
+		key = parents[key]
+	return key
+
+def join(parents, keyA, keyB):
+	rootA, rootB = findRoot(parents, keyA), findRoot(parents, keyB)
+	if rootA != rootB:
+		parents[rootA] = rootB
+
+def findIslands(bodies, manifolds): # Groups active bodies that are touching each other, using union find
+	parents = {body.ID: body.ID for body in bodies}
+	for manifold in manifolds:
+		if manifold.BodyA.ID in parents and manifold.BodyB.ID in parents:
+			join(parents, manifold.BodyA.ID, manifold.BodyB.ID)
+	islands = {}
+	for body in bodies:
+		islands.setdefault(findRoot(parents, body.ID), []).append(body)
+	return list(islands.values())
+
+def groupPairs(pairs): # Splits broadphase pairs into groups that share no active body, so each group can be solved on its own.
+	parents = {} # Returns lists of indices into pairs, in order. Anchored bodies can be in several groups since nothing moves them.
+	for bodyA, bodyB in pairs:
+		keys = [body.ID for body in (bodyA, bodyB) if isActive(body)]
+		for key in keys:
+			parents.setdefault(key, key)
+		if len(keys) == 2:
+			join(parents, keys[0], keys[1])
+	groups = {}
+	for index, (bodyA, bodyB) in enumerate(pairs):
+		groups.setdefault(findRoot(parents, (bodyA if isActive(bodyA) else bodyB).ID), []).append(index)
+	return list(groups.values())
+
+def updateSleep(bodies, manifolds, dt): # Call after the contact solver
+	for manifold in manifolds: # A sleeping body wakes when an active body starts touching it or hits it while moving
+		for sleeper, other in ((manifold.BodyA, manifold.BodyB), (manifold.BodyB, manifold.BodyA)):
+			if sleeper.SafeAnchored and isActive(other) and (manifold.Began or other._SleepTime == 0):
+				sleeper.Wake()
+	active = [body for body in bodies if isActive(body)]
+	for body in active:
+		if body.Velocity.length < sleepVelocity and abs(body.AngularVelocity) < sleepAngularVelocity:
+			body._SleepTime += dt
+		else:
+			body._SleepTime = 0
+	for island in findIslands(active, manifolds):
+		if min(body._SleepTime for body in island) >= timeToSleep:
+			for body in island:
+				body.Sleep(island)
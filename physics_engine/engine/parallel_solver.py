@@ -0,0 +1,283 @@
+# >> CREDITS <<
+# Parallel_Solver.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module runs the narrowphase and contact solver on several worker processes at once.
+# Broadphase pairs are split into islands that share no movable body (islands.groupPairs),
+# so each island can be collided and solved on its own without waiting for the others.
+# Body state and shapes go to the workers through shared memory arrays, one row per body, instead of pickling RigidBodies.
+# Only row numbers, warm start impulses and the resulting contacts are sent back and forth.
+# Every island is solved the same way whichever worker gets it, so the results don't depend on the number of workers.
+# Switched on with parallelWorkers in settings. Needs NumPy.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from engine.collisions import findSeparation, getContactManifold, getContactCache, Contact, Manifold, ContactCache
+from engine.contact_solver import solveManifolds, solverStats, writeBack
+from engine.islands import groupPairs
+from shared.settings import parallelWorkers
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from weakref import WeakValueDictionary, finalize
+import atexit
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+parallelSolvers = WeakValueDictionary() # Workspace ID >> ParallelSolver. The Workspace holds its own (UIBase._Keep), so it goes when the Workspace does.
+stateColumns = 15 # x, y, rotation, velocity x, y, angular velocity, mass, inertia, fixed, then the solved velocity x, y, angular velocity, shift x, y and turn
+attached = {} # Worker side. Shared memory name >> SharedMemory, kept open from one job to the next
+
+# >> FUNCTIONS <<
+
+def loadNumpy(): # Only needed when parallelWorkers is switched on
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("The parallel solver needs NumPy, set parallelWorkers to 0 or install numpy")
+		numpy = module
+
+def getParallelSolver(workspace): # The workspace's parallel solver, or None if it's switched off in settings
+	if not parallelWorkers:
+		return None
+	solver = parallelSolvers.get(workspace.ID)
+	if solver == None:
+		solver = ParallelSolver(workspace, parallelWorkers)
+		parallelSolvers[workspace.ID] = solver
+		workspace._Keep(solver)
+	return solver
+
+def closeParallelSolvers(): # Stops the workers and frees the shared memory
+	for solver in list(parallelSolvers.values()):
+		solver.Close()
+	parallelSolvers.clear()
+
+def releaseResources(executor, blocks): # What a ParallelSolver leaves behind, closed by Close or once the solver is thrown away
+	if executor:
+		executor.shutdown()
+	releaseBlocks(blocks)
+
+def releaseBlocks(blocks):
+	for block in blocks:
+		block.close()
+		block.unlink()
+	blocks.clear() # Cleared rather than replaced, since the solver's finalizer holds this list
+
+atexit.register(closeParallelSolvers)
+
+def viewArrays(buffer, layout): # Splits the geometry buffer into (offsets, local vertices, local axes)
+	bodyCount, vertexCount, axisCount = layout
+	flat = numpy.ndarray(bodyCount*4 + vertexCount*2 + axisCount*3, dtype=numpy.float64, buffer=buffer)
+	vertexStart = bodyCount*4
+	axisStart = vertexStart + vertexCount*2
+	return flat[:vertexStart].reshape(bodyCount, 4), flat[vertexStart:axisStart].reshape(vertexCount, 2), flat[axisStart:].reshape(axisCount, 3)
+
+def openArrays(names, layout): # Worker side. Attaches to the solver's current shared memory blocks, letting go of old ones.
+	loadNumpy()
+	for name in list(attached):
+		if not name in names:
+			attached.pop(name).close()
+	for name in names:
+		if not name in attached:
+			attached[name] = shared_memory.SharedMemory(name=name) # Workers share the solver's resource tracker, so only the solver unlinks it
+	stateName, geometryName = names
+	state = numpy.ndarray((layout[0], stateColumns), dtype=numpy.float64, buffer=attached[stateName].buf)
+	return (state,) + viewArrays(attached[geometryName].buf, layout)
+
+def readBody(row, state, offsets, vertices, axes): # Builds a SharedBody from its row
+	x, y, rotation, velocityX, velocityY, angularVelocity, mass, inertia, fixed = state[row, :9].tolist()
+	vertexStart, vertexCount, axisStart, axisCount = (int(value) for value in offsets[row].tolist())
+	position = Vector2(x, y)
+	body = SharedBody(row)
+	body.AbsolutePosition = position
+	body.Velocity = Vector2(velocityX, velocityY)
+	body.AngularVelocity = angularVelocity
+	body.Mass, body.Inertia, body.Anchored = mass, inertia, fixed == 1
+	body.Vertices = [Vector2(vertex).rotatedRadians(rotation) + position for vertex in vertices[vertexStart:vertexStart+vertexCount].tolist()]
+	body.Axes = [(Vector2(axisX, axisY).rotatedRadians(rotation), paired == 1) for axisX, axisY, paired in axes[axisStart:axisStart+axisCount].tolist()]
+	return body
+
+def solveIslands(job, arrays=None): # Narrowphase and contact solving for a list of islands, on a worker or in this process
+	config, islands, names, layout = job
+	state, offsets, vertices, axes = arrays or openArrays(names, layout)
+	bodies = {} # Row >> SharedBody
+	cache = ContactCache() # Holds last frame's contacts sent with the job, so the usual matching warm starts them
+	results, solvedRows = [], []
+	velocityIterations, positionIterations = 0, 0
+	for island in islands:
+		manifolds = []
+		for index, rowA, rowB, previous in island:
+			for row in (rowA, rowB):
+				if not row in bodies:
+					bodies[row] = readBody(row, state, offsets, vertices, axes)
+			separation = findSeparation(bodies[rowA], bodies[rowB])
+			if separation == None:
+				continue
+			manifold = getContactManifold(bodies[rowA], bodies[rowB], *separation)
+			if previous != None:
+				cache.Manifolds[(rowA, rowB)] = rememberManifold(previous)
+				cache.Match((rowA, rowB), manifold)
+			manifolds.append((index, manifold))
+		if not manifolds:
+			continue
+		solved = solveManifolds([manifold for index, manifold in manifolds], config)
+		velocityIterations = max(velocityIterations, solverStats["VelocityIterations"])
+		positionIterations = max(positionIterations, solverStats["PositionIterations"])
+		for row, body in solved.items():
+			if body.InverseMass or body.InverseInertia: # Fixed bodies can be in several islands at once, so they are never written
+				state[row, 9:] = (body.VelocityX, body.VelocityY, body.AngularVelocity, body.ShiftX, body.ShiftY, body.Turn)
+				solvedRows.append(row)
+		for index, manifold in manifolds:
+			contacts = [(contact.Point.x, contact.Point.y, contact.Depth, contact.ID, contact.NormalImpulse, contact.TangentImpulse) for contact in manifold.Contacts]
+			results.append((index, manifold.Normal.x, manifold.Normal.y, manifold.Depth, manifold.Began, contacts))
+	return results, solvedRows, cache.WarmStarted, velocityIterations, positionIterations
+
+def rememberManifold(contacts): # Last frame's [(contact ID, normal impulse, tangent impulse)] as a Manifold for ContactCache.Match
+	manifold = Manifold(None, None, None, 0)
+	for ID, normalImpulse, tangentImpulse in contacts:
+		contact = Contact(None, 0, ID)
+		contact.NormalImpulse, contact.TangentImpulse = normalImpulse, tangentImpulse
+		manifold.Contacts.append(contact)
+	return manifold
+
+def shareOut(islands, buckets): # Splits islands into buckets with about the same number of pairs, biggest islands first
+	loads = [[0, bucket, []] for bucket in range(buckets)]
+	for island in sorted(islands, key=len, reverse=True):
+		lightest = min(loads)
+		lightest[0] += len(island)
+		lightest[2].append(island)
+	return [islandList for load, bucket, islandList in loads if islandList]
+
+# >> CLASSES <<
+
+class SharedBody: # The parts of a RigidBody the narrowphase and solver read, rebuilt from a shared row on a worker
+
+	__slots__ = ["ID", "AbsolutePosition", "Vertices", "Axes", "Velocity", "AngularVelocity", "Mass", "Inertia", "Anchored", "SafeAnchored"]
+
+	def __init__(self, row):
+		self.ID = row
+		self.SafeAnchored = False # Sleeping bodies are written as fixed
+
+class ParallelSolver:
+
+	__slots__ = ["Workspace", "Workers", "Rows", "_Shapes", "_Executor", "_Blocks", "_Names", "_Layout", "_State", "_Geometry", "_Finalizer", "__weakref__"]
+
+	def __init__(self, workspace, workers):
+		loadNumpy()
+		self.Workspace = workspace
+		self.Workers = workers # 1 solves the islands in this process, the same way the workers would
+		self.Rows = {} # Body ID >> row in the shared arrays
+		self._Shapes = {} # Body ID >> the Shape it was packed with, which is replaced whenever its vertices change
+		self._Executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+		self._Blocks = [] # SharedMemory blocks, when there are workers
+		self._Names = None
+		self._Layout = (0, 0, 0)
+		self._State = None
+		self._Geometry = None
+		self._Finalizer = finalize(self, releaseResources, self._Executor, self._Blocks) # Frees the workers and shared memory even if Close is never called
+
+	def Close(self):
+		self._Finalizer() # Only does anything the first time
+		self._Executor = None
+
+	def _Release(self):
+		releaseBlocks(self._Blocks)
+
+	def _Allocate(self, size): # float64 array of size, in shared memory if there are workers
+		if not self._Executor:
+			return numpy.zeros(size), None
+		block = shared_memory.SharedMemory(create=True, size=max(size, 1)*8)
+		self._Blocks.append(block)
+		return numpy.ndarray(size, dtype=numpy.float64, buffer=block.buf), block
+
+	# >> PACKING <<
+
+	def Repack(self, bodies): # Gives every body a row and copies its local vertices and axes into the geometry arrays
+		self._Release()
+		self.Rows = {body.ID: row for row, body in enumerate(bodies)}
+		self._Shapes = {body.ID: body.Shape for body in bodies}
+		self._Layout = (len(bodies), sum(len(body._Vertices) for body in bodies), sum(len(body.LocalAxes) for body in bodies))
+		state, stateBlock = self._Allocate(len(bodies)*stateColumns)
+		geometry, geometryBlock = self._Allocate(len(bodies)*4 + self._Layout[1]*2 + self._Layout[2]*3)
+		self._State = state.reshape(len(bodies), stateColumns)
+		self._Geometry = viewArrays(geometry, self._Layout)
+		self._Names = (stateBlock.name, geometryBlock.name) if stateBlock else None
+		offsets, vertices, axes = self._Geometry
+		vertexStart, axisStart = 0, 0
+		for row, body in enumerate(bodies):
+			localVertices, localAxes = body._Vertices, body.LocalAxes
+			offsets[row] = vertexStart, len(localVertices), axisStart, len(localAxes)
+			for vertex in localVertices:
+				vertices[vertexStart] = vertex.x, vertex.y
+				vertexStart += 1
+			for axis, paired in localAxes:
+				axes[axisStart] = axis.x, axis.y, 1 if paired else 0
+				axisStart += 1
+
+	def _Write(self, body): # Copies the body's current state into its row
+		position, velocity = body.AbsolutePosition, body.Velocity
+		fixed = 1 if body.Anchored or body.SafeAnchored else 0
+		self._State[self.Rows[body.ID], :9] = (position.x, position.y, body.Rotation, velocity.x, velocity.y, body.AngularVelocity, body.Mass, body.Inertia, fixed)
+
+	# >> STEPPING <<
+
+	def Step(self, pairs, config): # Does what ContactCache.Update and solveContacts do, island by island. Returns the manifolds.
+		cache = getContactCache(self.Workspace)
+		if not pairs:
+			cache.Manifolds, cache.WarmStarted = {}, 0
+			return []
+		bodies = {}
+		for pair in pairs:
+			for body in pair:
+				bodies[body.ID] = body
+		if any(not ID in self.Rows or self._Shapes[ID] is not body.Shape for ID, body in bodies.items()):
+			self.Repack(self.Workspace._DescendantList())
+		for body in bodies.values():
+			self._Write(body)
+		islands = []
+		for group in groupPairs(pairs):
+			island = []
+			for index in group:
+				bodyA, bodyB = pairs[index]
+				previous = cache.Manifolds.get((bodyA.ID, bodyB.ID))
+				if previous != None:
+					previous = [(contact.ID, contact.NormalImpulse, contact.TangentImpulse) for contact in previous.Contacts]
+				island.append((index, self.Rows[bodyA.ID], self.Rows[bodyB.ID], previous))
+			islands.append(island)
+		if self._Executor:
+			jobs = [(config, islandList, self._Names, self._Layout) for islandList in shareOut(islands, self.Workers*4)] # A few jobs per worker evens out the load
+			outcomes = list(self._Executor.map(solveIslands, jobs))
+		else:
+			outcomes = [solveIslands((config, islands, None, self._Layout), (self._State,) + self._Geometry)]
+		found = [None]*len(pairs)
+		solvedRows = set()
+		cache.WarmStarted = 0
+		solverStats["VelocityIterations"], solverStats["PositionIterations"] = 0, 0
+		for results, rows, warmStarted, velocityIterations, positionIterations in outcomes:
+			solvedRows.update(rows)
+			cache.WarmStarted += warmStarted
+			solverStats["VelocityIterations"] = max(solverStats["VelocityIterations"], velocityIterations)
+			solverStats["PositionIterations"] = max(solverStats["PositionIterations"], positionIterations)
+			for result in results:
+				found[result[0]] = result
+		for ID, body in bodies.items(): # Same as SolverBody.WriteBack
+			if self.Rows[ID] in solvedRows:
+				writeBack(body, *self._State[self.Rows[ID], 9:].tolist())
+		manifolds = {}
+		for result in found:
+			if result == None:
+				continue
+			index, normalX, normalY, depth, began, contacts = result
+			bodyA, bodyB = pairs[index]
+			manifold = Manifold(bodyA, bodyB, Vector2(normalX, normalY), depth)
+			manifold.Began = began
+			for pointX, pointY, contactDepth, ID, normalImpulse, tangentImpulse in contacts:
+				contact = Contact(Vector2(pointX, pointY), contactDepth, ID)
+				contact.NormalImpulse, contact.TangentImpulse = normalImpulse, tangentImpulse
+				manifold.Contacts.append(contact)
+			manifolds[(bodyA.ID, bodyB.ID)] = manifold
+		cache.Manifolds = manifolds
+		return list(manifolds.values())
@@ -0,0 +1,138 @@
+# >> CREDITS <<
+# Profiler.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module times each phase of updatePhysics (integration, broadphase, continuous collision, narrowphase, solving, sleeping)
+# and counts bodies integrated, pairs, contacts and Vector2s made, one record per step.
+# It's off until enableProfiling is called. When off, updatePhysics only checks the profiling flag,
+# and Vector2 is left alone, so there's nothing to pay for. Counting Vector2s swaps in a counting __init__ while it's on.
+# The last windowSize records are kept for getStats. Functions in frameListeners get every record as it's finished,
+# and exportFrames writes them to a file, one JSON object per line.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+
+import json
+from collections import deque
+from statistics import mean, median
+from time import perf_counter
+
+# >> GLOBALS <<
+
+profiling = False # Checked by updatePhysics and checkCollisions. Use enableProfiling and disableProfiling to change it.
+phaseNames = ["Integrate", "Broadphase", "Continuous", "Narrowphase", "Solve", "Sleep", "Listeners"]
+frames = deque(maxlen=120) # The latest records, oldest first
+frameListeners = [] # Functions called with every finished record
+current = None # Record being filled in, or None between steps
+frameCount = 0
+vectorCount = 0 # Vector2s made since counting started
+originalInit = Vector2.__init__
+
+# >> UTILITY FUNCTIONS <<
+
+def countingInit(self, x_or_pair=None, y=None): # Stands in for Vector2.__init__ while Vector2s are being counted
+	global vectorCount
+	vectorCount += 1
+	originalInit(self, x_or_pair, y)
+
+def percentile(values, fraction):
+	ordered = sorted(values)
+	return ordered[min(len(ordered)-1, int(fraction*len(ordered)))]
+
+def summarise(values):
+	return {"Mean": mean(values), "Median": median(values), "P95": percentile(values, 0.95), "Max": max(values)}
+
+# >> FUNCTIONS <<
+
+def enableProfiling(windowSize=120, countVectors=True): # Starts recording. windowSize is how many records getStats looks back over.
+	global profiling, frames
+	if frames.maxlen != windowSize:
+		frames = deque(frames, maxlen=windowSize)
+	Vector2.__init__ = countingInit if countVectors else originalInit
+	profiling = True
+
+def disableProfiling(): # Stops recording and puts Vector2 back. Records already kept stay until clearFrames.
+	global profiling, current
+	Vector2.__init__ = originalInit
+	profiling = False
+	current = None
+
+def clearFrames():
+	frames.clear()
+
+def beginFrame(workspace=None): # Starts a record for one updatePhysics call and returns when it started, for lap
+	global current, frameCount
+	frameCount += 1
+	current = {
+		"Frame": frameCount,
+		"Workspace": str(workspace.ID) if workspace else None,
+		"Phases": {}, # Phase name >> ms
+		"Vectors": {}, # Phase name >> Vector2s made in it
+		"Counters": {},
+		"Total": 0,
+		"Start": perf_counter(),
+		"VectorMark": vectorCount,
+	}
+	return current["Start"]
+
+def lap(name, mark): # Adds the time since mark to phase name and returns now, to be the mark for the next phase
+	now = perf_counter()
+	phases, vectors = current["Phases"], current["Vectors"]
+	phases[name] = phases.get(name, 0) + (now-mark)*1000
+	vectors[name] = vectors.get(name, 0) + vectorCount - current["VectorMark"]
+	current["VectorMark"] = vectorCount
+	return now
+
+def count(name, amount): # Adds amount to one of this record's counters, like "Contacts"
+	counters = current["Counters"]
+	counters[name] = counters.get(name, 0) + amount
+
+def endFrame(): # Finishes the record, keeps it and hands it to the frame listeners
+	global current
+	record = current
+	current = None
+	record["Total"] = (perf_counter()-record.pop("Start"))*1000
+	record.pop("VectorMark")
+	record["Counters"]["Vectors"] = sum(record["Vectors"].values())
+	frames.append(record)
+	for listener in frameListeners:
+		listener(record)
+	return record
+
+def getStats(lastFrames=None): # Mean, median, 95th percentile and max of every phase and counter over the latest records
+	records = list(frames)[-lastFrames:] if lastFrames else list(frames)
+	if not records:
+		return {}
+	stats = {"Frames": len(records), "Total": summarise([record["Total"] for record in records]), "Phases": {}, "Counters": {}}
+	for key in ("Phases", "Counters"):
+		names = {name for record in records for name in record[key]}
+		for name in sorted(names, key=lambda name: (phaseNames.index(name) if name in phaseNames else len(phaseNames), name)):
+			stats[key][name] = summarise([record[key].get(name, 0) for record in records])
+	return stats
+
+def exportFrames(path): # Writes every record from now on to path until Close is called on what this returns
+	exporter = FrameExporter(path)
+	frameListeners.append(exporter.Write)
+	return exporter
+
+# >> CLASSES <<
+
+class FrameExporter: # Appends records to a file as JSON lines
+
+	__slots__ = ["Path", "Frames", "_File"]
+
+	def __init__(self, path):
+		self.Path = path
+		self.Frames = 0 # Records written so far
+		self._File = open(path, "a")
+
+	def Write(self, record):
+		self._File.write(json.dumps(record) + "\n")
+		self.Frames += 1
+
+	def Close(self):
+		if self.Write in frameListeners:
+			frameListeners.remove(self.Write)
+		if self._File != None:
+			self._File.close()
+			self._File = None
@@ -0,0 +1,197 @@
+# >> CREDITS <<
+# Renderer.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module draws the engine model onto a pygame surface.
+# It is the only part of the engine that needs pygame, so headless simulations never import it.
+# What to draw is compiled into a DrawList, a flat list of (instance, draw function) in painting order.
+# It's only rebuilt when something under its root is reparented or has its ZIndex or Visible changed, so a frame is one pass over it.
+# render redraws everything. DirtyRenderer only repaints the parts of the screen where something moved or changed,
+# and returns those rectangles for display.update, so still walls and the interface cost nothing after the first frame.
+
+# >> MODULES <<
+from pygame import draw, Rect
+
+from math import floor, ceil
+from weakref import WeakValueDictionary
+
+# >> GLOBALS <<
+
+imageClasses = ["ImageLabel", "ImageButton"]
+drawLists = WeakValueDictionary() # Root ID >> DrawList, for render. The root holds its own (UIBase._Keep), so it goes when the root does.
+fullRedrawFraction = 0.5 # Past this much of the screen being dirty, one full redraw is cheaper than lots of small ones
+bucketSize = 64 # px. Instances are sorted into cells this big, so repainting a region only looks at what's near it
+
+# >> UTILITY FUNCTIONS <<
+
+def drawOrder(object): # Every visible instance under object, in the order render paints them
+	if object.Visible:
+		renderAfter = []
+		for child in object.GetChildren(): # If they are a lower or equal ZIndex, render them before the parent
+			if child.ZIndex >= object.ZIndex:
+				yield from drawOrder(child)
+			else:
+				renderAfter.append(child) # If they are lower than ZIndex of parent, render them after
+		yield object
+		for child in renderAfter:
+			yield from drawOrder(child)
+
+def polygonVertices(object, stepper=None): # Polygons are interpolated if there is a stepper
+	return stepper.InterpolatedVertices(object) if stepper else object.Vertices
+
+def drawPolygon(object, display, vertices): # Draw functions all take the vertices, but only polygons use them
+	draw.polygon(display, object.Colour, vertices)
+
+def drawRectangle(object, display, vertices):
+	display.fill(object.Colour, object.Rectangle)
+
+def drawEllipse(object, display, vertices):
+	draw.ellipse(display, object.Colour, object.Rectangle)
+
+def drawImage(object, display, vertices):
+	object.Draw(display) # Custom render function for these objects
+
+drawFunctions = { # ClassName >> draw function, looked up when a DrawList is built rather than every frame
+	"Polygon": drawPolygon,
+	"Rectangle": drawRectangle,
+	"Ellipse": drawEllipse,
+	"ImageLabel": drawImage,
+	"ImageButton": drawImage,
+}
+def boundsOf(object, vertices=None): # Screen pixels the instance can touch, with a pixel spare for rounding
+	if vertices != None:
+		if len(vertices) < 3:
+			return None
+		xs, ys = [vertex[0] for vertex in vertices], [vertex[1] for vertex in vertices]
+		left, top = floor(min(xs))-1, floor(min(ys))-1
+		return Rect(left, top, ceil(max(xs))+2-left, ceil(max(ys))+2-top)
+	return Rect(object.Rectangle).inflate(2, 2)
+
+def bucketInstances(instances, screen): # (cell x, cell y) >> indexes into instances of everything on screen touching that cell
+	buckets = {}
+	for index, (instance, drawFunction, vertices, bounds) in enumerate(instances):
+		bounds = bounds.clip(screen) # Walls and floors reach well off screen, and nothing there is ever repainted
+		if not (bounds.width and bounds.height):
+			continue
+		for x in range(bounds.left//bucketSize, (bounds.right-1)//bucketSize+1):
+			for y in range(bounds.top//bucketSize, (bounds.bottom-1)//bucketSize+1):
+				buckets.setdefault((x, y), []).append(index)
+	return buckets
+
+def instancesNear(buckets, region, instances): # Everything in the cells region covers, still in painting order
+	indexes = set()
+	for x in range(region.left//bucketSize, (region.right-1)//bucketSize+1):
+		for y in range(region.top//bucketSize, (region.bottom-1)//bucketSize+1):
+			indexes.update(buckets.get((x, y), ()))
+	return [instances[index] for index in sorted(indexes)]
+
+def mergeRectangles(rectangles): # Joins overlapping rectangles until none overlap, so no pixel is repainted twice
+	merged = []
+	for rectangle in rectangles:
+		while True:
+			index = rectangle.collidelist(merged)
+			if index == -1:
+				break
+			rectangle = rectangle.union(merged.pop(index))
+		merged.append(rectangle)
+	return merged
+
+# >> FUNCTIONS <<
+
+def getDrawList(root):
+	drawList = drawLists.get(root.ID)
+	if drawList == None:
+		drawList = DrawList(root)
+		drawLists[root.ID] = drawList
+		root._Keep(drawList)
+	return drawList
+
+def render(object, display, stepper=None): # Renders object and all of object's descendants. Polygons are interpolated if there is a stepper.
+	if object.ClassName == "EngineModel": # EngineModel sets game background of course.
+		display.fill(object.Colour)
+	for instance, drawFunction in getDrawList(object).Update():
+		drawFunction(instance, display, polygonVertices(instance, stepper) if drawFunction is drawPolygon else None)
+
+# >> CLASSES <<
+
+class DrawList: # Everything under Root to draw, in order, rebuilt only when the structure, ZIndex or Visible change under Root
+
+	__slots__ = ["Root", "Commands", "Version", "Builds", "__weakref__"]
+
+	def __init__(self, root):
+		self.Root = root
+		self.Commands = [] # (instance, draw function) in painting order
+		self.Version = None # Root._TreeVersion when Commands were built
+		self.Builds = 0 # How many times it has been rebuilt
+
+	def Update(self): # Commands, rebuilt first if the tree has changed since
+		if self.Version != self.Root._TreeVersion:
+			self.Commands = [(instance, drawFunctions[instance.ClassName]) for instance in drawOrder(self.Root) if instance.ClassName in drawFunctions]
+			self.Version = self.Root._TreeVersion
+			self.Builds += 1
+		return self.Commands
+
+class DirtyRenderer: # Remembers where everything was drawn last frame and repaints only what changed
+
+	__slots__ = ["Model", "Display", "DrawList", "Regions", "_Drawn", "_Background"]
+
+	def __init__(self, model, display):
+		self.Model = model # The EngineModel
+		self.Display = display
+		self.DrawList = getDrawList(model)
+		self.Regions = [] # Rectangles repainted last frame
+		self._Drawn = None # ID >> (bounds, what it looked like, vertices) for everything drawn last frame. None forces a full redraw.
+		self._Background = None
+
+	def Invalidate(self): # Makes the next Render redraw everything, for when the display was drawn over by something else
+		self._Drawn = None
+
+	def Render(self, stepper=None): # Draws this frame and returns the rectangles to pass to display.update
+		screen = self.Display.get_rect()
+		background = tuple(self.Model.Colour)
+		drawn, dirty, instances = {}, [], []
+		previous = self._Drawn if background == self._Background else None
+		for instance, drawFunction in self.DrawList.Update():
+			look = (instance.TransformGeneration, tuple(instance.Colour), instance.ZIndex) # Moving, resizing or reparenting bumps TransformGeneration
+			if drawFunction is drawPolygon: # Shapes are swapped rather than edited, and the blend moves between steps
+				look += (instance._Vertices, instance.Rotation, stepper.Blend(instance) if stepper else None)
+			elif instance.ClassName in imageClasses: # Recolouring changes the image's pixels without replacing it
+				look += (instance._InternalImage, tuple(instance._ImageColour))
+			before = previous.pop(instance.ID, None) if previous != None else None
+			if before != None and before[1] == look: # Unchanged, so last frame's vertices and bounds still hold
+				bounds, vertices = before[0], before[2]
+			else:
+				vertices = polygonVertices(instance, stepper) if drawFunction is drawPolygon else None
+				bounds = boundsOf(instance, vertices)
+				if bounds == None:
+					if before != None: # Was drawn last frame but has nothing to draw now
+						dirty.append(before[0])
+					continue
+				if previous != None:
+					if before != None: # Moved or changed, so where it was and where it is now both need painting
+						dirty.append(before[0])
+					dirty.append(bounds) # New, just made visible, moved or changed
+			drawn[instance.ID] = (bounds, look, vertices)
+			instances.append((instance, drawFunction, vertices, bounds))
+		self._Drawn, self._Background = drawn, background
+		if previous == None:
+			return self._Repaint([screen], background, instances)
+		dirty.extend(bounds for bounds, look, vertices in previous.values()) # Removed or hidden since last frame
+		regions = [region.clip(screen) for region in mergeRectangles(dirty)]
+		regions = [region for region in regions if region.width and region.height]
+		if sum(region.width*region.height for region in regions) > fullRedrawFraction*screen.width*screen.height:
+			regions = [screen]
+		return self._Repaint(regions, background, instances)
+
+	def _Repaint(self, regions, background, instances): # Fills each region then draws everything overlapping it, clipped to it
+		display = self.Display
+		buckets = bucketInstances(instances, display.get_rect()) if len(regions) > 1 else None # One region is usually the whole screen
+		for region in regions:
+			display.set_clip(region)
+			display.fill(background, region)
+			for instance, drawFunction, vertices, bounds in (instancesNear(buckets, region, instances) if buckets != None else instances):
+				if bounds.colliderect(region):
+					drawFunction(instance, display, vertices)
+		display.set_clip(None)
+		self.Regions = regions
+		return regions
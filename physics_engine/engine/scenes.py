@@ -0,0 +1,139 @@
+# >> CREDITS <<
+# Scenes.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module builds the same test scenes every time, for sweeps and benchmarks that run without a window.
+# Each builder takes how many bodies to make and a seed, and returns the engine model from createModel.
+# Builders are looked up by name in scenes so they can be picked in another process.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, createRigidBody, createRigidBodyFromVertices
+
+from random import Random
+
+# >> GLOBALS <<
+
+floorHeight = 430 # y of the top of the ground, near the bottom of the Workspace
+
+# >> UTILITY FUNCTIONS <<
+
+def createBox(width, height):
+	return createRigidBodyFromVertices(Vector2(-width/2, height/2), Vector2(width/2, height/2), Vector2(width/2, -height/2), Vector2(-width/2, -height/2))
+
+def addGround(workspace, width=800): # Anchored floor centred on the Workspace, wide enough for the scene
+	ground = createBox(width, 40)
+	ground.Name = "Ground"
+	ground.Anchored = True
+	ground.Mass = 0
+	ground.Position = Vector2(400, floorHeight+20)
+	ground.Parent = workspace
+	return ground
+
+def addWalls(workspace, width, height): # Anchored walls 200 thick just outside (0, 0) to (width, height), like app.run's boundaries
+	walls = []
+	for name, size, position in (
+		("BottomBoundary", (width, 200), (width/2, height+99)),
+		("TopBoundary", (width, 200), (width/2, -101)),
+		("LeftBoundary", (200, height), (-100, height/2)),
+		("RightBoundary", (200, height), (width+99, height/2)),
+	):
+		wall = createBox(*size)
+		wall.Name = name
+		wall.Anchored = True
+		wall.Mass = 0
+		wall.Position = Vector2(*position)
+		wall.Parent = workspace
+		walls.append(wall)
+	return walls
+
+def scatter(game, count, generator, spacing, velocity): # Random polygons on a jittered grid, spacing apart, inside walls that fit them
+	columns = max(1, round(count**0.5 * 16/9))
+	rows = (count+columns-1)//columns
+	width, height = columns*spacing, rows*spacing
+	addWalls(game.Workspace, width, height)
+	for i in range(count):
+		body = createRigidBody(generator.randint(3, 8), generator.uniform(20, 40))
+		row, column = divmod(i, columns)
+		jitter = (spacing-40)/2
+		body.Position = Vector2((column+0.5)*spacing + generator.uniform(-jitter, jitter), (row+0.5)*spacing + generator.uniform(-jitter, jitter))
+		body.Rotation = generator.uniform(0, 6.3)
+		body.Velocity = Vector2(generator.uniform(-velocity, velocity), generator.uniform(-velocity, velocity))
+		body.Parent = game.Workspace
+	return game
+
+# >> FUNCTIONS <<
+
+def buildStack(count, seed=0): # One column of boxes resting on each other
+	game = createModel()
+	addGround(game.Workspace)
+	for i in range(count):
+		box = createBox(40, 40)
+		box.Name = f"Box{i}"
+		box.Position = Vector2(400, floorHeight - 20 - 40.5*i)
+		box.Parent = game.Workspace
+	return game
+
+def buildPyramid(count, seed=0): # Rows of boxes, each one shorter than the one below, using count boxes in total
+	game = createModel()
+	base = 1
+	while base*(base+1)//2 < count:
+		base += 1
+	addGround(game.Workspace, max(800, base*44 + 200))
+	made = 0
+	for row in range(base):
+		for column in range(base-row):
+			if made == count:
+				return game
+			box = createBox(40, 40)
+			box.Name = f"Box{made}"
+			box.Position = Vector2(400 + (column - (base-row-1)/2)*42, floorHeight - 20 - 40.5*row)
+			box.Parent = game.Workspace
+			made += 1
+	return game
+
+def buildPile(count, seed=0): # Random polygons dropped from a grid, so they land in a heap
+	game = createModel()
+	generator = Random(seed)
+	columns = min(count, 16)
+	width = max(800, columns*50 + 100)
+	addGround(game.Workspace, width)
+	for i in range(count):
+		body = createRigidBody(generator.randint(3, 8), generator.uniform(20, 40))
+		row, column = divmod(i, columns)
+		body.Position = Vector2(400 + (column - (columns-1)/2)*50 + generator.uniform(-4, 4), floorHeight - 40 - row*50)
+		body.Rotation = generator.uniform(0, 1)
+		body.Parent = game.Workspace
+	return game
+
+def buildColumns(count, seed=0): # Stacks of five boxes side by side, far enough apart that each one is its own island
+	game = createModel()
+	columns = (count+4)//5
+	addGround(game.Workspace, max(800, columns*60 + 100))
+	for i in range(count):
+		column, level = divmod(i, 5)
+		box = createBox(40, 40)
+		box.Name = f"Box{i}"
+		box.Position = Vector2(400 + (column - (columns-1)/2)*60, floorHeight - 20 - 40.5*level)
+		box.Parent = game.Workspace
+	return game
+
+def buildBox(count, seed=0): # Random polygons packed into a walled box, moving in every direction
+	return scatter(createModel(), count, Random(seed), 50, 100)
+
+def buildField(count, seed=0): # A few polygons spread thinly between big walls, so most of the area is empty
+	return scatter(createModel(), count, Random(seed), 200, 50)
+
+scenes = {
+	"Stack": buildStack,
+	"Pyramid": buildPyramid,
+	"Pile": buildPile,
+	"Columns": buildColumns,
+	"Box": buildBox,
+	"Field": buildField,
+}
+
+def buildScene(name, count, seed=0):
+	if not name in scenes:
+		raise ValueError(f"Unknown scene, {name}")
+	return scenes[name](count, seed)
@@ -0,0 +1,208 @@
+# >> CREDITS <<
+# Snapshots.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module saves every RigidBody in a Workspace to a binary keyframe file and loads it back.
+# A file is a header, one fixed size record per body, then a pool of every body's local vertices and a pool of their forces.
+# Records are a NumPy structured array, so saving is a few array copies and writes rather than deepcopying bodies.
+# Loading memory maps the file and only builds a RigidBody when it's asked for, so opening a big keyframe is instant.
+# The version number goes up whenever the layout changes, and older versions are refused rather than misread.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.colour import Colour
+from classes.rigidbody import RigidBody
+from classes.vector2array import Vector2Array
+from classes.shape import getShape
+from engine.body_store import stores
+
+from itertools import chain
+from operator import attrgetter
+from struct import Struct
+from uuid import UUID
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+magic = b"PHYSSNAP"
+snapshotVersion = 1
+header = Struct("<8sIIIId") # magic, version, bodies, vertices, forces, simulation time
+recordType = [ # Little endian so files move between machines
+	("ID", "S16"),
+	("Name", "S32"), # UTF-8, cut off at 32 bytes
+	("Parent", "<i4"), # Record of the parent body, or -1 for the Workspace. Parents always come before their children.
+	("Flags", "u1"), # anchoredFlag | sleepingFlag | visibleFlag | bulletFlag | arrayFlag
+	("Colour", "u1", (4,)),
+	("ZIndex", "<i4"),
+	("Position", "<f8", (2,)),
+	("Velocity", "<f8", (2,)),
+	("Acceleration", "<f8", (2,)),
+	("Rotation", "<f8"),
+	("AngularVelocity", "<f8"),
+	("AngularAcceleration", "<f8"),
+	("Mass", "<f8"),
+	("VertexStart", "<u4"), # Slice of the vertex pool holding the body's local vertices
+	("VertexCount", "<u4"),
+	("ForceStart", "<u4"), # Slice of the force pool, as (force x, force y, origin x, origin y)
+	("ForceCount", "<u4"),
+]
+anchoredFlag, sleepingFlag, visibleFlag, bulletFlag = 1, 2, 4, 8
+arrayFlag = 16 # The body's vertices are a Vector2Array, so it gets back that Shape rather than an equal list one. Older files leave it unset.
+
+# >> FUNCTIONS <<
+
+def loadNumpy(): # Only needed when snapshots are used
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("Snapshots need NumPy, install numpy")
+		numpy = module
+
+def flatten(rows, width, dtype, count): # count rows of width numbers each >> (count, width) array, without a tuple per row
+	return numpy.fromiter(chain.from_iterable(rows), dtype, count*width).reshape(count, width)
+
+def packRecords(workspace): # (records, vertex pool, force pool) for every RigidBody in workspace
+	loadNumpy()
+	bodies = [descendant for descendant in workspace._DescendantList() if isinstance(descendant, RigidBody)]
+	n = len(bodies)
+	records = numpy.zeros(n, dtype=recordType)
+	rows = {body.ID: row for row, body in enumerate(bodies)}
+	records["ID"] = numpy.frombuffer(b"".join([body.ID.bytes for body in bodies]), "S16")
+	records["Name"] = [body.Name.encode("utf-8") for body in bodies]
+	records["Parent"] = [rows.get(body.Parent.ID, -1) for body in bodies]
+	records["Colour"] = flatten((body.Colour if len(body.Colour) == 4 else tuple(body.Colour) + (255,) for body in bodies), 4, numpy.uint8, n)
+	records["ZIndex"] = [body.ZIndex for body in bodies]
+	store = stores.get(workspace.ID)
+	if store and all(body._Store == store for body in bodies): # Straight from the store's arrays
+		indices = numpy.array([body._StoreIndex for body in bodies], dtype=int)
+		for field in ("Position", "Velocity", "Acceleration", "Rotation", "AngularVelocity", "AngularAcceleration", "Mass"):
+			records[field] = getattr(store, field)[indices]
+		anchored, sleeping = store.Anchored[indices], store.SafeAnchored[indices]
+	else:
+		prefix = "" if any(body._Store for body in bodies) else "_" # Without a store the private attributes skip the property lookups
+		for field in ("Position", "Velocity", "Acceleration"):
+			records[field] = flatten(((vector.x, vector.y) for vector in map(attrgetter(prefix+field), bodies)), 2, numpy.float64, n)
+		for field in ("Rotation", "AngularVelocity", "AngularAcceleration", "Mass"):
+			records[field] = list(map(attrgetter(prefix+field), bodies))
+		anchored = numpy.fromiter(map(attrgetter(prefix+"Anchored"), bodies), bool, n)
+		sleeping = numpy.fromiter(map(attrgetter(prefix+"SafeAnchored"), bodies), bool, n)
+	visible = numpy.fromiter(map(attrgetter("Visible"), bodies), bool, n)
+	bullet = numpy.fromiter(map(attrgetter("Bullet"), bodies), bool, n)
+	array = numpy.fromiter((isinstance(body._Vertices, Vector2Array) for body in bodies), bool, n)
+	records["Flags"] = anchored*anchoredFlag + sleeping*sleepingFlag + visible*visibleFlag + bullet*bulletFlag + array*arrayFlag
+	vertexCounts = numpy.array([len(body._Vertices) for body in bodies], dtype=int)
+	forceCounts = numpy.array([len(body._Forces) for body in bodies], dtype=int)
+	records["VertexCount"], records["ForceCount"] = vertexCounts, forceCounts
+	records["VertexStart"] = numpy.cumsum(vertexCounts) - vertexCounts
+	records["ForceStart"] = numpy.cumsum(forceCounts) - forceCounts
+	vertices = flatten(((vertex.x, vertex.y) for body in bodies for vertex in body._Vertices), 2, numpy.float64, int(vertexCounts.sum()))
+	forces = flatten(((force.x, force.y, origin.x, origin.y) for body in bodies for force, origin in body._Forces), 4, numpy.float64, int(forceCounts.sum()))
+	return records, vertices, forces
+
+def saveSnapshot(workspace, path, time=0): # Writes a keyframe of workspace to path. time is stored alongside it.
+	records, vertices, forces = packRecords(workspace)
+	with open(path, "wb") as file:
+		file.write(header.pack(magic, snapshotVersion, len(records), len(vertices), len(forces), time))
+		file.write(records.tobytes())
+		file.write(vertices.astype("<f8").tobytes())
+		file.write(forces.astype("<f8").tobytes())
+
+def loadSnapshot(path):
+	return Snapshot(path)
+
+# >> CLASSES <<
+
+class Snapshot: # A keyframe file, memory mapped. Records are only turned into RigidBodies when asked for.
+
+	__slots__ = ["Path", "Version", "Time", "Records", "Vertices", "Forces", "_Map", "_Bodies"]
+
+	def __init__(self, path):
+		loadNumpy()
+		self.Path = path
+		self._Map = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+		if len(self._Map) < header.size:
+			raise ValueError(f"{path} is too short to be a snapshot")
+		fileMagic, self.Version, bodyCount, vertexCount, forceCount, self.Time = header.unpack(self._Map[:header.size].tobytes())
+		if fileMagic != magic:
+			raise ValueError(f"{path} isn't a snapshot")
+		if self.Version != snapshotVersion:
+			raise ValueError(f"{path} is snapshot version {self.Version}, only version {snapshotVersion} can be loaded")
+		offset = header.size
+		self.Records = numpy.ndarray(bodyCount, dtype=recordType, buffer=self._Map, offset=offset)
+		offset += self.Records.nbytes
+		self.Vertices = numpy.ndarray((vertexCount, 2), dtype="<f8", buffer=self._Map, offset=offset)
+		offset += self.Vertices.nbytes
+		self.Forces = numpy.ndarray((forceCount, 4), dtype="<f8", buffer=self._Map, offset=offset)
+		self._Bodies = {} # Record >> RigidBody, for ones that have been built
+
+	def __len__(self):
+		return len(self.Records)
+
+	def __str__(self):
+		return f"Snapshot(version {self.Version}) {len(self)} bodies at {self.Time}s"
+
+	__repr__=__str__
+
+	def Body(self, index): # The body in record index, built the first time it's asked for. It isn't parented.
+		if not index in self._Bodies:
+			self._Bodies[index] = self._Build(index)
+		return self._Bodies[index]
+
+	def Bodies(self):
+		for index in range(len(self)):
+			yield self.Body(index)
+
+	def _Build(self, index):
+		body = RigidBody()
+		body.ID = UUID(bytes=bytes(self.Records["ID"][index]))
+		self._Apply(body, index)
+		return body
+
+	def _Apply(self, body, index): # Copies record index onto body
+		record = self.Records[index]
+		body.Name = bytes(record["Name"]).decode("utf-8", "ignore")
+		flags = int(record["Flags"])
+		body.Anchored = bool(flags & anchoredFlag)
+		body.SafeAnchored = bool(flags & sleepingFlag)
+		body.Visible = bool(flags & visibleFlag)
+		body.Bullet = bool(flags & bulletFlag)
+		body.Colour = Colour(*record["Colour"].tolist())
+		body.ZIndex = int(record["ZIndex"])
+		body.Position = Vector2(record["Position"].tolist())
+		body.Velocity = Vector2(record["Velocity"].tolist())
+		body.Acceleration = Vector2(record["Acceleration"].tolist())
+		body.Rotation = float(record["Rotation"])
+		body.AngularVelocity = float(record["AngularVelocity"])
+		body.AngularAcceleration = float(record["AngularAcceleration"])
+		body.Mass = float(record["Mass"])
+		vertexStart, forceStart = int(record["VertexStart"]), int(record["ForceStart"])
+		vertices = self.Vertices[vertexStart:vertexStart+int(record["VertexCount"])]
+		body.Shape = getShape(Vector2Array(vertices) if flags & arrayFlag else [Vector2(x, y) for x, y in vertices.tolist()]) # The interned Shape, shared with bodies that already have it
+		body._Forces = [(Vector2(forceX, forceY), Vector2(originX, originY)) for forceX, forceY, originX, originY in self.Forces[forceStart:forceStart+int(record["ForceCount"])].tolist()]
+		body._Impulses = []
+		if body._Forces and body._Store:
+			body._Store.MarkForced(body)
+		body._SleepTime = 0
+		body._Island = None
+
+	def Restore(self, workspace): # Puts workspace back to this keyframe. Bodies are matched by ID, so existing ones are reused.
+		existing = {descendant.ID: descendant for descendant in workspace._DescendantList() if isinstance(descendant, RigidBody)}
+		restored = []
+		for index in range(len(self)):
+			ID = UUID(bytes=bytes(self.Records["ID"][index]))
+			if ID in existing:
+				body = existing.pop(ID)
+				self._Apply(body, index)
+			else:
+				body = self._Build(index)
+			parent = int(self.Records["Parent"][index])
+			newParent = workspace if parent == -1 else restored[parent]
+			if body.Parent != newParent:
+				body.Parent = newParent
+			restored.append(body)
+		for body in existing.values(): # Bodies made after the keyframe was saved
+			if body.Parent != None and not body.Parent.ID in existing:
+				body.Parent = None
+		return restored
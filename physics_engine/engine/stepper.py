@@ -0,0 +1,68 @@
+# >> CREDITS <<
+# Stepper.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module decouples the physics rate from the frame rate.
+# Frame times go into an accumulator and physics runs in fixed steps of 1/physicsRate,
+# with at most maxSteps per frame so a slow frame can't snowball into slower ones.
+# Whatever time is left over is used to blend between the last two steps when rendering.
+
+# >> MODULES <<
+from engine.engine_model import updatePhysics
+from shared.settings import physicsRate, subSteps, maxSteps
+
+# >> CLASSES <<
+
+class Stepper:
+
+	__slots__ = ["Workspace", "TimeStep", "SubSteps", "MaxSteps", "Accumulator", "Alpha", "Steps", "DroppedTime", "_Previous"]
+
+	def __init__(self, workspace, rate=physicsRate, subSteps=subSteps, maxSteps=maxSteps):
+		self.Workspace = workspace
+		self.TimeStep = 1/rate
+		self.SubSteps = subSteps
+		self.MaxSteps = maxSteps
+		self.Accumulator = 0 # Time waiting to be simulated
+		self.Alpha = 0 # How far between the last two steps the frame being rendered is, from 0 to 1
+		self.Steps = 0 # Physics steps run on the last Advance
+		self.DroppedTime = 0 # Total time skipped because of the maxSteps cap
+		self._Previous = {} # Body ID >> (AbsolutePosition, Rotation) before the last step
+
+	def Advance(self, frameTime): # Runs however many fixed steps frameTime adds up to. Returns how many.
+		self.Accumulator += frameTime
+		self.Steps = min(int(self.Accumulator / self.TimeStep), self.MaxSteps)
+		for step in range(self.Steps):
+			if step == self.Steps-1: # Only the last step is needed for interpolation
+				self._Remember()
+			for subStep in range(self.SubSteps):
+				updatePhysics(self.Workspace, self.TimeStep/self.SubSteps)
+			self.Accumulator -= self.TimeStep
+		if self.Accumulator >= self.TimeStep: # Hit the cap, so let the simulation fall behind rather than spiral
+			dropped = self.Accumulator - self.Accumulator % self.TimeStep
+			self.DroppedTime += dropped
+			self.Accumulator -= dropped
+		self.Alpha = self.Accumulator / self.TimeStep
+		return self.Steps
+
+	def _Remember(self):
+		self._Previous = {body.ID: (body.AbsolutePosition, body.Rotation) for body in self.Workspace._DescendantList()}
+
+	# >> INTERPOLATION << (the blend of the last two steps, so motion looks smooth between them)
+
+	def InterpolatedTransform(self, body): # (AbsolutePosition, Rotation)
+		position, rotation = body.AbsolutePosition, body.Rotation
+		if not body.ID in self._Previous:
+			return position, rotation
+		previousPosition, previousRotation = self._Previous[body.ID]
+		alpha = self.Alpha
+		return previousPosition + (position-previousPosition)*alpha, previousRotation + (rotation-previousRotation)*alpha
+
+	def Blend(self, body): # Alpha if body moved in the last step, or None when interpolating it would change nothing
+		previous = self._Previous.get(body.ID)
+		if previous == None or (previous[1] == body.Rotation and previous[0] == body.AbsolutePosition):
+			return None
+		return self.Alpha
+
+	def InterpolatedVertices(self, body):
+		position, rotation = self.InterpolatedTransform(body)
+		return [vertex.rotatedRadians(rotation) + position for vertex in body._Vertices]
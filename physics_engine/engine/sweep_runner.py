@@ -0,0 +1,93 @@
+# >> CREDITS <<
+# Sweep_Runner.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module runs every scene in a list against every set of world constants in a grid, headless.
+# Jobs are spread over a ProcessPoolExecutor, one world per job, each with its own WorldConfig.
+# Each job sends back a small summary (final body states, energy, contacts) instead of the world itself,
+# so the work scales with cores instead of with pickling.
+# Run from the physics_engine folder with: python -m engine.sweep_runner
+
+# >> MODULES <<
+from engine.engine_model import updatePhysics, releaseWorld
+from engine.scenes import buildScene
+from engine.world_config import WorldConfig, setWorldConfig
+from engine.collisions import getContactCache
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from os import cpu_count
+from time import perf_counter
+
+# >> UTILITY FUNCTIONS <<
+
+def parameterGrid(**values): # parameterGrid(gravity=[100, 300], friction=[0.2, 0.6]) >> every combination as a dict
+	names = list(values)
+	return [dict(zip(names, combination)) for combination in product(*(values[name] for name in names))]
+
+def findEnergy(bodies, gravity): # Kinetic and gravitational potential energy. y points down, so height is -y.
+	kinetic, potential = 0, 0
+	for body in bodies:
+		if body.Anchored or body.Mass == 0:
+			continue
+		kinetic += 0.5*body.Mass*body.Velocity.get_length_sqrd() + 0.5*body.Inertia*body.AngularVelocity**2
+		potential -= body.Mass*gravity*body.Position.y
+	return kinetic, potential
+
+# >> FUNCTIONS <<
+
+def makeJobs(sceneNames, parameterSets, count=50, steps=240, timeStep=1/120, seed=0): # Every scene with every parameter set
+	return [
+		{"Scene": name, "Count": count, "Seed": seed, "Parameters": parameters, "Steps": steps, "TimeStep": timeStep}
+		for name in sceneNames for parameters in parameterSets
+	]
+
+def runJob(job): # Runs one job from makeJobs and summarises it. Has to be a top level function to be sent to a worker.
+	start = perf_counter()
+	game = buildScene(job["Scene"], job["Count"], job["Seed"])
+	workspace = game.Workspace
+	config = WorldConfig(**job["Parameters"])
+	setWorldConfig(workspace, config)
+	cache = getContactCache(workspace)
+	contacts, mostContacts = 0, 0
+	for step in range(job["Steps"]):
+		updatePhysics(workspace, job["TimeStep"])
+		touching = sum(len(manifold.Contacts) for manifold in cache.Manifolds.values())
+		contacts += touching
+		mostContacts = max(mostContacts, touching)
+	bodies = workspace._DescendantList()
+	kinetic, potential = findEnergy(bodies, config.Gravity)
+	summary = {
+		"Scene": job["Scene"],
+		"Count": job["Count"],
+		"Seed": job["Seed"],
+		"Parameters": job["Parameters"],
+		"Steps": job["Steps"],
+		"FinalStates": [
+			(body.Name, body.Position.x, body.Position.y, body.Rotation, body.Velocity.x, body.Velocity.y, body.AngularVelocity)
+			for body in bodies
+		],
+		"KineticEnergy": kinetic,
+		"PotentialEnergy": potential,
+		"Contacts": touching if job["Steps"] else 0, # Contact points on the last step
+		"MostContacts": mostContacts,
+		"AverageContacts": contacts/job["Steps"] if job["Steps"] else 0,
+		"Asleep": sum(1 for body in bodies if body.SafeAnchored),
+		"Time": perf_counter()-start,
+	}
+	releaseWorld(workspace)
+	return summary
+
+def runSweep(sceneNames, parameterSets, count=50, steps=240, timeStep=1/120, seed=0, workers=None):
+	# Returns one summary per job, in the same order as makeJobs. workers=1 runs in this process.
+	jobs = makeJobs(sceneNames, parameterSets, count, steps, timeStep, seed)
+	workers = workers or cpu_count() or 1
+	if workers == 1:
+		return [runJob(job) for job in jobs]
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		return list(executor.map(runJob, jobs, chunksize=max(1, len(jobs)//(workers*4)))) # A few chunks per worker keeps them all busy to the end
+
+if __name__ == "__main__":
+	grid = parameterGrid(gravity=[150, 300], elasticity=[0.2, 0.5], friction=[0.3, 0.6])
+	for summary in runSweep(["Stack", "Pile"], grid, count=20):
+		print(summary["Scene"], summary["Parameters"], f"KE {summary['KineticEnergy']:.1f} PE {summary['PotentialEnergy']:.1f} contacts {summary['Contacts']} asleep {summary['Asleep']} in {summary['Time']:.2f}s")
@@ -0,0 +1,279 @@
+# >> CREDITS <<
+# Trajectories.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module records every body's position, rotation and velocity after every physics step, and plays them back.
+# The Recorder listens to updatePhysics and fills a buffer of chunkSteps steps, then hands the full chunk to a
+# background thread that appends it to the file, so long runs never pile up in memory or wait on the disk.
+# Closing the file appends an index of where each chunk starts. If a run dies before that, the Replayer finds the chunks itself.
+# The Replayer memory maps the file, seeks to any step and puts the bodies there, so render can draw it without any physics.
+# A keyframe (snapshots.py) is saved next to the file when recording starts, so the bodies can be rebuilt to replay onto.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.rigidbody import RigidBody
+from engine.engine_model import stepListeners
+from engine.body_store import stores
+from engine.snapshots import saveSnapshot, loadSnapshot
+
+from bisect import bisect_right
+from itertools import chain
+from queue import Queue
+from struct import Struct
+from threading import Thread
+from uuid import UUID
+
+# >> GLOBALS <<
+
+numpy = None # Imported by loadNumpy the first time it's needed, so headless start up doesn't pay for it
+magic = b"PHYSTRAJ"
+trajectoryVersion = 1
+header = Struct("<8sIIId4x") # magic, version, bodies, steps per chunk, time recording started
+bodyType = [("ID", "S16"), ("Name", "S32")] # One per body, straight after the header, in the order their states are stored
+chunkHeader = Struct("<4sQI4x") # b"CHNK", first step, steps. Followed by each step's time then (steps, bodies, 6) states.
+indexType = [("FirstStep", "<u8"), ("Steps", "<u4"), ("Offset", "<u8")]
+trailer = Struct("<4sQI") # b"TIDX", where the index starts, how many chunks. Always the last bytes of a closed file.
+stateColumns = 6 # x, y, rotation, velocity x, y, angular velocity
+
+# >> FUNCTIONS <<
+
+def loadNumpy(): # Only needed when trajectories are recorded or replayed
+	global numpy
+	if numpy == None:
+		try:
+			import numpy as module
+		except ImportError:
+			raise ImportError("Trajectories need NumPy, install numpy")
+		numpy = module
+
+def readState(body): # The private attributes skip the property lookups, for bodies that aren't in a BodyStore
+	position, velocity = body._Position, body._Velocity
+	return position.x, position.y, body._Rotation, velocity.x, velocity.y, body._AngularVelocity
+
+def keyframePath(path):
+	return path + ".snap"
+
+# >> CLASSES <<
+
+class Recorder:
+
+	__slots__ = ["Workspace", "Path", "ChunkSteps", "Bodies", "Steps", "Time", "_File", "_Buffer", "_Times", "_Row", "_Queue", "_Thread", "_Index", "_Error"]
+
+	def __init__(self, workspace, path, chunkSteps=256):
+		loadNumpy()
+		self.Workspace = workspace
+		self.Path = path
+		self.ChunkSteps = chunkSteps # Steps buffered before a chunk is written. Each chunk is chunkSteps*bodies*48 bytes.
+		self.Bodies = [] # Bodies in the workspace when recording started. Ones added later aren't recorded.
+		self.Steps = 0 # Steps recorded so far
+		self.Time = 0
+		self._File = None
+		self._Thread = None
+		self._Index = [] # (first step, steps, offset) for every chunk written, filled in by the writing thread
+		self._Error = None # What stopped the writing thread, raised again by Record or Stop on the simulation's thread
+
+	def Start(self, time=0, keyframe=True):
+		self.Bodies = [descendant for descendant in self.Workspace._DescendantList() if isinstance(descendant, RigidBody)]
+		self.Steps, self.Time = 0, time
+		if keyframe:
+			saveSnapshot(self.Workspace, keyframePath(self.Path), time)
+		bodies = numpy.zeros(len(self.Bodies), dtype=bodyType)
+		bodies["ID"] = [body.ID.bytes for body in self.Bodies]
+		bodies["Name"] = [body.Name.encode("utf-8") for body in self.Bodies]
+		self._File = open(self.Path, "wb")
+		self._File.write(header.pack(magic, trajectoryVersion, len(self.Bodies), self.ChunkSteps, time))
+		self._File.write(bodies.tobytes())
+		self._NewBuffer()
+		self._Index = []
+		self._Error = None
+		self._Queue = Queue(maxsize=4) # Blocks the simulation if the disk falls this far behind, rather than using up memory
+		self._Thread = Thread(target=self._WriteChunks, daemon=True)
+		self._Thread.start()
+		stepListeners.append(self.Record)
+
+	def Stop(self): # Writes what's left, waits for the writing thread and closes the file with its index
+		if self.Record in stepListeners:
+			stepListeners.remove(self.Record)
+		if self._File == None:
+			return
+		if self._Row:
+			self._Flush()
+		self._Queue.put(None)
+		self._Thread.join()
+		if self._Error != None:
+			self._Fail()
+		index = numpy.array(self._Index, dtype=indexType)
+		indexOffset = self._File.tell()
+		self._File.write(index.tobytes())
+		self._File.write(trailer.pack(b"TIDX", indexOffset, len(index)))
+		self._File.close()
+		self._File = None
+
+	def _Fail(self): # Stops recording and raises the writing thread's error. The file is left without an index, like a run that died.
+		error = self._Error
+		if self.Record in stepListeners:
+			stepListeners.remove(self.Record)
+		if self._Thread.is_alive():
+			self._Queue.put(None)
+			self._Thread.join()
+		self._Error = None
+		try:
+			self._File.close()
+		finally:
+			self._File = None
+		raise error
+
+	def _NewBuffer(self): # Full buffers are handed to the writing thread, so each chunk gets new ones
+		self._Buffer = numpy.empty((self.ChunkSteps, len(self.Bodies), stateColumns))
+		self._Times = numpy.empty(self.ChunkSteps)
+		self._Row = 0
+
+	def Record(self, workspace, dt): # Step listener, called at the end of updatePhysics
+		if workspace != self.Workspace:
+			return
+		if self._Error != None:
+			self._Fail()
+		bodies = self.Bodies
+		row = self._Buffer[self._Row]
+		store = stores.get(workspace.ID)
+		if store and all(body._Store == store for body in bodies): # Straight from the store's arrays
+			indices = numpy.array([body._StoreIndex for body in bodies], dtype=int)
+			row[:, 0:2] = store.Position[indices]
+			row[:, 2] = store.Rotation[indices]
+			row[:, 3:5] = store.Velocity[indices]
+			row[:, 5] = store.AngularVelocity[indices]
+		elif any(body._Store for body in bodies):
+			row[:] = [(body.Position.x, body.Position.y, body.Rotation, body.Velocity.x, body.Velocity.y, body.AngularVelocity) for body in bodies]
+		else:
+			row[:] = numpy.fromiter(chain.from_iterable(map(readState, bodies)), numpy.float64, len(bodies)*stateColumns).reshape(len(bodies), stateColumns)
+		self.Time += dt
+		self._Times[self._Row] = self.Time
+		self._Row += 1
+		self.Steps += 1
+		if self._Row == self.ChunkSteps:
+			self._Flush()
+
+	def _Flush(self):
+		self._Queue.put((self.Steps-self._Row, self._Times[:self._Row], self._Buffer[:self._Row]))
+		self._NewBuffer()
+
+	def _WriteChunks(self): # Runs on the writing thread. NumPy and file writes let go of the GIL, so the simulation keeps going.
+		while True:
+			chunk = self._Queue.get()
+			if chunk == None:
+				break
+			if self._Error != None: # Chunks after a failed write are thrown away, but still taken so the queue never fills and blocks the simulation
+				continue
+			firstStep, times, states = chunk
+			try:
+				offset = self._File.tell()
+				self._File.write(chunkHeader.pack(b"CHNK", firstStep, len(times)))
+				self._File.write(times.tobytes())
+				self._File.write(states.tobytes())
+			except Exception as error: # Kept for Record or Stop to raise, since nothing would see it on this thread
+				self._Error = error
+			else:
+				self._Index.append((firstStep, len(times), offset))
+
+class Replayer:
+
+	__slots__ = ["Path", "Version", "ChunkSteps", "StartTime", "IDs", "Names", "StepCount", "Step", "PlaybackTime", "_Map", "_Chunks", "_FirstSteps", "_Bodies"]
+
+	def __init__(self, path):
+		loadNumpy()
+		self.Path = path
+		self._Map = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+		if len(self._Map) < header.size:
+			raise ValueError(f"{path} is too short to be a trajectory")
+		fileMagic, self.Version, bodyCount, self.ChunkSteps, self.StartTime = header.unpack(self._Map[:header.size].tobytes())
+		if fileMagic != magic:
+			raise ValueError(f"{path} isn't a trajectory")
+		if self.Version != trajectoryVersion:
+			raise ValueError(f"{path} is trajectory version {self.Version}, only version {trajectoryVersion} can be replayed")
+		bodies = numpy.ndarray(bodyCount, dtype=bodyType, buffer=self._Map, offset=header.size)
+		self.IDs = [UUID(bytes=bytes(ID)) for ID in bodies["ID"]]
+		self.Names = [bytes(name).decode("utf-8", "ignore") for name in bodies["Name"]]
+		self._Chunks = self._ReadIndex() or self._FindChunks(header.size + bodies.nbytes)
+		self._FirstSteps = [firstStep for firstStep, steps, offset in self._Chunks]
+		self.StepCount = sum(steps for firstStep, steps, offset in self._Chunks)
+		self.Step = -1 # Step the bodies were last put at
+		self.PlaybackTime = self.StartTime
+		self._Bodies = [] # Bodies to move, in the same order as IDs. None where the workspace doesn't have one.
+
+	def __len__(self):
+		return self.StepCount
+
+	def __str__(self):
+		return f"Replayer(version {self.Version}) {len(self.IDs)} bodies for {self.StepCount} steps"
+
+	__repr__=__str__
+
+	def _ReadIndex(self): # The chunks listed at the end of a closed file, or None if it wasn't closed
+		if len(self._Map) < trailer.size:
+			return None
+		tag, indexOffset, count = trailer.unpack(self._Map[-trailer.size:].tobytes())
+		if tag != b"TIDX":
+			return None
+		index = numpy.ndarray(count, dtype=indexType, buffer=self._Map, offset=indexOffset)
+		return [(int(firstStep), int(steps), int(offset)) for firstStep, steps, offset in index.tolist()]
+
+	def _FindChunks(self, offset): # Walks the chunk headers one by one, stopping at the first incomplete chunk
+		chunks = []
+		bodyCount = len(self.IDs)
+		while offset + chunkHeader.size <= len(self._Map):
+			tag, firstStep, steps = chunkHeader.unpack(self._Map[offset:offset+chunkHeader.size].tobytes())
+			size = chunkHeader.size + steps*8 + steps*bodyCount*stateColumns*8
+			if tag != b"CHNK" or offset + size > len(self._Map):
+				break
+			chunks.append((firstStep, steps, offset))
+			offset += size
+		return chunks
+
+	# >> READING <<
+
+	def Read(self, step): # (time, (bodies, 6) states) after step, straight from the file
+		if not 0 <= step < self.StepCount:
+			raise IndexError(f"{self} has no step {step}")
+		firstStep, steps, offset = self._Chunks[bisect_right(self._FirstSteps, step)-1]
+		offset += chunkHeader.size
+		times = numpy.ndarray(steps, dtype=numpy.float64, buffer=self._Map, offset=offset)
+		states = numpy.ndarray((steps, len(self.IDs), stateColumns), dtype=numpy.float64, buffer=self._Map, offset=offset+steps*8)
+		return float(times[step-firstStep]), states[step-firstStep]
+
+	def Time(self, step):
+		return self.Read(step)[0]
+
+	# >> PLAYBACK <<
+
+	def Bind(self, workspace): # Finds the recorded bodies in workspace by ID
+		found = {descendant.ID: descendant for descendant in workspace._DescendantList()}
+		self._Bodies = [found.get(ID) for ID in self.IDs]
+
+	def Restore(self, workspace): # Rebuilds the bodies from the keyframe saved when recording started, then binds to them
+		loadSnapshot(keyframePath(self.Path)).Restore(workspace)
+		self.Bind(workspace)
+		self.Step = -1
+		self.PlaybackTime = self.StartTime
+
+	def Seek(self, step): # Puts the bound bodies where they were after step
+		time, states = self.Read(step)
+		for body, (x, y, rotation, velocityX, velocityY, angularVelocity) in zip(self._Bodies, states.tolist()):
+			if body != None:
+				body.Position = Vector2(x, y)
+				body.Rotation = rotation
+				body.Velocity = Vector2(velocityX, velocityY)
+				body.AngularVelocity = angularVelocity
+		self.Step = step
+		self.PlaybackTime = time
+
+	def Advance(self, frameTime, speed=1): # Plays on by frameTime of recorded time. Returns False once it reaches the end.
+		if self.Step == self.StepCount-1:
+			return False
+		target = self.PlaybackTime + frameTime*speed
+		step = self.Step
+		while step+1 < self.StepCount and self.Time(step+1) <= target:
+			step += 1
+		if step != self.Step:
+			self.Seek(step)
+		self.PlaybackTime = target
+		return step+1 < self.StepCount
@@ -0,0 +1,61 @@
+# >> CREDITS <<
+# World_Config.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# This module holds the physical constants (gravity, drag, elasticity, friction) for each Workspace,
+# and whether it uses continuous collision detection and lets resting bodies sleep.
+# Worlds without their own WorldConfig use the values from settings.py,
+# so two worlds in the same process can run with different constants, like the jobs in sweep_runner.py.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from shared.settings import gravity, drag, elasticity, friction, continuousCollision, allowSleeping
+
+from weakref import WeakValueDictionary
+
+# >> GLOBALS <<
+
+configs = WeakValueDictionary() # Workspace ID >> WorldConfig. The Workspace holds its own (UIBase._Keep), so it goes when the Workspace does.
+
+# >> CLASSES <<
+
+class WorldConfig:
+
+	__slots__ = ["Drag", "Elasticity", "Friction", "ContinuousCollision", "AllowSleeping", "GravityVector", "_Gravity", "__weakref__"]
+
+	def __init__(self, gravity=gravity, drag=drag, elasticity=elasticity, friction=friction, continuousCollision=continuousCollision, allowSleeping=allowSleeping):
+		self.Gravity = gravity # px/s, also sets GravityVector
+		self.Drag = drag # %/s
+		self.Elasticity = elasticity
+		self.Friction = friction
+		self.ContinuousCollision = continuousCollision # Sweep fast bodies, see continuous.py
+		self.AllowSleeping = allowSleeping # Put islands of resting bodies to sleep, see islands.py
+
+	def __str__(self):
+		return f"WorldConfig(gravity={self.Gravity}, drag={self.Drag}, elasticity={self.Elasticity}, friction={self.Friction}, continuousCollision={self.ContinuousCollision}, allowSleeping={self.AllowSleeping})"
+
+	__repr__=__str__
+
+	@property
+	def Gravity(self):
+		return self._Gravity
+
+	@Gravity.setter
+	def Gravity(self, newGravity):
+		self._Gravity = newGravity
+		self.GravityVector = Vector2(0, newGravity) # Worked out once instead of every Update
+
+# >> FUNCTIONS <<
+
+defaultConfig = WorldConfig()
+
+def getWorldConfig(workspace=None): # The workspace's config, or the one made from settings
+	if workspace and workspace.ID in configs:
+		return configs[workspace.ID]
+	return defaultConfig
+
+def setWorldConfig(workspace, config): # None goes back to settings
+	workspace._Release(configs.pop(workspace.ID, None))
+	if config != None:
+		configs[workspace.ID] = config
+		workspace._Keep(config)
@@ -10,10 +10,31 @@ drag = 0.01 # Coefficient of Drag %/s
 elasticity = 0.5 # How much of the initial force is retained post collision.
 friction = 0.6
 
-slop = 1
-angularSlop = 0.01
+slop = 1 # Overlap (px) the solver leaves alone so resting contacts don't flicker in and out
+angularSlop = 0.01 # Turns (radians) too small for position correction to bother with
+
+solverIterations = 8 # Most velocity passes the contact solver makes per frame
+positionIterations = 3 # Most position passes pushing overlapping bodies apart per frame
+solverTolerance = 0.01 # The solver stops once a pass changes the impulses by less than this in total
+correctionFactor = 0.4 # Fraction of the overlap (past slop) removed per position pass
+
+allowSleeping = True # Put islands of resting bodies to sleep (SafeAnchored) so they cost nothing until something wakes them
+sleepVelocity = 2 # Bodies slower than this (px/s)...
+sleepAngularVelocity = 0.05 # ...and turning slower than this (radians/s)...
+timeToSleep = 0.5 # ...for this long (s), along with everything they are touching, fall asleep
 
 framerate = 30 # How fast the simulation goes
+physicsRate = 120 # Fixed physics steps per second, however fast frames are rendered
+subSteps = 1 # updatePhysics calls per physics step, each with 1/physicsRate/subSteps
+maxSteps = 8 # Most physics steps run for one frame. Past that the simulation slows down instead of spiralling.
+continuousCollision = False # Sweep fast bodies so they can't tunnel through thin ones at coarse timesteps. Worlds can change it in their WorldConfig.
+ccdMotionFraction = 0.5 # Bodies moving further than this fraction of their radius in one step are swept. Bodies flagged Bullet always are.
+
+broadphase = "SweepAndPrune" # Which broadphase filters pairs before SAT. Has to be in broadphaseNames.
+treeMargin = 10 # How many px the AABBTree fattens boxes by, so moving bodies aren't reinserted every frame.
+useBodyStore = False # Keep body state in NumPy arrays and integrate every body in one go. Needs NumPy.
+batchNarrowphase = False # Run SAT on every candidate pair at once with NumPy. Needs NumPy.
+parallelWorkers = 0 # Processes that collide and solve islands of bodies side by side. 0 is off, 1 does it island by island here. Needs NumPy.
 
 screenSize = (800, 500) # Size of screen
 fullScreen = False # If the simulation should be ran fullscreen. I think not.
@@ -29,6 +50,13 @@ classNames = [
 	"Polygon", # for all shapes I'll use this
 ]
 
+broadphaseNames = [
+	"AllPairs", # Every pair goes through SAT. Only really useful for comparisons.
+	"SweepAndPrune", # Bounding boxes sorted along one axis then swept.
+	"SpatialHash", # Uniform grid. Best when bodies are all a similar size.
+	"AABBTree", # Dynamic bounding volume tree. Best when sizes are mixed, like the boundary walls.
+]
+
 polygonNames = [
 	"?",
 	"Dot",
@@ -0,0 +1,12 @@
+# >> CREDITS <<
+# Conftest.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Lets the tests import the engine the same way app.py does, rooted at the physics_engine folder.
+# Run from the physics_engine folder with: python -m pytest -q
+
+# >> MODULES <<
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
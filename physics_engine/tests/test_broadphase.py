@@ -0,0 +1,64 @@
+# >> CREDITS <<
+# Test_Broadphase.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Every broadphase has to find every pair of overlapping boxes that AllPairs would, in the same order.
+
+# >> MODULES <<
+import random
+
+import pytest
+
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, createRigidBody
+from engine.broadphase import AllPairs, SweepAndPrune, SpatialHash, boxesOverlap
+from engine.aabb_tree import AABBTree
+
+# >> UTILITY FUNCTIONS <<
+
+def buildWorld(amount, seed): # Mixed sizes, so some bodies span several hash cells and tree levels
+	generator = random.Random(seed)
+	engine = createModel()
+	for i in range(amount):
+		body = createRigidBody(generator.randint(3, 8), generator.choice([10, 20, 40, 300]))
+		body.Position = Vector2(generator.uniform(0, 800), generator.uniform(0, 450))
+		body.Rotation = generator.uniform(0, 6.3)
+		body.Parent = engine.Workspace
+	return engine.Workspace
+
+def overlapping(shapes): # AllPairs filtered down to the pairs whose boxes touch, which is what every other broadphase should give
+	return [(a.ID, b.ID) for a, b in AllPairs().GetPairs(shapes) if boxesOverlap(a.BoundingBox, b.BoundingBox)]
+
+def makeBroadphase(name, workspace):
+	if name == "AABBTree":
+		tree = AABBTree()
+		tree.Watch(workspace)
+		return tree
+	return {"SweepAndPrune": SweepAndPrune, "SpatialHash": SpatialHash}[name]()
+
+# >> TESTS <<
+
+@pytest.mark.parametrize("name", ["SweepAndPrune", "SpatialHash", "AABBTree"])
+def test_pairs_match_all_pairs(name):
+	workspace = buildWorld(200, 1)
+	broadphase = makeBroadphase(name, workspace)
+	generator = random.Random(2)
+	for frame in range(5): # Later frames reuse the sorted order or the tree, after everything has moved a little
+		shapes = workspace.GetDescendants()
+		assert [(a.ID, b.ID) for a, b in broadphase.GetPairs(shapes)] == overlapping(shapes)
+		for body in shapes:
+			body.Position = body.Position + Vector2(generator.uniform(-30, 30), generator.uniform(-30, 30))
+	if name == "AABBTree":
+		broadphase.Unwatch()
+
+@pytest.mark.parametrize("name", ["SweepAndPrune", "SpatialHash", "AABBTree"])
+def test_swept_boxes_are_used(name):
+	workspace = buildWorld(50, 3)
+	shapes = workspace.GetDescendants()
+	broadphase = makeBroadphase(name, workspace)
+	mover = shapes[0]
+	swept = {mover.ID: (-1000, -1000, 2000, 2000)} # Covers everything, so mover pairs with every other body
+	pairs = broadphase.GetPairs(shapes, swept)
+	assert {b.ID for a, b in pairs if a.ID == mover.ID} | {a.ID for a, b in pairs if b.ID == mover.ID} == {shape.ID for shape in shapes[1:]}
+	if name == "AABBTree":
+		broadphase.Unwatch()
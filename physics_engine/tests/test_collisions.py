@@ -0,0 +1,40 @@
+# >> CREDITS <<
+# Test_Collisions.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# The ContactCache hands last frame's impulses to contacts on the same features, and only to those.
+
+# >> MODULES <<
+from engine.engine_model import updatePhysics
+from engine.scenes import buildScene
+from engine.collisions import getContactCache, ContactCache
+from engine.broadphase import SweepAndPrune
+
+# >> UTILITY FUNCTIONS <<
+
+def impulses(manifolds): # (ID of A, ID of B, contact ID) >> (normal impulse, tangent impulse)
+	return {(manifold.BodyA.ID, manifold.BodyB.ID, contact.ID): (contact.NormalImpulse, contact.TangentImpulse) for manifold in manifolds for contact in manifold.Contacts}
+
+# >> TESTS <<
+
+def test_resting_contacts_are_warm_started():
+	game = buildScene("Stack", 5)
+	for frame in range(60):
+		updatePhysics(game.Workspace, 1/60)
+	cache = getContactCache(game.Workspace)
+	previous = impulses(cache.Manifolds.values())
+	assert previous and any(normal for normal, tangent in previous.values())
+	manifolds = cache.Update(SweepAndPrune().GetPairs(game.Workspace.GetDescendants())) # Same positions, so the same features touch
+	assert impulses(manifolds) == previous
+	assert cache.WarmStarted == len(previous)
+	assert not any(manifold.Began for manifold in manifolds)
+
+def test_new_contacts_start_cold():
+	game = buildScene("Stack", 5)
+	for frame in range(60):
+		updatePhysics(game.Workspace, 1/60)
+	cache = ContactCache() # Nothing from last frame
+	manifolds = cache.Update(SweepAndPrune().GetPairs(game.Workspace.GetDescendants()))
+	assert manifolds and cache.WarmStarted == 0
+	assert all(manifold.Began for manifold in manifolds)
+	assert set(impulses(manifolds).values()) == {(0, 0)}
@@ -0,0 +1,45 @@
+# >> CREDITS <<
+# Test_Contact_Solver.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Position correction has to finish what it starts: small turns add up rather than being thrown away,
+# and stacks still come to rest upright.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, updatePhysics
+from engine.scenes import addGround, createBox
+from engine.world_config import WorldConfig, setWorldConfig
+
+# >> TESTS <<
+
+def test_small_tilts_are_corrected():
+	game = createModel()
+	workspace = game.Workspace
+	ground = addGround(workspace)
+	box = createBox(100, 20)
+	box.Rotation = 0.008 # Every frame's turn is smaller than angularSlop
+	box.Position = Vector2(400, ground.Position.y - 20 - 10 + 2.5) # 2.5px into the ground
+	box.Parent = workspace
+	setWorldConfig(workspace, WorldConfig(gravity=0, allowSleeping=False))
+	for frame in range(60):
+		updatePhysics(workspace, 1/60)
+	assert abs(box.Rotation) < 1e-3
+	assert box.BoundingBox[3] - ground.BoundingBox[1] < 2 # Only slop, and the turn angularSlop tolerates, left overlapping
+
+def test_stack_stays_upright():
+	game = createModel()
+	workspace = game.Workspace
+	ground = addGround(workspace)
+	boxes = []
+	for i in range(12):
+		box = createBox(40, 40)
+		box.Position = Vector2(400, ground.Position.y - 40 - 40*i - 0.5*i)
+		box.Parent = workspace
+		boxes.append(box)
+	setWorldConfig(workspace, WorldConfig(allowSleeping=False))
+	for frame in range(300):
+		updatePhysics(workspace, 1/30)
+	assert max(abs(box.Rotation) for box in boxes) < 0.01
+	assert max(abs(box.Position.x - 400) for box in boxes) < 1
+	assert max(box.Velocity.get_length() for box in boxes) < 2
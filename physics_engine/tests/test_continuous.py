@@ -0,0 +1,41 @@
+# >> CREDITS <<
+# Test_Continuous.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# A body moving further than a thin wall is thick in one step passes straight through it without
+# continuous collision, and is stopped by the wall with it.
+
+# >> MODULES <<
+import pytest
+
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, createRigidBody, createRigidBodyFromVertices, updatePhysics
+from engine.world_config import WorldConfig, setWorldConfig
+
+# >> UTILITY FUNCTIONS <<
+
+def fireAtWall(continuous, speed, rate): # x of a small box fired at a 10px wall 110px away, after half a second. Every speed here jumps right over it in one step.
+	workspace = createModel().Workspace
+	setWorldConfig(workspace, WorldConfig(gravity=0, continuousCollision=continuous))
+	wall = createRigidBodyFromVertices(Vector2(-5, -200), Vector2(5, -200), Vector2(5, 200), Vector2(-5, 200))
+	wall.Anchored = True
+	wall.Mass = 0
+	wall.Position = Vector2(300, 250)
+	wall.Parent = workspace
+	box = createRigidBody(4, 20)
+	box.Position = Vector2(190, 250)
+	box.Velocity = Vector2(speed, 0)
+	box.Parent = workspace
+	for step in range(rate//2):
+		updatePhysics(workspace, 1/rate)
+	return box.Position.x
+
+# >> TESTS <<
+
+@pytest.mark.parametrize("speed, rate", [(3000, 15), (6000, 30), (10000, 30)])
+def test_fast_bodies_tunnel_without_continuous_collision(speed, rate):
+	assert fireAtWall(False, speed, rate) > 305
+
+@pytest.mark.parametrize("speed, rate", [(3000, 15), (6000, 30), (10000, 30)])
+def test_continuous_collision_stops_tunnelling(speed, rate):
+	assert fireAtWall(True, speed, rate) < 295
@@ -0,0 +1,63 @@
+# >> CREDITS <<
+# Test_Narrowphase.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Checks the batched NumPy narrowphase against the scalar one on the same random polygon pairs.
+
+# >> MODULES <<
+import random
+
+from classes.vector2d import Vector2
+from engine.engine_model import createModel, createRigidBody
+from engine.collisions import findSeparation
+from engine.collision_handler import areShapesColliding
+from engine.batch_collision_handler import findSeparationsBatched, checkCollisionsBatched
+from engine.broadphase import SweepAndPrune
+
+# >> UTILITY FUNCTIONS <<
+
+def randomPairs(amount, seed): # Candidate pairs from lots of overlapping polygons, with dots and lines mixed in
+	generator = random.Random(seed)
+	engine = createModel()
+	for i in range(amount):
+		body = createRigidBody(generator.randint(1, 8), generator.uniform(20, 60))
+		body.Position = Vector2(generator.uniform(0, 400), generator.uniform(0, 300))
+		body.Rotation = generator.uniform(0, 6.3)
+		body.Velocity = Vector2(generator.uniform(-100, 100), generator.uniform(-100, 100))
+		body.Parent = engine.Workspace
+	return SweepAndPrune().GetPairs(engine.Workspace.GetDescendants())
+
+def close(one, two, tolerance=1e-9): # Python's x**2 and NumPy's square can differ in the last bit
+	return abs(one-two) <= tolerance*max(1, abs(one))
+
+# >> TESTS <<
+
+def test_separations_match_scalar():
+	for seed in range(5):
+		pairs = randomPairs(80, seed)
+		assert pairs
+		batched = findSeparationsBatched(pairs)
+		assert len(batched) == len(pairs)
+		for pair, separation in zip(pairs, batched):
+			expected = findSeparation(*pair)
+			if expected == None:
+				assert separation == None
+				continue
+			assert separation != None
+			(normal, depth), (expectedNormal, expectedDepth) = separation, expected
+			assert close(depth, expectedDepth)
+			assert close(normal.x, expectedNormal.x) and close(normal.y, expectedNormal.y)
+
+def test_collisions_match_scalar():
+	pairs = randomPairs(150, 7)
+	scalar = []
+	for shapeA, shapeB in pairs:
+		collision, mtv, point, impulse = areShapesColliding(shapeA, shapeB)
+		if collision:
+			scalar.append((shapeA, shapeB, mtv, point, impulse))
+	batched = checkCollisionsBatched(pairs)
+	assert len(batched) == len(scalar) > 0
+	for (a, b, mtv, point, impulse), (batchedA, batchedB, batchedMtv, batchedPoint, batchedImpulse) in zip(scalar, batched):
+		assert a.ID == batchedA.ID and b.ID == batchedB.ID
+		for one, two in ((mtv.x, batchedMtv.x), (mtv.y, batchedMtv.y), (point.x, batchedPoint.x), (point.y, batchedPoint.y), (impulse, batchedImpulse)):
+			assert close(one, two)
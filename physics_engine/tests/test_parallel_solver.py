@@ -0,0 +1,54 @@
+# >> CREDITS <<
+# Test_Parallel_Solver.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# The parallel solver has to give the same results whatever the number of workers,
+# and a world that used it has to take its worker processes and shared memory with it when it's thrown away.
+
+# >> MODULES <<
+import gc
+from multiprocessing import shared_memory
+from weakref import ref
+
+import pytest
+
+from engine import parallel_solver
+from engine.engine_model import updatePhysics
+from engine.scenes import buildScene
+
+# >> UTILITY FUNCTIONS <<
+
+def simulate(workers, monkeypatch): # Final (x, y, rotation) of every body in a few columns of boxes
+	monkeypatch.setattr(parallel_solver, "parallelWorkers", workers)
+	game = buildScene("Columns", 60, 3)
+	for frame in range(60):
+		updatePhysics(game.Workspace, 1/120)
+	state = [(body.Position.x, body.Position.y, body.Rotation) for body in game.Workspace.GetDescendants()]
+	parallel_solver.closeParallelSolvers()
+	return state
+
+# >> TESTS <<
+
+def test_same_results_for_any_worker_count(monkeypatch):
+	expected = simulate(1, monkeypatch)
+	for workers in (2, 3):
+		assert simulate(workers, monkeypatch) == expected
+	normal = simulate(0, monkeypatch) # The normal solver visits contacts in a different order, so it only comes close
+	assert all(abs(one-two) < 1e-3 for before, after in zip(expected, normal) for one, two in zip(before, after))
+
+def test_discarded_world_frees_its_workers(monkeypatch):
+	monkeypatch.setattr(parallel_solver, "parallelWorkers", 2)
+	game = buildScene("Columns", 20, 0)
+	updatePhysics(game.Workspace, 1/120)
+	solver = parallel_solver.parallelSolvers[game.Workspace.ID]
+	names = [block.name for block in solver._Blocks]
+	assert names
+	executor, solver = solver._Executor, ref(solver)
+	del game
+	gc.collect()
+	assert solver() == None
+	assert len(parallel_solver.parallelSolvers) == 0
+	assert executor._shutdown_thread
+	for name in names:
+		with pytest.raises(FileNotFoundError):
+			shared_memory.SharedMemory(name=name)
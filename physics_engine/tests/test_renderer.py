@@ -0,0 +1,53 @@
+# >> CREDITS <<
+# Test_Renderer.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# The DirtyRenderer only repaints what changed, so every frame it draws has to match a full render of the same frame.
+
+# >> MODULES <<
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # No window is needed, everything is drawn onto Surfaces
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+import pytest
+
+from classes.uibase import UIBase
+from classes.udim2 import UDim2
+from classes.colour import Colour
+from engine import body_store
+from engine.scenes import buildScene
+from engine.renderer import render, DirtyRenderer
+from engine.stepper import Stepper
+
+# >> UTILITY FUNCTIONS <<
+
+def pixels(surface):
+	return pygame.image.tobytes(surface, "RGB")
+
+# >> TESTS <<
+
+@pytest.mark.parametrize("useStore", [False, True])
+def test_dirty_render_matches_full_render(monkeypatch, useStore):
+	monkeypatch.setattr(body_store, "useBodyStore", useStore)
+	pygame.init()
+	game = buildScene("Pile", 60)
+	game.Colour = Colour(50, 50, 50)
+	bar = UIBase("Rectangle")
+	bar.Size = UDim2(1, 0, 0.05, 0)
+	bar.Colour = Colour(100, 100, 100)
+	bar.ZIndex = 5
+	bar.Parent = game.UserInterface
+	dirty, full = pygame.Surface((1600, 1000)), pygame.Surface((1600, 1000))
+	renderer, stepper = DirtyRenderer(game, dirty), Stepper(game.Workspace)
+	for frame in range(90):
+		stepper.Advance(1/45)
+		renderer.Render(stepper)
+		render(game, full, stepper)
+		assert pixels(dirty) == pixels(full), f"frame {frame}"
+		if frame == 30: # Something leaving, and the UI changing, have to be repainted too
+			game.Workspace.GetChildren()[-1].Parent = None
+		if frame == 50:
+			bar.Colour = Colour(10, 200, 10)
+		if frame == 70:
+			bar.Visible = False
@@ -0,0 +1,46 @@
+# >> CREDITS <<
+# Test_RigidBody.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Changing a body's vectors in place has to clear its cached geometry, whether or not it's in a BodyStore.
+
+# >> MODULES <<
+import pytest
+
+from classes.vector2d import Vector2
+from engine import body_store
+from engine.engine_model import createModel, createRigidBody
+
+# >> UTILITY FUNCTIONS <<
+
+def placedBody(monkeypatch, useStore):
+	monkeypatch.setattr(body_store, "useBodyStore", useStore)
+	engine = createModel()
+	body = createRigidBody(4, 20)
+	body.Position = Vector2(100, 100)
+	body.Parent = engine.Workspace
+	body_store.getBodyStore(engine.Workspace) # Made the first time it's asked for, as updatePhysics would
+	assert (body._Store != None) == useStore
+	return body
+
+# >> TESTS <<
+
+@pytest.mark.parametrize("useStore", [False, True])
+def test_changing_position_in_place_moves_the_geometry(monkeypatch, useStore):
+	body = placedBody(monkeypatch, useStore)
+	box, position = body.BoundingBox, Vector2(body.AbsolutePosition)
+	body.Position.x += 5
+	body.Position[1] -= 3
+	assert body.Position == Vector2(105, 97)
+	assert body.AbsolutePosition == position + Vector2(5, -3)
+	assert body.BoundingBox == (box[0]+5, box[1]-3, box[2]+5, box[3]-3)
+
+@pytest.mark.parametrize("useStore", [False, True])
+def test_assigned_vectors_are_not_shared(monkeypatch, useStore):
+	body, other = placedBody(monkeypatch, useStore), createRigidBody(4, 20)
+	velocity = Vector2(1, 2)
+	body.Velocity = velocity
+	other.Velocity = body.Velocity # A copy of the values, not a view that follows body
+	velocity.x = 50
+	body.Velocity.y = 7
+	assert body.Velocity == Vector2(1, 7) and other.Velocity == Vector2(1, 2)
@@ -0,0 +1,73 @@
+# >> CREDITS <<
+# Test_Shape.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Shapes are shared between bodies, so they can't be changed in place,
+# and editing a body's vertices moves just that body onto a new interned Shape.
+
+# >> MODULES <<
+import copy
+import pickle
+
+import pytest
+
+from classes.vector2d import Vector2, FrozenVector2
+from classes.vector2array import Vector2Array
+from classes.shape import getShape
+from engine.engine_model import createRigidBody, createRigidBodyFromVertices
+
+# >> TESTS <<
+
+def test_shared_vertices_cant_change():
+	one, two = createRigidBody(4, 40), createRigidBody(4, 40)
+	assert one.Shape is two.Shape
+	vertex = one.SpriteVertices[0]
+	with pytest.raises(AttributeError):
+		vertex.x += 5
+	with pytest.raises(AttributeError):
+		vertex[1] = 5
+	with pytest.raises(AttributeError):
+		vertex.rotateRadians(1)
+	with pytest.raises(TypeError):
+		one.SpriteVertices[0] = Vector2(5, 5)
+	with pytest.raises(AttributeError):
+		one.Shape.Axes[0][0].x = 5
+	with pytest.raises(AttributeError):
+		one.Shape.Centroid.y = 5
+	moved = vertex
+	moved += Vector2(5, 0) # Rebinds to a new vector rather than moving the shared one
+	assert moved == Vector2(vertex.x+5, vertex.y) and type(moved) is Vector2
+	assert two.SpriteVertices[0] == vertex
+
+def test_shared_arrays_cant_change():
+	one = createRigidBodyFromVertices()
+	one.Shape = Vector2Array([(0, 0), (10, 0), (10, 10)])
+	two = createRigidBodyFromVertices()
+	two.Shape = Vector2Array([(0, 0), (10, 0), (10, 10)])
+	assert one.Shape is two.Shape
+	with pytest.raises(TypeError):
+		one.SpriteVertices[0] = Vector2(5, 5)
+	with pytest.raises(TypeError):
+		one.SpriteVertices.append(Vector2(5, 5))
+	with pytest.raises(ValueError):
+		one.SpriteVertices.Array[0, 0] = 5
+	assert two.SpriteVertices[0] == Vector2(0, 0)
+
+def test_editing_vertices_copies_the_shape():
+	one, two = createRigidBody(4, 40), createRigidBody(4, 40)
+	shared = one.Shape
+	first = Vector2(one.SpriteVertices[0])
+	one.ChangeVertex(0, Vector2(100, 100))
+	assert one.Shape is not shared and two.Shape is shared
+	assert one.SpriteVertices[0] == Vector2(100, 100) and two.SpriteVertices[0] == first
+	assert one.Shape is getShape([Vector2(100, 100)] + list(shared.Vertices[1:])) # The new Shape is interned too
+	two.AddVertex(Vector2(0, 50))
+	assert len(two.Shape) == 5 and len(shared) == 4
+	two.RemoveVertex(Vector2(0, 50))
+	assert two.Shape is shared
+
+def test_frozen_vectors_copy_and_pickle():
+	vertex = FrozenVector2(3, 4)
+	assert copy.copy(vertex) is vertex and copy.deepcopy(vertex) is vertex
+	loaded = pickle.loads(pickle.dumps(vertex))
+	assert type(loaded) is FrozenVector2 and loaded == vertex
@@ -0,0 +1,54 @@
+# >> CREDITS <<
+# Test_Snapshots.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# A keyframe restores every body's state, and gives each body back the same interned Shape it was saved with.
+
+# >> MODULES <<
+from classes.vector2d import Vector2
+from classes.vector2array import Vector2Array
+from engine.engine_model import updatePhysics, createRigidBodyFromVertices
+from engine.scenes import buildScene
+from engine.snapshots import saveSnapshot, loadSnapshot
+
+# >> UTILITY FUNCTIONS <<
+
+def states(workspace): # ID >> everything a keyframe keeps about the body
+	return {body.ID: (body.Name, tuple(body.Position), tuple(body.Velocity), body.Rotation, body.AngularVelocity, body.Anchored, body.Shape)
+		for body in workspace.GetDescendants()}
+
+def buildWorld():
+	game = buildScene("Box", 15, 4)
+	body = createRigidBodyFromVertices()
+	body.Shape = Vector2Array([(-10, -10), (10, -10), (10, 10), (-10, 10)])
+	body.Position = Vector2(200, 50)
+	body.Name = "Array"
+	body.Parent = game.Workspace
+	return game, body
+
+# >> TESTS <<
+
+def test_snapshot_round_trip(tmp_path):
+	path = str(tmp_path / "world.snap")
+	game, arrayBody = buildWorld()
+	for frame in range(10):
+		updatePhysics(game.Workspace, 1/60)
+	saved = states(game.Workspace)
+	saveSnapshot(game.Workspace, path, 1.5)
+	for frame in range(20):
+		updatePhysics(game.Workspace, 1/60)
+	snapshot = loadSnapshot(path)
+	assert snapshot.Time == 1.5 and len(snapshot) == len(saved)
+	snapshot.Restore(game.Workspace) # Onto the same bodies
+	assert states(game.Workspace) == saved
+	other = buildScene("Box", 3, 8) # Onto bodies built from the file
+	snapshot.Restore(other.Workspace)
+	assert states(other.Workspace) == saved
+
+def test_array_shapes_come_back_interned(tmp_path):
+	path = str(tmp_path / "world.snap")
+	game, arrayBody = buildWorld()
+	saveSnapshot(game.Workspace, path)
+	rebuilt = {body.ID: body for body in loadSnapshot(path).Bodies()}[arrayBody.ID]
+	assert rebuilt.Shape is arrayBody.Shape
+	assert isinstance(rebuilt.SpriteVertices, Vector2Array)
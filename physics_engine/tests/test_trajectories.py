@@ -0,0 +1,74 @@
+# >> CREDITS <<
+# Test_Trajectories.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# A recorded run replays onto rebuilt bodies exactly, and a writing thread that fails
+# raises on the simulation's thread instead of leaving updatePhysics blocked on a full queue.
+
+# >> MODULES <<
+import pytest
+
+from engine.engine_model import updatePhysics, stepListeners
+from engine.scenes import buildScene
+from engine.trajectories import Recorder, Replayer
+
+# >> UTILITY FUNCTIONS <<
+
+def states(workspace): # ID >> (x, y, rotation, velocity x, velocity y, angular velocity)
+	return {body.ID: (body.Position.x, body.Position.y, body.Rotation, body.Velocity.x, body.Velocity.y, body.AngularVelocity) for body in workspace.GetDescendants()}
+
+class BrokenFile: # Passes writes through until it's told to fail, like a disk filling up part way through
+	def __init__(self, file):
+		self.File = file
+		self.Broken = False
+	def write(self, data):
+		if self.Broken:
+			raise OSError("No space left on device")
+		return self.File.write(data)
+	def tell(self):
+		return self.File.tell()
+	def close(self):
+		self.File.close()
+
+# >> TESTS <<
+
+def test_trajectory_round_trip(tmp_path):
+	path = str(tmp_path / "run.traj")
+	game = buildScene("Box", 20, 3)
+	recorder = Recorder(game.Workspace, path, chunkSteps=7)
+	recorder.Start()
+	recorded = []
+	for frame in range(30):
+		updatePhysics(game.Workspace, 1/60)
+		recorded.append(states(game.Workspace))
+	recorder.Stop()
+	replayer = Replayer(path)
+	assert len(replayer) == 30
+	replay = buildScene("Box", 5, 9) # Different bodies, replaced by the keyframe's
+	replayer.Restore(replay.Workspace)
+	for step in (0, 6, 7, 29, 13):
+		replayer.Seek(step)
+		assert states(replay.Workspace) == recorded[step]
+
+def test_failed_writes_are_raised(tmp_path):
+	game = buildScene("Box", 10, 3)
+	recorder = Recorder(game.Workspace, str(tmp_path / "run.traj"), chunkSteps=2)
+	recorder.Start(keyframe=False)
+	recorder._File = file = BrokenFile(recorder._File)
+	file.Broken = True
+	with pytest.raises(OSError):
+		for frame in range(100): # Far more chunks than the queue holds
+			updatePhysics(game.Workspace, 1/60)
+	assert recorder.Record not in stepListeners and file.File.closed
+	recorder.Stop() # Already stopped, so nothing left to do
+
+def test_failed_writes_are_raised_by_stop(tmp_path):
+	game = buildScene("Box", 10, 3)
+	recorder = Recorder(game.Workspace, str(tmp_path / "run.traj"), chunkSteps=50)
+	recorder.Start(keyframe=False)
+	recorder._File = file = BrokenFile(recorder._File)
+	updatePhysics(game.Workspace, 1/60)
+	file.Broken = True
+	with pytest.raises(OSError):
+		recorder.Stop() # Writes the last partial chunk, which fails
+	assert file.File.closed
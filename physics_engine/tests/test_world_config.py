@@ -0,0 +1,51 @@
+# >> CREDITS <<
+# Test_World_Config.py written by Haashim Hussain
+
+# >> DESCRIPTION <<
+# Each world keeps its own constants, and nothing kept about a world outlives it.
+
+# >> MODULES <<
+import gc
+
+from engine import collision_handler, body_store, collisions, world_config
+from engine.engine_model import updatePhysics, releaseWorld
+from engine.scenes import buildScene
+from engine.world_config import WorldConfig, getWorldConfig, setWorldConfig, defaultConfig
+from classes import rigidbody
+
+# >> UTILITY FUNCTIONS <<
+
+def kept(): # How many worlds each per-world index still has something for
+	return [len(index) for index in (collision_handler.broadphases, body_store.stores, collisions.contactCaches, world_config.configs)]
+
+# >> TESTS <<
+
+def test_worlds_keep_their_own_config():
+	one, two = buildScene("Box", 10).Workspace, buildScene("Box", 10).Workspace
+	setWorldConfig(one, WorldConfig(gravity=0))
+	assert getWorldConfig(one).Gravity == 0
+	assert getWorldConfig(two) is defaultConfig
+	setWorldConfig(one, None)
+	assert getWorldConfig(one) is defaultConfig
+
+def test_discarded_worlds_are_collected():
+	gc.collect()
+	before = kept()
+	for seed in range(3):
+		game = buildScene("Box", 30, seed)
+		setWorldConfig(game.Workspace, WorldConfig(allowSleeping=False))
+		for frame in range(3):
+			updatePhysics(game.Workspace, 1/60)
+		del game
+	gc.collect()
+	assert kept() == before
+	assert all(reference() != None for reference in rigidbody.parentChangedListeners)
+
+def test_release_world_drops_everything_now():
+	game = buildScene("Box", 30)
+	workspace = game.Workspace
+	setWorldConfig(workspace, WorldConfig(gravity=10))
+	updatePhysics(workspace, 1/60)
+	releaseWorld(workspace)
+	assert not workspace._Kept
+	assert all(not workspace.ID in index for index in (collision_handler.broadphases, body_store.stores, collisions.contactCaches, world_config.configs))